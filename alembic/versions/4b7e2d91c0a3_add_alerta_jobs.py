@@ -0,0 +1,49 @@
+"""add alerta jobs
+
+Revision ID: 4b7e2d91c0a3
+Revises: 3d9c7423011c, b78bd934f74c
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2d91c0a3'
+down_revision: Union[str, Sequence[str], None] = ('3d9c7423011c', 'b78bd934f74c')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'alerta_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('gestion', sa.Integer(), nullable=False),
+        sa.Column('curso_id', sa.Integer(), nullable=True),
+        sa.Column('umbral_prom', sa.SmallInteger(), nullable=False),
+        sa.Column('faltas_max', sa.SmallInteger(), nullable=False),
+        sa.Column('dias', sa.SmallInteger(), nullable=False),
+        sa.Column('estado', sa.String(length=12), server_default='PENDIENTE', nullable=False),
+        sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('procesados', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('creadas', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('actualizadas', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('eliminadas', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('error', sa.String(length=255), nullable=True),
+        sa.Column('creado_en', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('iniciado_en', sa.DateTime(), nullable=True),
+        sa.Column('finalizado_en', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_alerta_jobs_gestion', 'alerta_jobs', ['gestion'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_alerta_jobs_gestion', table_name='alerta_jobs')
+    op.drop_table('alerta_jobs')
@@ -0,0 +1,29 @@
+"""add alerta_jobs actualizado_en
+
+Revision ID: 5c8e1f3a7b20
+Revises: 2f6b8d0a4c19
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e1f3a7b20'
+down_revision: Union[str, Sequence[str], None] = '2f6b8d0a4c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('alerta_jobs', sa.Column('actualizado_en', sa.DateTime(), nullable=True))
+    op.execute("UPDATE alerta_jobs SET actualizado_en = COALESCE(finalizado_en, iniciado_en, creado_en)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('alerta_jobs', 'actualizado_en')
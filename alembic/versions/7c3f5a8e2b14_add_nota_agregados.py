@@ -0,0 +1,52 @@
+"""add nota agregados
+
+Revision ID: 7c3f5a8e2b14
+Revises: 4b7e2d91c0a3
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f5a8e2b14'
+down_revision: Union[str, Sequence[str], None] = '4b7e2d91c0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'nota_agregados',
+        sa.Column('estudiante_id', sa.Integer(), nullable=False),
+        sa.Column('asignacion_id', sa.Integer(), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('suma', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('suma_ponderada', sa.Numeric(precision=16, scale=4), nullable=False),
+        sa.Column('suma_ponderacion', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['estudiante_id'], ['estudiantes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['asignacion_id'], ['asignacion_docente.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('estudiante_id', 'asignacion_id'),
+    )
+    op.create_index('ix_nota_agregados_asig', 'nota_agregados', ['asignacion_id'])
+    op.execute(
+        """
+        INSERT INTO nota_agregados
+            (estudiante_id, asignacion_id, cantidad, suma, suma_ponderada, suma_ponderacion)
+        SELECT n.estudiante_id, e.asignacion_id, COUNT(*), SUM(n.calificacion),
+               SUM(n.calificacion * e.ponderacion), SUM(e.ponderacion)
+        FROM notas n
+        JOIN evaluaciones e ON e.id = n.evaluacion_id
+        GROUP BY n.estudiante_id, e.asignacion_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_nota_agregados_asig', table_name='nota_agregados')
+    op.drop_table('nota_agregados')
@@ -0,0 +1,58 @@
+"""add asistencia semanas
+
+Revision ID: 9a1d4c6e3f27
+Revises: 7c3f5a8e2b14
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a1d4c6e3f27'
+down_revision: Union[str, Sequence[str], None] = '7c3f5a8e2b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'asistencia_semanas',
+        sa.Column('asignacion_id', sa.Integer(), nullable=False),
+        sa.Column('estudiante_id', sa.Integer(), nullable=False),
+        sa.Column('semana', sa.Date(), nullable=False),
+        sa.Column('presentes', sa.SmallInteger(), nullable=False),
+        sa.Column('ausentes', sa.SmallInteger(), nullable=False),
+        sa.Column('tardes', sa.SmallInteger(), nullable=False),
+        sa.Column('justificados', sa.SmallInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['asignacion_id'], ['asignacion_docente.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['estudiante_id'], ['estudiantes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('asignacion_id', 'estudiante_id', 'semana'),
+    )
+    op.create_index(
+        'ix_asistencia_semanas_asig_semana', 'asistencia_semanas', ['asignacion_id', 'semana']
+    )
+
+    # En otros motores usar ``python -m app.manage rebuild-asistencia-semanas``.
+    if op.get_bind().dialect.name in ("mysql", "mariadb"):
+        op.execute(
+            """
+            INSERT INTO asistencia_semanas
+                (asignacion_id, estudiante_id, semana, presentes, ausentes, tardes, justificados)
+            SELECT asignacion_id, estudiante_id, DATE_SUB(fecha, INTERVAL WEEKDAY(fecha) DAY),
+                   SUM(estado = 'PRESENTE'), SUM(estado IN ('AUSENTE', 'A')),
+                   SUM(estado = 'TARDE'), SUM(estado = 'JUSTIFICADO')
+            FROM asistencias
+            GROUP BY asignacion_id, estudiante_id, DATE_SUB(fecha, INTERVAL WEEKDAY(fecha) DAY)
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_asistencia_semanas_asig_semana', table_name='asistencia_semanas')
+    op.drop_table('asistencia_semanas')
@@ -2,29 +2,79 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import FrozenSet, Iterable
+from collections.abc import AsyncIterator, Set as AbstractSet
+from typing import Any, Callable, Iterable
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.api.middleware import prefer_primary
 from app.core.permissions import permission_cache
 from app.core.security import decode_token
+from app.core.user_cache import user_cache
 from app.db.models import EstadoUsuarioEnum, Usuario
-from app.db.session import SessionLocal
+from app.db.session import (
+    ReadSessionLocal,
+    SessionLocal,
+    get_async_read_sessionmaker,
+    get_async_sessionmaker,
+    session_usage,
+)
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 
-@dataclass(slots=True)
 class AuthContext:
-    """Represents an authenticated request along with its permissions."""
+    """Represents an authenticated request along with its permissions.
 
-    user: Usuario
-    rol_codigo: str
-    permissions: FrozenSet[str]
+    ``require_auth`` builds it from the cached user snapshot, so the ORM
+    ``Usuario`` is only loaded when ``user`` is first read.
+    """
+
+    __slots__ = ("user_id", "rol_codigo", "permissions", "_user", "_loader")
+
+    def __init__(
+        self,
+        user: Usuario | None = None,
+        rol_codigo: str = "",
+        permissions: AbstractSet[str] = frozenset(),
+        *,
+        user_id: int | None = None,
+        loader: Callable[[], Usuario] | None = None,
+    ) -> None:
+        if user is None and loader is None:
+            raise TypeError("AuthContext requiere user o loader")
+        self.user_id = user.id if user is not None else user_id
+        self.rol_codigo = rol_codigo
+        self.permissions = permissions
+        self._user = user
+        self._loader = loader
+
+    @property
+    def user(self) -> Usuario:
+        if self._user is None:
+            self._user = self._loader()
+        return self._user
+
+
+class LazyUser:
+    """Stands in for the authenticated ``Usuario`` returned by access dependencies.
+
+    ``id`` comes from the context; any other attribute loads the user.
+    """
+
+    __slots__ = ("_context",)
+
+    def __init__(self, context: AuthContext) -> None:
+        self._context = context
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "id":
+            return self._context.user_id
+        return getattr(self._context.user, name)
 
 
 def get_db() -> Iterable[Session]:
@@ -32,9 +82,55 @@ def get_db() -> Iterable[Session]:
     try:
         yield db
     finally:
+        session_usage.registrar(db)
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async counterpart of :func:`get_db` for ``async def`` endpoints."""
+
+    async with get_async_sessionmaker()() as db:
+        try:
+            yield db
+        finally:
+            session_usage.registrar(db.sync_session)
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)) -> Iterable[Session]:
+    """Session on the read replica for read-only endpoints.
+
+    Falls back to the primary session when no replica is configured or the
+    client wrote recently (see ``app.api.middleware.read_your_writes``).
+    The primary session opens no connection unless it is used.
+    """
+
+    if ReadSessionLocal is None or prefer_primary(request):
+        yield primary
+        return
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        session_usage.heredar(primary, db)
+        db.close()
+
+
+async def get_async_read_db(
+    request: Request, primary: AsyncSession = Depends(get_async_db)
+) -> AsyncIterator[AsyncSession]:
+    """Async counterpart of :func:`get_read_db`."""
+
+    factory = get_async_read_sessionmaker()
+    if factory is None or prefer_primary(request):
+        yield primary
+        return
+    async with factory() as db:
+        try:
+            yield db
+        finally:
+            session_usage.heredar(primary.sync_session, db.sync_session)
+
+
 def require_auth(
     request: Request,
     token: str | None = Depends(oauth2_scheme),
@@ -56,12 +152,7 @@ def require_auth(
     except (TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
 
-    user = (
-        db.query(Usuario)
-        .options(selectinload(Usuario.rol))
-        .filter(Usuario.id == user_id)
-        .first()
-    )
+    user = user_cache.get_user(db, user_id)
     if not user or user.estado != EstadoUsuarioEnum.ACTIVO:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
 
@@ -69,14 +160,21 @@ def require_auth(
     if not username or user.username != username:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
 
-    if user.rol is None:
+    if user.rol_codigo is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Rol no asignado")
 
+    def cargar_usuario() -> Usuario:
+        usuario = db.get(Usuario, user_id)
+        if usuario is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
+        return usuario
+
     permissions = permission_cache.get_permissions(db, user.rol_id)
     context = AuthContext(
-        user=user,
-        rol_codigo=user.rol.codigo,
+        rol_codigo=user.rol_codigo,
         permissions=permissions,
+        user_id=user.id,
+        loader=cargar_usuario,
     )
 
     request.state.user_id = user.id
@@ -99,7 +197,7 @@ def require_roles(*roles_validos: str):
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Permisos insuficientes",
             )
-        return context.user
+        return LazyUser(context)
 
     return dependency
 
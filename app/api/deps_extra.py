@@ -6,7 +6,7 @@ from collections.abc import Iterable
 
 from fastapi import Depends, HTTPException, status
 
-from app.api.deps import AuthContext, require_auth
+from app.api.deps import AuthContext, LazyUser, require_auth
 from app.db.models import Usuario
 
 
@@ -25,7 +25,7 @@ def require_permission(view_code: str):
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Permiso denegado",
             )
-        return context.user
+        return LazyUser(context)
 
     return dependency
 
@@ -50,7 +50,7 @@ def require_role(*codes: Iterable[str] | str):
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Permiso denegado",
             )
-        return context.user
+        return LazyUser(context)
 
     return dependency
 
@@ -70,6 +70,6 @@ def require_role_and_view(roles: Iterable[str], view_code: str):
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Permiso denegado",
             )
-        return context.user
+        return LazyUser(context)
 
     return dependency
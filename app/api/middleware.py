@@ -0,0 +1,92 @@
+"""HTTP middlewares registered by ``app.main``."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.db.query_counter import track_queries
+
+
+logger = logging.getLogger(__name__)
+
+
+READ_PRIMARY_COOKIE = "leer_primario"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def prefer_primary(request: Request) -> bool:
+    """Whether reads of ``request`` must see the client's recent writes."""
+
+    return bool(request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(READ_PRIMARY_HEADER))
+
+
+async def read_your_writes(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Pin the client's reads to the primary for a while after a write.
+
+    Successful unsafe requests set a cookie that lives for
+    ``DB_REPLICA_STICKY_SECONDS``, longer than the expected replica lag;
+    ``get_read_db`` uses the primary while it is present. Clients without
+    cookies can send the ``X-Read-Primary`` header instead.
+    """
+
+    response = await call_next(request)
+    if request.method not in _SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=settings.DB_REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+def _route_name(request: Request) -> str:
+    """Name of the matched endpoint, or the raw path when none matched."""
+
+    route = request.scope.get("route")
+    return getattr(route, "name", None) or request.url.path
+
+
+async def query_metrics(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Count the SQL statements of each request and report them.
+
+    The count and DB time go out in a ``Server-Timing`` header and one log
+    line per request; statements slower than ``SLOW_QUERY_MS`` are logged
+    with the route that ran them. For streaming responses only the
+    statements run before the headers are sent are included.
+    """
+
+    inicio = time.perf_counter()
+    with track_queries(slow_threshold=settings.SLOW_QUERY_MS / 1000) as stats:
+        response = await call_next(request)
+    total_ms = (time.perf_counter() - inicio) * 1000
+    db_ms = stats.elapsed * 1000
+
+    response.headers["Server-Timing"] = (
+        f'db;desc="{stats.count} consultas";dur={db_ms:.1f}, total;dur={total_ms:.1f}'
+    )
+    ruta = _route_name(request)
+    logger.info(
+        "metodo=%s ruta=%s status=%s consultas=%d db_ms=%.1f total_ms=%.1f",
+        request.method,
+        ruta,
+        response.status_code,
+        stats.count,
+        db_ms,
+        total_ms,
+    )
+    for sql, segundos in stats.slow:
+        logger.warning("consulta lenta ruta=%s ms=%.1f sql=%s", ruta, segundos * 1000, " ".join(sql.split()))
+    return response
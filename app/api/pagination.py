@@ -0,0 +1,156 @@
+"""Opaque cursor tokens and keyset pagination helpers.
+
+List endpoints keep their ``limit``/``offset`` parameters and add an opt-in
+``cursor`` mode: the first page is requested with ``cursor=`` (empty) and
+every page that has more rows returns the token of the next one in the
+``X-Next-Cursor`` header. Pages are fetched with ``WHERE (sort key) >
+(last key) ... LIMIT n``, so deep pages cost the same as the first one.
+Exact totals are only counted when ``with_total=true`` is requested and
+are returned in ``X-Total-Count``.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import ColumnElement, UnaryExpression
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} no se puede usar en un cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row returned as an opaque token."""
+
+    raw = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list[Any]:
+    """Decode a token produced by :func:`encode_cursor`.
+
+    Raises a 400 when the token is malformed or does not hold ``size`` values.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+
+def _columna(orden: ColumnElement) -> tuple[ColumnElement, bool]:
+    """Split ``Model.col`` / ``Model.col.desc()`` into column and direction."""
+
+    if isinstance(orden, UnaryExpression) and orden.modifier in (operators.desc_op, operators.asc_op):
+        return orden.element, orden.modifier is operators.desc_op
+    return orden, False
+
+
+def _restaurar(columna: ColumnElement, valor: Any) -> Any:
+    try:
+        tipo = columna.type.python_type
+    except NotImplementedError:
+        return valor
+    if valor is None:
+        return None
+    try:
+        if tipo is datetime:
+            return datetime.fromisoformat(valor)
+        if tipo is date:
+            return date.fromisoformat(valor)
+        if tipo in (int, float, str):
+            return tipo(valor)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido") from None
+    return valor
+
+
+def paginate_keyset(
+    query: Query,
+    orden: Sequence[ColumnElement],
+    cursor: str,
+    limit: int,
+    response: Response,
+) -> list:
+    """Return one page of ``query`` ordered by ``orden``.
+
+    ``orden`` must end with a unique column (usually the primary key) so the
+    key identifies a row; each entry may be ascending or ``.desc()``. An
+    empty ``cursor`` requests the first page. When more rows remain the
+    next token is set in the ``X-Next-Cursor`` header of ``response``.
+    """
+
+    columnas = [_columna(o) for o in orden]
+    if cursor:
+        valores = decode_cursor(cursor, len(columnas))
+        valores = [_restaurar(col, v) for (col, _), v in zip(columnas, valores)]
+        condiciones = []
+        for i, (col, desc) in enumerate(columnas):
+            iguales = [c == v for (c, _), v in zip(columnas[:i], valores[:i])]
+            siguiente = col < valores[i] if desc else col > valores[i]
+            condiciones.append(and_(*iguales, siguiente))
+        query = query.filter(or_(*condiciones))
+
+    filas = query.order_by(None).order_by(*orden).limit(limit + 1).all()
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(ultima, col.key) for col, _ in columnas]
+        )
+    return filas
+
+
+def count_total(query: Query, response: Response | None = None) -> int:
+    """Count the rows of ``query`` and optionally expose it in ``X-Total-Count``."""
+
+    total = query.order_by(None).count()
+    if response is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+    return total
+
+
+def paginate(
+    query: Query,
+    orden: Sequence[ColumnElement],
+    response: Response,
+    limit: int | None,
+    offset: int = 0,
+    cursor: str | None = None,
+    with_total: bool = False,
+) -> list:
+    """Answer a list request over ``query`` ordered by ``orden``.
+
+    Counts the total into ``X-Total-Count`` when ``with_total`` is set, then
+    returns a keyset page when ``cursor`` is given (see
+    :func:`paginate_keyset`) or the ``offset``/``limit`` slice otherwise; a
+    ``None`` limit returns every remaining row.
+    """
+
+    if with_total:
+        count_total(query, response)
+    if cursor is not None:
+        return paginate_keyset(query, orden, cursor, limit, response)
+    query = query.order_by(None).order_by(*orden).offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
@@ -0,0 +1,111 @@
+"""StreamingResponse helpers for endpoints that dump whole tables."""
+
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, Literal
+
+from fastapi import Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.orm import Query as OrmQuery, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.api.pagination import paginate
+from app.services.exportacion import FormatoExportacion, exportar
+
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# ``json`` devuelve el listado (o una página); ``ndjson`` lo transmite completo.
+FormatoListado = Literal["json", "ndjson"]
+
+# Tamaño de página del modo cursor cuando no se indica ``limit``
+CURSOR_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+
+def schema_columns(model: type, schema: type[BaseModel], **overrides: Any) -> list:
+    """Columns of ``model`` named like the fields of ``schema``.
+
+    Lets a streaming dump emit the same keys as the JSON listing while
+    reading plain rows; ``overrides`` replaces the expression of a field.
+    """
+
+    return [
+        overrides[name].label(name) if name in overrides else getattr(model, name)
+        for name in schema.model_fields
+    ]
+
+
+def stream_rows(
+    db: Session,
+    stmt: Select,
+    formato: FormatoExportacion = "ndjson",
+    nombre: str | None = None,
+    comprimido: bool = False,
+) -> StreamingResponse:
+    """Stream the rows of ``stmt`` with constant memory.
+
+    The request session is closed before the body is sent, so rows are read
+    from a new session on the same engine as ``db``.
+    """
+
+    columnas = [c.name for c in stmt.selected_columns]
+    bind = db.get_bind()
+
+    def contenido() -> Iterator[bytes]:
+        with Session(bind) as lectura:
+            yield from exportar(lectura, stmt, columnas, formato, gzip=comprimido)
+
+    headers = {}
+    if nombre is not None:
+        archivo = f"{nombre}.{formato}" + (".gz" if comprimido else "")
+        headers["Content-Disposition"] = f'attachment; filename="{archivo}"'
+    return StreamingResponse(
+        contenido(),
+        media_type="application/gzip" if comprimido else MEDIA_TYPES[formato],
+        headers=headers,
+    )
+
+
+class ListParams:
+    """Query parameters shared by the list endpoints.
+
+    Without ``limit`` or ``cursor`` the whole listing is returned, as it was
+    before paging was added.
+    """
+
+    def __init__(
+        self,
+        limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        offset: int = Query(0, ge=0),
+        cursor: str | None = Query(None),
+        with_total: bool = Query(False),
+        formato: FormatoListado = Query("json"),
+    ) -> None:
+        self.limit = limit
+        self.offset = offset
+        self.cursor = cursor
+        self.with_total = with_total
+        self.formato = formato
+
+
+def listar(
+    db: Session,
+    q: OrmQuery,
+    orden: Sequence[ColumnElement],
+    params: ListParams,
+    response: Response,
+    columnas: Callable[[], list],
+) -> Any:
+    """Answer a list endpoint with ``q`` ordered by ``orden``.
+
+    ``formato=ndjson`` streams the rows of ``columnas()``, which is only
+    built for that case; otherwise rows come from
+    :func:`~app.api.pagination.paginate`.
+    """
+
+    if params.formato == "ndjson":
+        return stream_rows(db, q.with_entities(*columnas()).order_by(None).order_by(*orden).statement)
+    limit = (params.limit or CURSOR_PAGE_SIZE) if params.cursor is not None else params.limit
+    return paginate(q, orden, response, limit, params.offset, params.cursor, params.with_total)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.deps_extra import require_view
+from app.api.streaming import ListParams, listar, schema_columns
 from app.db.models import AsignacionDocente, Docente, Gestion, Materia, Curso, Paralelo, Usuario
 from app.schemas.asignaciones import AsignacionCreate, AsignacionOut
 
@@ -48,12 +49,14 @@ def crear_asignacion(
 
 @router.get("/", response_model=list[AsignacionOut])
 def listar_asignaciones(
+    response: Response,
     gestion_id: int | None = Query(default=None, gt=0),
     gestion: str | None = Query(default=None),
     docente_id: int | None = Query(default=None, gt=0),
     curso_id: int | None = Query(default=None, gt=0),
     paralelo_id: int | None = Query(default=None, gt=0),
     materia_id: int | None = Query(default=None, gt=0),
+    params: ListParams = Depends(),
     db: Session = Depends(get_db),
     _: Usuario = Depends(require_view("ASIGNACIONES")),
 ):
@@ -72,4 +75,5 @@ def listar_asignaciones(
         q = q.filter(AsignacionDocente.paralelo_id == paralelo_id)
     if materia_id is not None:
         q = q.filter(AsignacionDocente.materia_id == materia_id)
-    return q.order_by(AsignacionDocente.id.asc()).all()
+    orden = [AsignacionDocente.id.asc()]
+    return listar(db, q, orden, params, response, lambda: schema_columns(AsignacionDocente, AsignacionOut))
@@ -1,12 +1,33 @@
 # app/api/v1/asistencias.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from collections.abc import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
 from datetime import date
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_db
 from app.api.deps_extra import require_role_and_view
 from app.db.models import Asistencia, Matricula, Usuario
-from app.schemas.asistencias import AsistenciaCreate, AsistenciaOut, AsistenciaMasivaIn
+from app.schemas.asistencias import (
+    AsistenciaCreate,
+    AsistenciaImportError,
+    AsistenciaImportOut,
+    AsistenciaMasivaIn,
+    AsistenciaOut,
+    AsistenciaResumen,
+)
+from app.services.alertas_eventos import alert_events
+from app.services.asistencias import (
+    FilaAsistencia,
+    MatriculasPorAsignacion,
+    ResultadoAsistencia,
+    parse_encabezado_csv,
+    parse_fila_csv,
+    parse_fila_ndjson,
+    registrar_asistencias,
+)
+from app.services.contadores_asistencia import refrescar_semanas
 
 router = APIRouter(tags=["asistencias"])
 
@@ -32,71 +53,159 @@ def crear_asistencia(
         existente.estado = data.estado
         if hasattr(data, "observacion"):
             existente.observacion = data.observacion
+        db.flush()
+        refrescar_semanas(db, [(data.asignacion_id, data.estudiante_id, data.fecha)])
         db.commit(); db.refresh(existente)
+        alert_events.publicar([(data.asignacion_id, data.estudiante_id)])
         return existente
 
     obj = Asistencia(**data.model_dump())
-    db.add(obj); db.commit(); db.refresh(obj)
+    db.add(obj); db.flush()
+    refrescar_semanas(db, [(data.asignacion_id, data.estudiante_id, data.fecha)])
+    db.commit(); db.refresh(obj)
+    alert_events.publicar([(data.asignacion_id, data.estudiante_id)])
     return obj
 
 @router.post("/masivo")
 def crear_asistencia_masiva(
     payload: AsistenciaMasivaIn,
+    upsert: bool = False,
     db: Session = Depends(get_db),
     _: Usuario = Depends(require_role_and_view({"DOC", "ADMIN"}, "ASISTENCIAS")),
 ):
-    inserciones = duplicados = no_matric = 0
-    for item in payload.items:
-        ok_mat = db.execute(
-            select(Matricula.id).where(
-                Matricula.asignacion_id == payload.asignacion_id,
-                Matricula.estudiante_id == item.estudiante_id
-            )
-        ).scalar_one_or_none()
-        if not ok_mat:
-            no_matric += 1
-            continue
+    """Register a whole class for ``fecha`` with a constant number of queries.
+
+    With ``upsert=true`` rows already registered for the day are updated with
+    the new ``estado``/``observacion`` instead of being counted as duplicates.
+    """
 
-        ya = db.execute(
-            select(Asistencia.id).where(
-                Asistencia.fecha == payload.fecha,
-                Asistencia.asignacion_id == payload.asignacion_id,
-                Asistencia.estudiante_id == item.estudiante_id
+    resultado = registrar_asistencias(
+        db,
+        [
+            FilaAsistencia(
+                fecha=payload.fecha,
+                asignacion_id=payload.asignacion_id,
+                estudiante_id=item.estudiante_id,
+                estado=item.estado,
+                observacion=item.observacion,
             )
-        ).scalar_one_or_none()
-        if ya:
-            duplicados += 1
+            for item in payload.items
+        ],
+        actualizar=upsert,
+    )
+    db.commit()
+    alert_events.publicar(resultado.escritas)
+    total = resultado.total
+    out = {"insertados": total.insertados, "duplicados": total.duplicados, "no_matriculados": total.no_matriculados}
+    if upsert:
+        out["actualizados"] = total.actualizados
+    return out
+
+IMPORT_CHUNK_ROWS = 500
+IMPORT_MAX_ERRORES = 50
+
+
+async def _iter_lineas(request: Request) -> AsyncIterator[str]:
+    """Yield the request body line by line without buffering it whole."""
+
+    pendiente = b""
+    async for bloque in request.stream():
+        pendiente += bloque
+        *lineas, pendiente = pendiente.split(b"\n")
+        for linea in lineas:
+            yield linea.decode("utf-8-sig").rstrip("\r")
+    if pendiente:
+        yield pendiente.decode("utf-8-sig").rstrip("\r")
+
+
+@router.post("/importar", response_model=AsistenciaImportOut)
+async def importar_asistencias(
+    request: Request,
+    upsert: bool = True,
+    db: Session = Depends(get_db),
+    _: Usuario = Depends(require_role_and_view({"DOC", "ADMIN"}, "ASISTENCIAS")),
+):
+    """Import attendance for several days and asignaciones in one upload.
+
+    The body is NDJSON (one object per line) or, with ``Content-Type:
+    text/csv``, CSV with a header row; both carry ``fecha``,
+    ``asignacion_id``, ``estudiante_id``, ``estado`` and an optional
+    ``observacion``. Rows are parsed as they arrive and written in chunks of
+    ``IMPORT_CHUNK_ROWS`` with one upsert each, committing after every chunk,
+    so memory stays flat regardless of the file size.
+    """
+
+    es_csv = request.headers.get("content-type", "").startswith("text/csv")
+    encabezado: list[str] | None = None
+    matriculas = MatriculasPorAsignacion()
+    resultado = ResultadoAsistencia()
+    errores: list[AsistenciaImportError] = []
+    filas = invalidas = 0
+    lote: list[FilaAsistencia] = []
+
+    async def escribir() -> None:
+        parcial = await run_in_threadpool(
+            registrar_asistencias, db, lote, actualizar=upsert, matriculas=matriculas
+        )
+        await run_in_threadpool(db.commit)
+        alert_events.publicar(parcial.escritas)
+        resultado.sumar(parcial)
+        lote.clear()
+
+    numero = 0
+    async for linea in _iter_lineas(request):
+        numero += 1
+        if not linea.strip():
+            continue
+        try:
+            if es_csv and encabezado is None:
+                encabezado = parse_encabezado_csv(linea)
+                continue
+            fila = parse_fila_csv(linea, encabezado) if es_csv else parse_fila_ndjson(linea)
+        except ValueError as exc:
+            if es_csv and encabezado is None:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+            invalidas += 1
+            if len(errores) < IMPORT_MAX_ERRORES:
+                errores.append(AsistenciaImportError(linea=numero, detail=str(exc)))
             continue
 
-        db.add(Asistencia(
-            fecha=payload.fecha,
-            asignacion_id=payload.asignacion_id,
-            estudiante_id=item.estudiante_id,
-            estado=item.estado,
-            observacion=getattr(item, "observacion", None),
-        ))
-        inserciones += 1
+        filas += 1
+        lote.append(fila)
+        if len(lote) >= IMPORT_CHUNK_ROWS:
+            await escribir()
+    if lote:
+        await escribir()
 
-    db.commit()
-    return {"insertados": inserciones, "duplicados": duplicados, "no_matriculados": no_matric}
+    return AsistenciaImportOut(
+        filas=filas,
+        invalidas=invalidas,
+        total=AsistenciaResumen.model_validate(resultado.total),
+        por_asignacion={
+            asig_id: AsistenciaResumen.model_validate(resumen)
+            for asig_id, resumen in sorted(resultado.por_asignacion.items())
+        },
+        errores=errores,
+    )
 
 @router.get("/", response_model=list[AsistenciaOut])
-def listar_asistencias(
+async def listar_asistencias(
     asignacion_id: int = Query(..., gt=0),
     fecha: date | None = None,
     desde: date | None = None,
     hasta: date | None = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: Usuario = Depends(require_role_and_view({"ADMIN", "DOC"}, "ASISTENCIAS")),
 ):
-    q = db.query(Asistencia).where(Asistencia.asignacion_id == asignacion_id)
+    q = select(Asistencia).where(Asistencia.asignacion_id == asignacion_id)
     if fecha:
         q = q.where(Asistencia.fecha == fecha)
     if desde:
         q = q.where(Asistencia.fecha >= desde)
     if hasta:
         q = q.where(Asistencia.fecha <= hasta)
-    return q.order_by(Asistencia.fecha.asc(), Asistencia.estudiante_id.asc()).all()
+    filas = await db.scalars(q.order_by(Asistencia.fecha.asc(), Asistencia.estudiante_id.asc()))
+    return filas.all()
 
 @router.get("/estudiante/{est_id}", response_model=list[AsistenciaOut])
 def asistencias_estudiante(
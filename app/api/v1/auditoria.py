@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db
 from app.api.deps_extra import require_role_and_view
+from app.api.pagination import NEXT_CURSOR_HEADER, count_total, paginate_keyset
 from app.db.models import AuditLog, Usuario
 from app.schemas.audit import AuditLogPage
 
@@ -11,12 +12,15 @@ router = APIRouter(tags=["auditoria"])
 
 @router.get("/", response_model=AuditLogPage)
 def listar_auditoria(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=200),
     actor_id: int | None = Query(None, ge=1),
     accion: str | None = Query(None, min_length=1, max_length=60),
     entidad: str | None = Query(None, min_length=1, max_length=60),
+    cursor: str | None = Query(None),
+    with_total: bool | None = Query(None),
     _: Usuario = Depends(require_role_and_view({"admin"}, "AUDITORIA")),
 ) -> AuditLogPage:
     q = db.query(AuditLog)
@@ -27,12 +31,23 @@ def listar_auditoria(
     if entidad is not None:
         q = q.filter(AuditLog.entidad.ilike(f"%{entidad}%"))
 
-    total = q.count()
-    rows = (
-        q.order_by(AuditLog.creado_en.desc())
-        .offset((page - 1) * size)
-        .limit(size)
-        .all()
-    )
+    if with_total is None:
+        with_total = cursor is None
+    total = count_total(q) if with_total else None
+    if cursor is not None:
+        rows = paginate_keyset(q, [AuditLog.creado_en.desc(), AuditLog.id.desc()], cursor, size, response)
+    else:
+        rows = (
+            q.order_by(AuditLog.creado_en.desc())
+            .offset((page - 1) * size)
+            .limit(size)
+            .all()
+        )
 
-    return AuditLogPage(total=total, page=page, size=size, items=rows)
+    return AuditLogPage(
+        total=total,
+        page=page,
+        size=size,
+        items=rows,
+        next_cursor=response.headers.get(NEXT_CURSOR_HEADER),
+    )
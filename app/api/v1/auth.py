@@ -5,19 +5,24 @@ from __future__ import annotations
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, Field, ValidationError
 
-from app.api.deps import AuthContext, get_db
-from app.api.deps_extra import get_auth_context
+from app.api.deps import AuthContext, get_async_db
+from app.api.deps_extra import get_auth_context, require_role
 from app.core.permissions import permission_cache
+from app.core.rate_limit import client_ip_resolver, login_limiter
+from app.core.user_cache import user_cache
 from app.core.security import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    PasswordQueueFull,
     create_access_token,
-    hash_password,
-    verify_password,
+    needs_rehash,
+    password_hasher,
 )
-from app.db.models import EstadoUsuarioEnum, Usuario
+from app.db.models import EstadoUsuarioEnum, Rol, Usuario
 from app.schemas.usuarios import LoginResponse, SessionInfo, UsuarioOut
 
 
@@ -29,6 +34,14 @@ class LoginRequest(BaseModel):
     password: str
 
 
+def _servidor_ocupado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, intente nuevamente",
+        headers={"Retry-After": "1"},
+    )
+
+
 async def _parse_login_payload(request: Request) -> LoginRequest:
     """Accept credentials as JSON or form data for backwards compatibility."""
 
@@ -52,17 +65,29 @@ async def _parse_login_payload(request: Request) -> LoginRequest:
 async def login(
     request: Request,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> LoginResponse:
     credentials = await _parse_login_payload(request)
-
-    user = (
-        db.query(Usuario)
-        .options(selectinload(Usuario.persona), selectinload(Usuario.rol))
-        .filter(Usuario.username == credentials.username)
-        .first()
-    )
-    if not user or not verify_password(credentials.password, user.password_hash):
+    client_ip = client_ip_resolver.resolve(request.client.host if request.client else None, request.headers)
+    if not login_limiter.allow(credentials.username, client_ip):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos, intente más tarde",
+            headers={"Retry-After": str(int(login_limiter.window))},
+        )
+
+    user = (await db.execute(
+        select(Usuario)
+        .options(selectinload(Usuario.persona), selectinload(Usuario.rol).selectinload(Rol.vistas))
+        .where(Usuario.username == credentials.username)
+        .limit(1)
+    )).scalar()
+    try:
+        valido = user is not None and await password_hasher.verify(credentials.password, user.password_hash)
+    except PasswordQueueFull:
+        raise _servidor_ocupado() from None
+    if not valido:
+        login_limiter.register_failure(credentials.username, client_ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario o contraseña incorrectos")
 
     if user.estado != EstadoUsuarioEnum.ACTIVO:
@@ -71,7 +96,18 @@ async def login(
     if user.rol is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Rol no asignado")
 
-    permissions = permission_cache.get_permissions(db, user.rol_id)
+    login_limiter.reset(credentials.username)
+
+    if needs_rehash(user.password_hash):
+        # Si el pool está saturado se deja para el próximo inicio de sesión.
+        try:
+            user.password_hash = await password_hasher.hash(credentials.password)
+        except PasswordQueueFull:
+            pass
+        else:
+            await db.commit()
+
+    permissions = await db.run_sync(permission_cache.get_permissions, user.rol_id)
     token = create_access_token(
         {
             "user_id": user.id,
@@ -96,10 +132,27 @@ async def login(
     )
 
 
+@router.get("/login/limites")
+def limites_login(_: Usuario = Depends(require_role("ADMIN"))) -> dict[str, int]:
+    """Counters of login attempts allowed and rejected by the rate limiter."""
+
+    return login_limiter.stats()
+
+
 @router.get("/me", response_model=SessionInfo)
-def me(context: AuthContext = Depends(get_auth_context)) -> SessionInfo:
+async def me(
+    context: AuthContext = Depends(get_auth_context),
+    db: AsyncSession = Depends(get_async_db),
+) -> SessionInfo:
+    usuario = await db.get(
+        Usuario,
+        context.user_id,
+        options=[selectinload(Usuario.persona), selectinload(Usuario.rol).selectinload(Rol.vistas)],
+    )
+    if usuario is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
     return SessionInfo(
-        user=UsuarioOut.model_validate(context.user, from_attributes=True),
+        user=UsuarioOut.model_validate(usuario, from_attributes=True),
         rol_codigo=context.rol_codigo,
         permisos=sorted(context.permissions),
     )
@@ -130,16 +183,21 @@ class PasswordChangeIn(BaseModel):
 
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     payload: PasswordChangeIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     context: AuthContext = Depends(get_auth_context),
 ) -> dict[str, Any]:
-    usuario = context.user
-    if not verify_password(payload.old_password, usuario.password_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario o contraseña incorrectos")
-
-    usuario.password_hash = hash_password(payload.new_password)
-    db.add(usuario)
-    db.commit()
+    usuario = await db.get(Usuario, context.user_id)
+    if usuario is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
+    try:
+        if not await password_hasher.verify(payload.old_password, usuario.password_hash):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario o contraseña incorrectos")
+        usuario.password_hash = await password_hasher.hash(payload.new_password)
+    except PasswordQueueFull:
+        raise _servidor_ocupado() from None
+
+    await db.commit()
+    user_cache.invalidate_user(usuario.id)
     return {"detail": "Contraseña actualizada"}
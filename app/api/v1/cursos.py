@@ -1,20 +1,25 @@
 # app/api/v1/cursos.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.api.deps import get_db
 from app.api.deps_extra import require_role_and_view, require_view
+from app.api.pagination import paginate
 from app.db.models import Curso, Paralelo, Usuario
 
 router = APIRouter(tags=["cursos"])
 
 @router.get("/")
 def listar(
+    response:Response,
     offset:int=0,
     limit:int=50,
+    cursor:str|None=None,
+    with_total:bool=False,
     db:Session=Depends(get_db),
     _: Usuario = Depends(require_view("CURSOS")),
 ):
-    return db.query(Curso).offset(offset).limit(limit).all()
+    q = db.query(Curso)
+    return paginate(q, [Curso.id], response, limit, offset, cursor, with_total)
 
 @router.post("/")
 def crear_curso(
@@ -1,10 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.deps_extra import require_role_and_view, require_view
+from app.api.pagination import paginate
 from app.db.models import Docente, Persona, Usuario
 from app.schemas.docentes import DocenteCreate, DocenteOut, DocenteUpdate
 from app.services.personas import create_persona
@@ -14,16 +15,19 @@ router = APIRouter(tags=["docentes"])
 
 @router.get("/", response_model=List[DocenteOut])
 def listar_docentes(
+    response: Response,
     db: Session = Depends(get_db),
     persona_id: int | None = Query(None, ge=1),
     limit: int = Query(100, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    with_total: bool = Query(False),
     _: Usuario = Depends(require_view("DOCENTES")),
 ):
     q = db.query(Docente)
     if persona_id is not None:
         q = q.filter(Docente.persona_id == persona_id)
-    return q.order_by(Docente.id).offset(offset).limit(limit).all()
+    return paginate(q, [Docente.id], response, limit, offset, cursor, with_total)
 
 
 @router.get("/{docente_id}", response_model=DocenteOut)
@@ -1,10 +1,11 @@
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.api.pagination import paginate
 from app.db import models
 from app.schemas.estudiantes import EstudianteCreate, EstudianteOut
 from app.services.personas import create_persona
@@ -73,6 +74,7 @@ def crear_estudiante(payload: EstudianteCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[EstudianteOut])
 def listar_estudiantes(
+    response: Response,
     db: Session = Depends(get_db),
     persona_id: Optional[int] = Query(None, gt=0),
     codigo_rude: Optional[str] = Query(None, min_length=1),
@@ -80,6 +82,8 @@ def listar_estudiantes(
     offset: int = Query(0, ge=0),
     page: Optional[int] = Query(None, ge=1),
     page_size: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    with_total: bool = Query(False),
 ):
     q = db.query(models.Estudiante)
     if persona_id:
@@ -93,7 +97,9 @@ def listar_estudiantes(
     else:
         effective_offset = offset
 
-    return q.offset(effective_offset).limit(effective_limit).all()
+    return paginate(
+        q, [models.Estudiante.id], response, effective_limit, effective_offset, cursor, with_total
+    )
 
 @router.get("/{estudiante_id}", response_model=EstudianteOut)
 def obtener_estudiante(estudiante_id: int, db: Session = Depends(get_db)):
@@ -1,10 +1,11 @@
 # app/api/v1/evaluaciones.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 
 from app.api.deps import get_db
+from app.api.streaming import ListParams, listar, schema_columns
 from app.db.models import Evaluacion, AsignacionDocente
 from app.schemas.evaluaciones import EvaluacionCreate, EvaluacionOut
 
@@ -39,13 +40,16 @@ def crear_evaluacion(data: EvaluacionCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[EvaluacionOut])
 def listar_evaluaciones(
+    response: Response,
     asignacion_id: Optional[int] = Query(default=None, gt=0),
+    params: ListParams = Depends(),
     db: Session = Depends(get_db),
 ):
     q = db.query(Evaluacion)
     if asignacion_id:
         q = q.filter(Evaluacion.asignacion_id == asignacion_id)
-    return q.order_by(Evaluacion.fecha.desc(), Evaluacion.id.desc()).all()
+    orden = [Evaluacion.fecha.desc(), Evaluacion.id.desc()]
+    return listar(db, q, orden, params, response, lambda: schema_columns(Evaluacion, EvaluacionOut))
 
 @router.get("/{eval_id}", response_model=EvaluacionOut)
 def obtener_evaluacion(eval_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,81 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_read_db
+from app.api.deps_extra import require_role_and_view
+from app.api.streaming import stream_rows
+from app.db.models import Asistencia, AsignacionDocente, Evaluacion, Gestion, Nota, Usuario
+from app.services.exportacion import FormatoExportacion
+
+router = APIRouter(tags=["export"])
+
+
+def _validar_gestion(db: Session, gestion_id: int) -> None:
+    if db.get(Gestion, gestion_id) is None:
+        raise HTTPException(status_code=404, detail="Gestión no encontrada")
+
+
+@router.get("/notas")
+def exportar_notas(
+    gestion_id: int = Query(..., gt=0),
+    formato: FormatoExportacion = Query("csv"),
+    comprimido: bool = Query(False, alias="gzip"),
+    db: Session = Depends(get_read_db),
+    _: Usuario = Depends(require_role_and_view({"ADMIN"}, "REPORTES")),
+):
+    """Stream every grade of a gestión as CSV or NDJSON, optionally gzipped."""
+
+    _validar_gestion(db, gestion_id)
+    stmt = (
+        select(
+            Nota.id.label("nota_id"),
+            Evaluacion.asignacion_id,
+            Nota.evaluacion_id,
+            Evaluacion.titulo,
+            Evaluacion.fecha,
+            Evaluacion.ponderacion,
+            Nota.estudiante_id,
+            Nota.calificacion,
+        )
+        .join(Evaluacion, Evaluacion.id == Nota.evaluacion_id)
+        .join(AsignacionDocente, AsignacionDocente.id == Evaluacion.asignacion_id)
+        .where(AsignacionDocente.gestion_id == gestion_id)
+        .order_by(Evaluacion.asignacion_id, Nota.evaluacion_id, Nota.estudiante_id)
+    )
+    return stream_rows(db, stmt, formato, f"notas_{gestion_id}", comprimido)
+
+
+@router.get("/asistencias")
+def exportar_asistencias(
+    gestion_id: int = Query(..., gt=0),
+    desde: Optional[date] = Query(None),
+    hasta: Optional[date] = Query(None),
+    formato: FormatoExportacion = Query("csv"),
+    comprimido: bool = Query(False, alias="gzip"),
+    db: Session = Depends(get_read_db),
+    _: Usuario = Depends(require_role_and_view({"ADMIN"}, "REPORTES")),
+):
+    """Stream the attendance of a gestión as CSV or NDJSON, optionally gzipped."""
+
+    _validar_gestion(db, gestion_id)
+    stmt = (
+        select(
+            Asistencia.fecha,
+            Asistencia.asignacion_id,
+            Asistencia.estudiante_id,
+            Asistencia.estado,
+            Asistencia.observacion,
+        )
+        .join(AsignacionDocente, AsignacionDocente.id == Asistencia.asignacion_id)
+        .where(AsignacionDocente.gestion_id == gestion_id)
+        .order_by(Asistencia.asignacion_id, Asistencia.fecha, Asistencia.estudiante_id)
+    )
+    if desde is not None:
+        stmt = stmt.where(Asistencia.fecha >= desde)
+    if hasta is not None:
+        stmt = stmt.where(Asistencia.fecha <= hasta)
+    return stream_rows(db, stmt, formato, f"asistencias_{gestion_id}", comprimido)
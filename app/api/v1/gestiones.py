@@ -1,10 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.deps_extra import require_role_and_view, require_view
+from app.api.pagination import paginate
 from app.db.models import Gestion, Usuario
 from app.schemas.gestiones import GestionCreate, GestionOut, GestionUpdate
 
@@ -13,16 +14,20 @@ router = APIRouter(tags=["gestiones"])
 
 @router.get("/", response_model=List[GestionOut])
 def listar_gestiones(
+    response: Response,
     db: Session = Depends(get_db),
     solo_activas: bool = Query(False),
     limit: int = Query(100, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    with_total: bool = Query(False),
     _: Usuario = Depends(require_view("GESTIONES")),
 ):
-    q = db.query(Gestion).order_by(Gestion.fecha_inicio.desc())
+    q = db.query(Gestion)
     if solo_activas:
         q = q.filter(Gestion.activo == 1)
-    return q.offset(offset).limit(limit).all()
+    orden = [Gestion.fecha_inicio.desc(), Gestion.id.desc()]
+    return paginate(q, orden, response, limit, offset, cursor, with_total)
 
 
 @router.get("/{gestion_id}", response_model=GestionOut)
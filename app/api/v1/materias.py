@@ -1,10 +1,11 @@
 # app/api/v1/materias.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 #from app.api.deps_extra import require_role
 from app.api.deps_extra import require_view
+from app.api.streaming import ListParams, listar, schema_columns
 from app.db.models import Materia, Usuario
 from app.schemas.materias import MateriaCreate, MateriaOut, MateriaUpdate
 from sqlalchemy.exc import IntegrityError
@@ -19,10 +20,12 @@ router = APIRouter(
 
 @router.get("", response_model=list[MateriaOut])
 def listar_materias(
+    response: Response,
     q: str | None = Query(None),
     area: str | None = Query(None),
     estado: str | None = Query(None),
     incluir_inactivos: bool = Query(False, alias="incluir_inactivos"),
+    params: ListParams = Depends(),
     db: Session = Depends(get_db),
     _: Usuario = Depends(require_view("MATERIAS")),
 ):
@@ -44,7 +47,8 @@ def listar_materias(
         if estado_norm != "TODOS":
             query = query.filter(Materia.estado == estado_norm)
 
-    return query.order_by(Materia.nombre.asc()).all()
+    orden = [Materia.nombre.asc(), Materia.id.asc()]
+    return listar(db, query, orden, params, response, lambda: schema_columns(Materia, MateriaOut))
 
 @router.post("", response_model=MateriaOut, status_code=status.HTTP_201_CREATED)
 def crear_materia(
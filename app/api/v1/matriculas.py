@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.api.deps import get_db
 from app.api.deps_extra import require_view
+from app.api.streaming import ListParams, listar, schema_columns
 from app.db.models import Matricula, AsignacionDocente, Estudiante, Usuario
 from app.schemas.matriculas import MatriculaCreate, MatriculaRead
 
@@ -39,14 +40,17 @@ def create_matricula(
 
 @router.get("/", response_model=list[MatriculaRead])
 def list_matriculas(
+    response: Response,
     asignacion_id: int | None = None,
     estudiante_id: int | None = None,
+    params: ListParams = Depends(),
     db: Session = Depends(get_db),
     _: Usuario = Depends(require_view("MATRICULAS")),
 ):
-    stmt = select(Matricula)
+    q = db.query(Matricula)
     if asignacion_id is not None:
-        stmt = stmt.where(Matricula.asignacion_id == asignacion_id)
+        q = q.filter(Matricula.asignacion_id == asignacion_id)
     if estudiante_id is not None:
-        stmt = stmt.where(Matricula.estudiante_id == estudiante_id)
-    return db.execute(stmt).scalars().all()
+        q = q.filter(Matricula.estudiante_id == estudiante_id)
+    orden = [Matricula.id]
+    return listar(db, q, orden, params, response, lambda: schema_columns(Matricula, MatriculaRead))
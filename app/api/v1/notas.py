@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select
-from typing import List
-from app.api.deps import get_db
+from sqlalchemy import select
+from typing import List, Union
+from app.api.deps import get_async_db, get_db, get_read_db
 from app.api.deps_extra import require_view
 from app.db.models import Nota, Evaluacion, Estudiante, Matricula, Usuario
-from app.schemas.notas import NotaCreate, NotaOut
+from app.schemas.notas import NotaCreate, NotaMasivaIn, NotaMasivaModo, NotaMasivaResultado, NotaOut
+from app.services.agregados import promedios_estudiante, refrescar_agregados
+from app.services.alertas_eventos import alert_events
+from app.services.notas import registrar_notas_masivo, sincronizar_notas_masivo
 
 router = APIRouter()
 
@@ -48,51 +52,48 @@ def crear_nota(
     # 4) Crear la nota
     n = Nota(**data.model_dump())
     db.add(n)
+    db.flush()
+    refrescar_agregados(db, [(asig_id, n.estudiante_id)])
     db.commit()
     db.refresh(n)
+    alert_events.publicar([(asig_id, n.estudiante_id)])
     return n
 
 
 @router.get("/evaluacion/{evaluacion_id}", response_model=List[NotaOut])
-def notas_de_evaluacion(
+async def notas_de_evaluacion(
     evaluacion_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: Usuario = Depends(require_view("NOTAS")),
 ):
-    if not db.get(Evaluacion, evaluacion_id):
+    if not await db.get(Evaluacion, evaluacion_id):
         raise HTTPException(status_code=404, detail="Evaluación no encontrada")
-    return db.query(Nota).where(Nota.evaluacion_id == evaluacion_id).order_by(Nota.estudiante_id.asc()).all()
+    notas = await db.scalars(
+        select(Nota).where(Nota.evaluacion_id == evaluacion_id).order_by(Nota.estudiante_id.asc())
+    )
+    return notas.all()
 
 @router.get("/promedio-simple")
 def promedio_simple(
     estudiante_id: int = Query(..., gt=0),
     asignacion_id: int = Query(..., gt=0),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: Usuario = Depends(require_view("NOTAS")),
 ):
-    avg_val = db.query(func.avg(Nota.calificacion)).join(Evaluacion, Nota.evaluacion_id == Evaluacion.id).filter(
-        Nota.estudiante_id == estudiante_id,
-        Evaluacion.asignacion_id == asignacion_id
-    ).scalar()
-    return {"estudiante_id": estudiante_id, "asignacion_id": asignacion_id, "promedio_simple": float(avg_val or 0.0)}
+    promedios = promedios_estudiante(db, asignacion_id, estudiante_id)
+    return {"estudiante_id": estudiante_id, "asignacion_id": asignacion_id, "promedio_simple": promedios.simple}
 
 @router.get("/promedio-ponderado")
 def promedio_ponderado(
     estudiante_id: int = Query(..., gt=0),
     asignacion_id: int = Query(..., gt=0),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: Usuario = Depends(require_view("NOTAS")),
 ):
-    sum_prod, sum_pond = db.query(
-        func.coalesce(func.sum(Nota.calificacion * Evaluacion.ponderacion), 0.0),
-        func.coalesce(func.sum(Evaluacion.ponderacion), 0.0)
-    ).join(Evaluacion, Nota.evaluacion_id == Evaluacion.id).filter(
-        Nota.estudiante_id == estudiante_id,
-        Evaluacion.asignacion_id == asignacion_id
-    ).first()
-    if not sum_pond or float(sum_pond) == 0.0:
+    promedios = promedios_estudiante(db, asignacion_id, estudiante_id)
+    if promedios.ponderado is None:
         return {"estudiante_id": estudiante_id, "asignacion_id": asignacion_id, "promedio_ponderado": 0.0, "detalle": "Sin ponderaciones registradas"}
-    return {"estudiante_id": estudiante_id, "asignacion_id": asignacion_id, "promedio_ponderado": float(sum_prod)/float(sum_pond)}
+    return {"estudiante_id": estudiante_id, "asignacion_id": asignacion_id, "promedio_ponderado": promedios.ponderado}
 
 
 from pydantic import BaseModel, Field, conlist
@@ -112,62 +113,29 @@ def actualizar_nota(
     if not n:
         raise HTTPException(status_code=404, detail="Nota no encontrada")
     n.calificacion = body.calificacion
+    db.flush()
+    asig_id = db.execute(
+        select(Evaluacion.asignacion_id).where(Evaluacion.id == n.evaluacion_id)
+    ).scalar_one()
+    refrescar_agregados(db, [(asig_id, n.estudiante_id)])
     db.commit(); db.refresh(n)
+    alert_events.publicar([(asig_id, n.estudiante_id)])
     return n
 
-# app/api/v1/notas.py
-from pydantic import BaseModel, Field, conlist
-class NotaItem(BaseModel):
-    evaluacion_id: int
-    estudiante_id: int
-    calificacion: float
-class NotaMasivaIn(BaseModel):
-    items: list[NotaItem] = Field(min_length=1)
-
-@router.post("/bulk", response_model=List[NotaOut])
+@router.post("/bulk", response_model=Union[List[NotaOut], NotaMasivaResultado])
 def crear_notas_masivo(
     payload: NotaMasivaIn,
+    mode: NotaMasivaModo = "insert",
     db: Session = Depends(get_db),
     _: Usuario = Depends(require_view("NOTAS")),
 ):
-    out: list[Nota] = []
-
-    for item in payload.items:
-        # validaciones básicas
-        if not db.get(Evaluacion, item.evaluacion_id):
-            raise HTTPException(404, f"Evaluación {item.evaluacion_id} no encontrada")
-
-        if not db.get(Estudiante, item.estudiante_id):
-            raise HTTPException(404, f"Estudiante {item.estudiante_id} no encontrado")
-
-        # chequeo de matrícula (según lo agregaste)
-        eval_ = db.get(Evaluacion, item.evaluacion_id)
-        asig_id = eval_.asignacion_id
-        exists = db.execute(
-            select(Matricula.id).where(
-                Matricula.asignacion_id == asig_id,
-                Matricula.estudiante_id == item.estudiante_id,
-            )
-        ).scalar_one_or_none()
-        if not exists:
-            raise HTTPException(400, f"El estudiante {item.estudiante_id} no está matriculado en la asignación {asig_id}")
-
-        # evitar duplicados
-        dup = db.query(Nota).filter(
-            Nota.evaluacion_id == item.evaluacion_id,
-            Nota.estudiante_id == item.estudiante_id
-        ).first()
-        if dup:
-            raise HTTPException(400, f"La nota ya existe para estudiante {item.estudiante_id} en evaluación {item.evaluacion_id}")
-
-        out.append(Nota(
-            evaluacion_id=item.evaluacion_id,
-            estudiante_id=item.estudiante_id,
-            calificacion=item.calificacion
-        ))
-
-    db.add_all(out)
-    db.commit()
-    for n in out:
-        db.refresh(n)
-    return out
+    """Register grades in bulk.
+
+    ``mode=insert`` keeps the historical all-or-nothing behaviour and returns
+    the created grades. ``upsert`` and ``skip`` resolve existing grades with a
+    single upsert statement and return a per-item status report instead.
+    """
+
+    if mode == "insert":
+        return registrar_notas_masivo(db, payload.items)
+    return sincronizar_notas_masivo(db, payload.items, mode)
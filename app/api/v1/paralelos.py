@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from app.api.deps import get_db
 from app.api.deps_extra import require_view
+from app.api.streaming import ListParams, listar
 from app.db.models import Paralelo, Usuario
 
 router = APIRouter()
 
 @router.get("/")
 def listar_paralelos(
+    response: Response,
+    params: ListParams = Depends(),
     db: Session = Depends(get_db),
     _: Usuario = Depends(require_view("PARALELOS")),
 ):
-    return db.query(Paralelo).order_by(Paralelo.id.asc()).all()
+    q = db.query(Paralelo)
+    orden = [Paralelo.id.asc()]
+    return listar(db, q, orden, params, response, lambda: list(Paralelo.__table__.columns))
 
 @router.post("/")
 def crear_paralelo(
@@ -1,7 +1,9 @@
 # app/api/v1/personas.py
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from sqlalchemy import String, type_coerce
 from sqlalchemy.orm import Session
 from app.api.deps import get_db
+from app.api.streaming import ListParams, listar, schema_columns
 from app.db.models import Persona
 from app.schemas.personas import PersonaCreate, PersonaOut
 from app.services.personas import create_persona
@@ -9,9 +11,18 @@ from app.services.personas import create_persona
 router = APIRouter()
 
 @router.get("/", response_model=list[PersonaOut])
-def listar_personas(db: Session = Depends(get_db)):
-    personas = db.query(Persona).order_by(Persona.id).all()
-    return personas
+def listar_personas(
+    response: Response,
+    params: ListParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    q = db.query(Persona)
+    orden = [Persona.id]
+    # ``sexo`` se guarda con el código corto que expone ``PersonaOut``.
+    return listar(
+        db, q, orden, params, response,
+        lambda: schema_columns(Persona, PersonaOut, sexo=type_coerce(Persona.sexo, String)),
+    )
 
 
 @router.get("/{persona_id}", response_model=PersonaOut)
@@ -1,10 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.deps_extra import require_role_and_view, require_view
+from app.api.pagination import paginate
 from app.db.models import Curso, Materia, PlanCursoMateria, Usuario
 from app.schemas.planes import (
     PlanCursoMateriaCreate,
@@ -17,11 +18,14 @@ router = APIRouter(tags=["planes"])
 
 @router.get("/", response_model=List[PlanCursoMateriaOut])
 def listar_planes(
+    response: Response,
     db: Session = Depends(get_db),
     curso_id: int | None = Query(None, ge=1),
     materia_id: int | None = Query(None, ge=1),
     limit: int = Query(100, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    with_total: bool = Query(False),
     _: Usuario = Depends(require_view("PLANES")),
 ):
     q = db.query(PlanCursoMateria)
@@ -29,7 +33,7 @@ def listar_planes(
         q = q.filter(PlanCursoMateria.curso_id == curso_id)
     if materia_id is not None:
         q = q.filter(PlanCursoMateria.materia_id == materia_id)
-    return q.order_by(PlanCursoMateria.id).offset(offset).limit(limit).all()
+    return paginate(q, [PlanCursoMateria.id], response, limit, offset, cursor, with_total)
 
 
 @router.post(
@@ -1,31 +1,94 @@
+import hashlib
+import json
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
 
-from app.api.deps import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_read_db
 from app.api.deps_extra import require_view
-from app.db.models import Nota, Evaluacion, Usuario
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.db.models import AsignacionDocente, Nota, Evaluacion, Usuario
+from app.services.agregados import promedios_asignacion
+from app.services.reportes import construir_gradebook
 
 router = APIRouter(tags=["reportes"])
 
+# Tamaño de página de notas_estudiante cuando se pagina sin ``limit``
+NOTAS_PAGE_SIZE = 200
+
 @router.get("/estudiante/{est_id}/notas")
-def notas_estudiante(
+async def notas_estudiante(
     est_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    gestion_id: Optional[int] = Query(None, gt=0),
+    asignacion_id: Optional[int] = Query(None, gt=0),
+    desde: Optional[date] = Query(None),
+    hasta: Optional[date] = Query(None),
+    group_by: Optional[Literal["asignacion"]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
     _: Usuario = Depends(require_view("REPORTES")),
 ):
-    q = (
-        db.query(
-            Evaluacion.titulo,
-            Evaluacion.fecha,
-            Nota.calificacion,
-            Evaluacion.asignacion_id
+    """Grades of a student, oldest first.
+
+    Without ``limit`` or ``cursor`` every grade is returned. Otherwise rows
+    come in pages of ``limit`` (200 by default) keyed on ``(fecha,
+    evaluacion id)``: the first page is requested with ``limit`` or an empty
+    ``cursor``, and while more rows remain the token for the next page is
+    returned in the ``X-Next-Cursor`` header and passed back as ``cursor``.
+    With ``group_by=asignacion`` the same filters
+    return one row per asignación with its simple and weighted average,
+    computed by a single grouped query.
+    """
+
+    filtros = [Nota.estudiante_id == est_id]
+    if asignacion_id is not None:
+        filtros.append(Evaluacion.asignacion_id == asignacion_id)
+    if desde is not None:
+        filtros.append(Evaluacion.fecha >= desde)
+    if hasta is not None:
+        filtros.append(Evaluacion.fecha <= hasta)
+    if gestion_id is not None:
+        filtros.append(
+            Evaluacion.asignacion_id.in_(
+                select(AsignacionDocente.id).where(AsignacionDocente.gestion_id == gestion_id)
+            )
+        )
+
+    if group_by == "asignacion":
+        return await _promedios_por_asignacion(db, filtros)
+
+    paginado = limit is not None or cursor is not None
+    limit = limit or NOTAS_PAGE_SIZE
+    if cursor:
+        fecha, eval_id = decode_cursor(cursor, 2)
+        try:
+            fecha, eval_id = date.fromisoformat(fecha), int(eval_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor inválido") from None
+        filtros.append(
+            or_(
+                Evaluacion.fecha > fecha,
+                and_(Evaluacion.fecha == fecha, Evaluacion.id > eval_id),
+            )
         )
+
+    stmt = (
+        select(Evaluacion.titulo, Evaluacion.fecha, Nota.calificacion, Evaluacion.asignacion_id, Evaluacion.id)
         .join(Nota, Nota.evaluacion_id == Evaluacion.id)
-        .filter(Nota.estudiante_id == est_id)
+        .where(*filtros)
         .order_by(Evaluacion.fecha.asc(), Evaluacion.id.asc())
     )
+    if paginado:
+        stmt = stmt.limit(limit + 1)
+    filas = (await db.execute(stmt)).all()
+    if paginado and len(filas) > limit:
+        filas = filas[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([filas[-1].fecha, filas[-1].id])
     return [
         {
             "titulo": t,
@@ -33,23 +96,66 @@ def notas_estudiante(
             "calificacion": float(c),
             "asignacion_id": int(a),
         }
-        for (t, f, c, a) in q
+        for (t, f, c, a, _) in filas
+    ]
+
+
+async def _promedios_por_asignacion(db: AsyncSession, filtros: list) -> list[dict]:
+    q = (
+        select(
+            Evaluacion.asignacion_id,
+            func.count(Nota.id),
+            func.avg(Nota.calificacion),
+            func.sum(Nota.calificacion * Evaluacion.ponderacion),
+            func.sum(Evaluacion.ponderacion),
+        )
+        .join(Nota, Nota.evaluacion_id == Evaluacion.id)
+        .where(*filtros)
+        .group_by(Evaluacion.asignacion_id)
+        .order_by(Evaluacion.asignacion_id.asc())
+    )
+    return [
+        {
+            "asignacion_id": int(a),
+            "cantidad": int(n),
+            "promedio_simple": float(prom),
+            "promedio_ponderado": float(suma_pond) / float(pond) if pond else None,
+        }
+        for (a, n, prom, suma_pond, pond) in await db.execute(q)
     ]
 
 @router.get("/curso/{asig_id}/promedios")
-def promedios_curso(
+async def promedios_curso(
     asig_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     _: Usuario = Depends(require_view("REPORTES")),
 ):
-    q = (
-        db.query(
-            Nota.estudiante_id,
-            func.avg(Nota.calificacion)
-        )
-        .join(Evaluacion, Nota.evaluacion_id == Evaluacion.id)
-        .filter(Evaluacion.asignacion_id == asig_id)
-        .group_by(Nota.estudiante_id)
-        .order_by(Nota.estudiante_id.asc())
-    )
-    return [{"estudiante_id": int(e), "promedio": float(p)} for (e, p) in q]
+    promedios = await db.run_sync(promedios_asignacion, [asig_id])
+    return [{"estudiante_id": e, "promedio": p.simple} for (_, e), p in promedios.items()]
+
+
+@router.get("/asignacion/{asig_id}/gradebook")
+async def gradebook(
+    asig_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    _: Usuario = Depends(require_view("REPORTES")),
+):
+    """Whole-class grade matrix in one response.
+
+    ``notas[i][j]`` is the grade of ``estudiantes[i]`` in ``evaluaciones[j]``.
+    The ``ETag`` is a hash of the body; clients sending it back in
+    ``If-None-Match`` get a ``304`` while nothing changed.
+    """
+
+    if await db.get(AsignacionDocente, asig_id) is None:
+        raise HTTPException(status_code=404, detail="Asignación no encontrada")
+
+    datos = await db.run_sync(construir_gradebook, asig_id)
+    body = json.dumps(datos, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    enviados = {t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")}
+    if etag in enviados or "*" in enviados:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,15 +5,17 @@ from __future__ import annotations
 import json
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
 from app.api.deps import AuthContext, get_db
 from app.api.deps_extra import get_auth_context, require_permission
+from app.api.pagination import paginate
 from app.core.audit import registrar_auditoria
-from app.core.permissions import permission_cache
+from app.core.permissions import bump_version, permission_cache
+from app.core.user_cache import user_cache
 from app.db.models import Rol
 from app.schemas.roles import RolCreate, RolOut, RolUpdate
 
@@ -23,20 +25,16 @@ router = APIRouter(tags=["roles"])
 
 @router.get("/", response_model=List[RolOut])
 def listar_roles(
+    response: Response,
     db: Session = Depends(get_db),
     limit: int = Query(100, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    with_total: bool = Query(False),
     _: AuthContext = Depends(require_permission("ROLES")),
 ) -> List[RolOut]:
-    roles = (
-        db.query(Rol)
-        .options(selectinload(Rol.vistas))
-        .order_by(Rol.id)
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    return roles
+    query = db.query(Rol).options(selectinload(Rol.vistas))
+    return paginate(query, [Rol.id], response, limit, offset, cursor, with_total)
 
 
 @router.get("/{rol_id}", response_model=RolOut)
@@ -83,6 +81,7 @@ def crear_rol(
         )
         created = result.mappings().first()
         result.close()
+        bump_version(db)
         db.commit()
     except IntegrityError as exc:
         db.rollback()
@@ -98,7 +97,7 @@ def crear_rol(
     permission_cache.invalidate_role(role_id)
     registrar_auditoria(
         db,
-        actor_id=context.user.id,
+        actor_id=context.user_id,
         accion="CREAR",
         entidad="ROL",
         entidad_id=role_id,
@@ -158,12 +157,14 @@ def actualizar_rol(
             db.rollback()
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Vista duplicada") from exc
 
+    bump_version(db)
     db.commit()
 
     permission_cache.invalidate_role(rol_id)
+    user_cache.invalidate_role(rol_id)
     registrar_auditoria(
         db,
-        actor_id=context.user.id,
+        actor_id=context.user_id,
         accion="ACTUALIZAR",
         entidad="ROL",
         entidad_id=rol_id,
@@ -12,6 +12,7 @@ from . import (
     cursos,
     evaluaciones,
     estudiantes,
+    exportar,
     gestiones,
     matriculas,
     niveles,
@@ -21,6 +22,7 @@ from . import (
     planes,
     reportes,
     roles,
+    sistema,
     usuarios,
     vistas,
     auditoria,
@@ -48,6 +50,8 @@ api_router.include_router(asistencia.router,   prefix="/asistencias",  tags=["as
 api_router.include_router(asignaciones.router, prefix="/asignaciones", tags=["asignaciones"])
 api_router.include_router(matriculas.router,   prefix="/matriculas",   tags=["matriculas"])
 api_router.include_router(reportes.router,     prefix="/reportes",     tags=["reportes"])
+api_router.include_router(exportar.router,     prefix="/export",       tags=["export"])
 api_router.include_router(alertas.router, prefix="/alertas", tags=["alertas"])
 api_router.include_router(auditoria.router,    prefix="/auditoria",   tags=["auditoria"])
 api_router.include_router(vistas.router,       prefix="/vistas",       tags=["vistas"])
+api_router.include_router(sistema.router,      prefix="/sistema",      tags=["sistema"])
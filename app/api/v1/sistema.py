@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.api.deps_extra import require_role
+from app.db.models import Usuario
+from app.db.session import async_pool_stats, pool_stats, session_usage
+
+router = APIRouter(tags=["sistema"])
+
+
+@router.get("/db-pool")
+def estado_pool(
+    db: Session = Depends(get_db),
+    _: Usuario = Depends(require_role("ADMIN")),
+) -> dict[str, Any]:
+    """Connection pool occupancy, checkout waits and session usage of this worker.
+
+    ``async`` holds the same figures for the async engine's pool, or ``None``
+    while this worker has not served an async endpoint.
+    """
+
+    return {
+        **pool_stats(db.get_bind()),
+        "async": async_pool_stats(),
+        "sesiones": session_usage.stats(),
+    }
@@ -4,15 +4,17 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
 from app.api.deps import AuthContext, get_db
 from app.api.deps_extra import get_auth_context, require_permission
+from app.api.pagination import paginate
 from app.core.audit import registrar_auditoria
 from app.core.permissions import permission_cache
 from app.core.security import hash_password
+from app.core.user_cache import user_cache
 from app.db.models import EstadoUsuarioEnum, Persona, Rol, Usuario
 from app.schemas.usuarios import (
     SessionInfo,
@@ -29,24 +31,25 @@ router = APIRouter(tags=["usuarios"])
 
 @router.get("/", response_model=List[UsuarioOut])
 def listar_usuarios(
+    response: Response,
     db: Session = Depends(get_db),
     limit: int = Query(100, ge=1, le=200),
     offset: int = Query(0, ge=0),
     rol_id: int | None = Query(None, ge=1),
     estado: EstadoUsuarioEnum | None = Query(None),
+    cursor: str | None = Query(None),
+    with_total: bool = Query(False),
     _: Usuario = Depends(require_permission("USUARIOS")),
 ) -> List[UsuarioOut]:
     query = (
         db.query(Usuario)
         .options(selectinload(Usuario.persona), selectinload(Usuario.rol))
-        .order_by(Usuario.id)
     )
     if rol_id is not None:
         query = query.filter(Usuario.rol_id == rol_id)
     if estado is not None:
         query = query.filter(Usuario.estado == estado)
-    usuarios = query.offset(offset).limit(limit).all()
-    return usuarios
+    return paginate(query, [Usuario.id], response, limit, offset, cursor, with_total)
 
 
 @router.get("/{usuario_id}", response_model=UsuarioOut)
@@ -107,7 +110,7 @@ def crear_usuario(
 
     registrar_auditoria(
         db,
-        actor_id=context.user.id,
+        actor_id=context.user_id,
         accion="CREAR",
         entidad="USUARIO",
         entidad_id=usuario.id,
@@ -147,11 +150,12 @@ def actualizar_usuario(
 
     db.add(usuario)
     db.commit()
+    user_cache.invalidate_user(usuario.id)
     db.refresh(usuario)
 
     registrar_auditoria(
         db,
-        actor_id=context.user.id,
+        actor_id=context.user_id,
         accion="ACTUALIZAR",
         entidad="USUARIO",
         entidad_id=usuario.id,
@@ -187,11 +191,12 @@ def actualizar_rol_usuario(
     usuario.rol_id = payload.rol_id
     db.add(usuario)
     db.commit()
+    user_cache.invalidate_user(usuario.id)
     db.refresh(usuario)
 
     registrar_auditoria(
         db,
-        actor_id=context.user.id,
+        actor_id=context.user_id,
         accion="CAMBIAR_ROL",
         entidad="USUARIO",
         entidad_id=usuario.id,
@@ -228,11 +233,12 @@ def actualizar_password_usuario(
     usuario.password_hash = hash_password(payload.password)
     db.add(usuario)
     db.commit()
+    user_cache.invalidate_user(usuario.id)
     db.refresh(usuario)
 
     registrar_auditoria(
         db,
-        actor_id=context.user.id,
+        actor_id=context.user_id,
         accion="CAMBIAR_PASSWORD",
         entidad="USUARIO",
         entidad_id=usuario.id,
@@ -1,10 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.deps_extra import require_view
+from app.api.streaming import ListParams, listar, schema_columns
 from app.db.models import Usuario, Vista
 from app.schemas.roles import VistaOut
 
@@ -13,7 +14,11 @@ router = APIRouter(tags=["vistas"])
 
 @router.get("/", response_model=List[VistaOut])
 def listar_vistas(
+    response: Response,
+    params: ListParams = Depends(),
     db: Session = Depends(get_db),
     _: Usuario = Depends(require_view("VISTAS")),
 ):
-    return db.query(Vista).order_by(Vista.nombre).all()
+    q = db.query(Vista)
+    orden = [Vista.nombre, Vista.id]
+    return listar(db, q, orden, params, response, lambda: schema_columns(Vista, VistaOut))
@@ -1,5 +1,7 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal
+
 from pydantic import computed_field
 
 class Settings(BaseSettings):
@@ -11,10 +13,61 @@ class Settings(BaseSettings):
     DB_NAME: str = "academico"
     DB_USER: str = "appuser"
     DB_PASS: str = "app_password"
+    # Driver de los endpoints async (get_async_db)
+    DB_ASYNC_DRIVER: str = "mysql+aiomysql"
+
+    # Pool de conexiones: pool + overflow debería cubrir el threadpool (40 hilos)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+
+    # Réplica de lectura (URL SQLAlchemy del driver sync) y segundos que un
+    # cliente sigue leyendo del primario tras escribir
+    DB_REPLICA_URL: str | None = None
+    DB_REPLICA_STICKY_SECONDS: int = 5
+
+    # Umbral del log de consultas lentas del middleware query_metrics
+    SLOW_QUERY_MS: float = 200.0
 
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     JWT_ALGORITHM: str = "HS256"
+    # "builtin" verifica HS256 con hmac/hashlib; "jose" usa python-jose
+    JWT_VERIFIER: Literal["builtin", "jose"] = "builtin"
+    JWT_CACHE_MAX_ENTRIES: int = 4096
+
+    # Costo de bcrypt y pool que lo ejecuta fuera del event loop
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Intentos fallidos de login por ventana deslizante
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 60.0
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 5
+    # 0 desactiva el límite por IP
+    LOGIN_RATE_LIMIT_PER_IP: int | None = 50
+    # Proxies (IP o CIDR separados por coma) de los que se acepta
+    # X-Forwarded-For/Forwarded como IP del cliente
+    TRUSTED_PROXIES: str = ""
+
+    # Cache de usuarios autenticados en require_auth
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 1024
+    # Cada cuánto se relee permissions_version para invalidar permisos
+    PERMISSIONS_VERSION_CHECK_SECONDS: float = 5.0
+
+    # Umbrales de alerta por defecto (endpoints y gestiones sin recálculo previo)
+    ALERT_UMBRAL_PROM: int = 51
+    ALERT_FALTAS_MAX: int = 3
+    ALERT_DIAS: int = 30
+
+    # Recalculo de alertas en segundo plano
+    ALERT_JOBS_MAX_WORKERS: int = 2
+    ALERT_JOBS_MAX_POR_GESTION: int = 1
+    ALERT_JOBS_TIMEOUT_MINUTES: int = 60
+    ALERT_EVENTS_DEBOUNCE_SECONDS: float = 2.0
 
     @computed_field
     @property
@@ -24,4 +77,12 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
         )
 
+    @computed_field
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return (
+            f"{self.DB_ASYNC_DRIVER}://{self.DB_USER}:{self.DB_PASS}"
+            f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
+        )
+
 settings = Settings()
@@ -2,63 +2,176 @@
 
 from __future__ import annotations
 
+import time
+from collections.abc import Iterator, Mapping, Set as AbstractSet
+from dataclasses import dataclass
 from threading import RLock
-from typing import FrozenSet, Iterable
+from types import MappingProxyType
+from typing import Iterable
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from app.db.models import Vista, rol_vistas
+from app.core.config import settings
+from app.db.models import PermissionsVersion, Vista, rol_vistas
 
 
-class RolePermissionCache:
-    """In-memory cache that stores permissions per role identifier."""
+PERMISSIONS_VERSION_ID = 1
 
-    def __init__(self) -> None:
-        self._store: dict[int, FrozenSet[str]] = {}
-        self._lock = RLock()
 
-    def get_permissions(self, db: Session, role_id: int) -> FrozenSet[str]:
-        """Return the set of permission codes granted to ``role_id``."""
+def current_version(db: Session) -> int:
+    """Return the generation stored in ``permissions_version`` (0 if unset)."""
 
-        with self._lock:
-            cached = self._store.get(role_id)
-        if cached is not None:
-            return cached
-
-        result = (
-            db.execute(
-                select(Vista.codigo)
-                .join(rol_vistas, Vista.id == rol_vistas.c.vista_id)
-                .where(rol_vistas.c.rol_id == role_id)
-            )
-            .scalars()
-            .all()
+    version = db.execute(
+        select(PermissionsVersion.version).where(PermissionsVersion.id == PERMISSIONS_VERSION_ID)
+    ).scalar()
+    return version or 0
+
+
+def bump_version(db: Session) -> None:
+    """Increment the permission generation inside the caller's transaction."""
+
+    result = db.execute(
+        update(PermissionsVersion)
+        .where(PermissionsVersion.id == PERMISSIONS_VERSION_ID)
+        .values(version=PermissionsVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(PermissionsVersion).values(id=PERMISSIONS_VERSION_ID, version=1))
+
+
+class PermissionSet(AbstractSet[str]):
+    """Permissions of one role stored as a bitmask over the vista codes.
+
+    Membership is a bit test against the ``code -> bit`` table of the
+    :class:`PermissionMatrix` it came from; it compares equal to a frozenset
+    of the same codes.
+    """
+
+    __slots__ = ("mask", "_bits", "_codes")
+
+    def __init__(self, mask: int, bits: Mapping[str, int], codes: tuple[str, ...]) -> None:
+        self.mask = mask
+        self._bits = bits
+        self._codes = codes
+
+    def __contains__(self, code: object) -> bool:
+        bit = self._bits.get(code)  # type: ignore[arg-type]
+        return bit is not None and (self.mask >> bit) & 1 == 1
+
+    def __iter__(self) -> Iterator[str]:
+        return (code for i, code in enumerate(self._codes) if (self.mask >> i) & 1)
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __repr__(self) -> str:
+        return f"PermissionSet({sorted(self)!r})"
+
+    __hash__ = AbstractSet._hash
+
+
+@dataclass(frozen=True, slots=True)
+class PermissionMatrix:
+    """Immutable snapshot of the whole role/vista permission matrix."""
+
+    version: int
+    bits: Mapping[str, int]
+    roles: Mapping[int, PermissionSet]
+
+    @classmethod
+    def load(cls, db: Session, version: int) -> "PermissionMatrix":
+        """Read every vista code and role grant with one query."""
+
+        rows = db.execute(
+            select(Vista.codigo, rol_vistas.c.rol_id)
+            .outerjoin(rol_vistas, Vista.id == rol_vistas.c.vista_id)
+            .order_by(Vista.id)
+        ).all()
+        bits: dict[str, int] = {}
+        masks: dict[int, int] = {}
+        for codigo, rol_id in rows:
+            bit = bits.setdefault(codigo, len(bits))
+            if rol_id is not None:
+                masks[rol_id] = masks.get(rol_id, 0) | (1 << bit)
+        codes = tuple(bits)
+        bits_ro = MappingProxyType(bits)
+        return cls(
+            version=version,
+            bits=bits_ro,
+            roles=MappingProxyType(
+                {rol_id: PermissionSet(mask, bits_ro, codes) for rol_id, mask in masks.items()}
+            ),
         )
-        permissions = frozenset(result)
-        with self._lock:
-            self._store[role_id] = permissions
+
+    def for_role(self, role_id: int) -> PermissionSet:
+        permissions = self.roles.get(role_id)
+        if permissions is None:
+            return PermissionSet(0, self.bits, ())
         return permissions
 
-    def invalidate_role(self, role_id: int) -> None:
-        """Remove cached permissions for ``role_id`` if present."""
 
+class RolePermissionCache:
+    """Cache of the permission matrix shared by every role.
+
+    The matrix belongs to the generation read from ``permissions_version``.
+    The generation is re-read at most every ``check_interval`` seconds and
+    the matrix is reloaded, in one query, when it changed; invalidations
+    made by another worker are therefore seen within that interval. Each
+    reload builds a new :class:`PermissionMatrix` and swaps it in whole.
+    """
+
+    def __init__(self, check_interval: float = 5.0) -> None:
+        self.check_interval = check_interval
+        self._matrix: PermissionMatrix | None = None
+        self._checked_at = float("-inf")
+        self._lock = RLock()
+
+    def load(self, db: Session) -> PermissionMatrix:
+        """Read the current generation and matrix and publish them."""
+
+        version = current_version(db)
+        matrix = PermissionMatrix.load(db, version)
         with self._lock:
-            self._store.pop(role_id, None)
+            self._matrix = matrix
+            self._checked_at = time.monotonic()
+        return matrix
+
+    def _current(self, db: Session) -> PermissionMatrix:
+        matrix = self._matrix
+        if matrix is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return matrix
+        if matrix is not None and current_version(db) == matrix.version:
+            with self._lock:
+                self._checked_at = time.monotonic()
+            return matrix
+        return self.load(db)
+
+    def get_permissions(self, db: Session, role_id: int) -> PermissionSet:
+        """Return the set of permission codes granted to ``role_id``."""
+
+        return self._current(db).for_role(role_id)
+
+    def invalidate_role(self, role_id: int) -> None:
+        """Force a reload of the matrix on the next lookup.
+
+        Only affects this process; role writes must also call
+        :func:`bump_version` so the other workers reload theirs.
+        """
+
+        self.clear()
 
     def invalidate_many(self, role_ids: Iterable[int]) -> None:
-        """Remove cached permissions for several roles."""
+        """Force a reload of the matrix on the next lookup."""
 
-        with self._lock:
-            for role_id in role_ids:
-                self._store.pop(role_id, None)
+        self.clear()
 
     def clear(self) -> None:
-        """Remove all cached permission entries."""
+        """Drop the cached matrix."""
 
         with self._lock:
-            self._store.clear()
-
+            self._matrix = None
+            self._checked_at = float("-inf")
 
-permission_cache = RolePermissionCache()
 
+permission_cache = RolePermissionCache(check_interval=settings.PERMISSIONS_VERSION_CHECK_SECONDS)
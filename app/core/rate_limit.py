@@ -0,0 +1,187 @@
+"""Sliding-window limiter for failed login attempts."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+from threading import Lock
+from typing import Iterable, Protocol
+
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+
+
+class RateLimitStore(Protocol):
+    """Storage of attempt timestamps per key.
+
+    The in-memory store only limits a single worker; a shared implementation
+    (e.g. Redis sorted sets) can be passed to :class:`LoginRateLimiter` to
+    apply the limits across processes.
+    """
+
+    def count(self, key: str, since: float) -> int:
+        """Number of attempts recorded for ``key`` at or after ``since``."""
+
+    def add(self, key: str, now: float) -> None:
+        """Record an attempt for ``key`` at ``now``."""
+
+    def reset(self, key: str) -> None:
+        """Forget every attempt recorded for ``key``."""
+
+
+class MemoryRateLimitStore:
+    """Per-process :class:`RateLimitStore` bounded to ``max_keys`` keys."""
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self.max_keys = max_keys
+        self._hits: OrderedDict[str, deque[float]] = OrderedDict()
+        self._lock = Lock()
+
+    def count(self, key: str, since: float) -> int:
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                return 0
+            while hits and hits[0] < since:
+                hits.popleft()
+            if not hits:
+                del self._hits[key]
+                return 0
+            return len(hits)
+
+    def add(self, key: str, now: float) -> None:
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+            hits.append(now)
+            self._hits.move_to_end(key)
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._hits.pop(key, None)
+
+
+def _forwarded_for(headers: Headers) -> list[str]:
+    """Client chain from ``Forwarded`` or, if absent, ``X-Forwarded-For``."""
+
+    chain: list[str] = []
+    forwarded = headers.getlist("forwarded")
+    if forwarded:
+        for element in ",".join(forwarded).split(","):
+            for pair in element.split(";"):
+                name, _, value = pair.strip().partition("=")
+                if name.lower() == "for" and value:
+                    chain.append(_strip_port(value.strip('"')))
+        return chain
+    for value in headers.getlist("x-forwarded-for"):
+        chain.extend(hop.strip() for hop in value.split(",") if hop.strip())
+    return chain
+
+
+def _strip_port(node: str) -> str:
+    if node.startswith("["):
+        return node[1:].partition("]")[0]
+    if node.count(":") == 1:
+        return node.partition(":")[0]
+    return node
+
+
+class ClientIPResolver:
+    """Resolve the client IP of a request behind trusted reverse proxies.
+
+    The forwarding headers are only read when the socket peer is one of the
+    ``trusted_proxies``; the chain is then walked from the right and the
+    first hop that is not a trusted proxy is the client. Without trusted
+    proxies the peer address is always used.
+    """
+
+    def __init__(self, trusted_proxies: Iterable[str]) -> None:
+        self.trusted: tuple[IPv4Network | IPv6Network, ...] = tuple(
+            ip_network(proxy, strict=False) for proxy in trusted_proxies
+        )
+
+    @classmethod
+    def from_setting(cls, value: str) -> "ClientIPResolver":
+        return cls(proxy.strip() for proxy in value.split(",") if proxy.strip())
+
+    def is_trusted(self, ip: str) -> bool:
+        try:
+            address = ip_address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted)
+
+    def resolve(self, peer: str | None, headers: Headers) -> str | None:
+        if peer is None or not self.trusted or not self.is_trusted(peer):
+            return peer
+        chain = _forwarded_for(headers)
+        for hop in reversed(chain):
+            if not self.is_trusted(hop):
+                return hop
+        return chain[0] if chain else peer
+
+
+class LoginRateLimiter:
+    """Limit failed logins per username and per client IP.
+
+    :meth:`allow` is checked before the user lookup and the password hash,
+    so a blocked client costs no database query and no bcrypt round. A
+    falsy ``per_ip`` disables the per-IP limit.
+    """
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        window: float,
+        per_username: int,
+        per_ip: int | None,
+    ) -> None:
+        self.store = store
+        self.window = window
+        self.per_username = per_username
+        self.per_ip = per_ip
+        self.allowed = 0
+        self.limited = 0
+
+    def _keys(self, username: str, ip: str | None) -> list[tuple[str, int]]:
+        keys = [(f"user:{username.lower()}", self.per_username)]
+        if ip and self.per_ip:
+            keys.append((f"ip:{ip}", self.per_ip))
+        return keys
+
+    def allow(self, username: str, ip: str | None) -> bool:
+        since = time.time() - self.window
+        for key, limit in self._keys(username, ip):
+            if self.store.count(key, since) >= limit:
+                self.limited += 1
+                return False
+        self.allowed += 1
+        return True
+
+    def register_failure(self, username: str, ip: str | None) -> None:
+        now = time.time()
+        for key, _ in self._keys(username, ip):
+            self.store.add(key, now)
+
+    def reset(self, username: str) -> None:
+        """Clear the username window after a successful login."""
+
+        self.store.reset(f"user:{username.lower()}")
+
+    def stats(self) -> dict[str, int]:
+        return {"permitidos": self.allowed, "limitados": self.limited}
+
+
+login_limiter = LoginRateLimiter(
+    store=MemoryRateLimitStore(),
+    window=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    per_username=settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+)
+
+client_ip_resolver = ClientIPResolver.from_setting(settings.TRUSTED_PROXIES)
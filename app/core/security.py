@@ -1,6 +1,15 @@
 # app/core/security.py
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Mapping
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Mapping, TypeVar
 
 from fastapi import HTTPException
 from jose import JWTError, jwt
@@ -9,7 +18,14 @@ from passlib.context import CryptContext
 from app.core.config import settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
+# min = max = rounds: needs_update() marca para rehash los hashes de otro costo.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.JWT_ALGORITHM  # <-- aquí el cambio
@@ -21,6 +37,63 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+def needs_rehash(hashed: str) -> bool:
+    return pwd_context.needs_update(hashed)
+
+
+T = TypeVar("T")
+
+
+class PasswordQueueFull(Exception):
+    """Raised when the password executor already has its maximum backlog."""
+
+
+class PasswordHasher:
+    """Run bcrypt on a bounded thread pool so async endpoints can await it.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without blocking the event loop. At most ``max_workers + max_pending``
+    calls are admitted at once; further ones fail fast with
+    :class:`PasswordQueueFull` instead of queueing without limit.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self.max_workers = max_workers
+        self._slots = BoundedSemaphore(max_workers + max_pending)
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> "asyncio.Future[T]":
+        if not self._slots.acquire(blocking=False):
+            raise PasswordQueueFull()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return asyncio.wrap_future(future)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._submit(verify_password, plain, hashed)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
 def create_access_token(
     claims: Mapping[str, Any], expires_minutes: int | None = None
 ) -> str:
@@ -30,8 +103,97 @@ def create_access_token(
     payload.update({"exp": expire})
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def decode_hs256(token: str, key: str) -> dict:
+    """Verify an HS256 token with the standard library.
+
+    Covers what ``create_access_token`` emits (signature and ``exp``) and
+    skips python-jose's generic key and claim handling.
+    """
+
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        signature = _b64decode(signature_b64)
+    except ValueError:
+        raise JWTError("Token mal formado") from None
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        raise JWTError("Algoritmo no permitido")
+    expected = hmac.new(key.encode(), f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise JWTError("Firma inválida")
+    try:
+        payload = json.loads(_b64decode(payload_b64))
+    except ValueError:
+        raise JWTError("Token mal formado") from None
+    if not isinstance(payload, dict):
+        raise JWTError("Token mal formado")
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise JWTError("exp inválido")
+        if exp <= time.time():
+            raise JWTError("Token expirado")
+    return payload
+
+def decode_jose(token: str, key: str) -> dict:
+    return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+
+class TokenCache:
+    """LRU of verified claims keyed by the raw token, valid until ``exp``.
+
+    Only tokens with an ``exp`` claim are cached. The cached dict is shared
+    between requests and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._store: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            entry = self._store.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._store[token]
+                return None
+            self._store.move_to_end(token)
+            return entry[1]
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._store[token] = (exp, claims)
+            self._store.move_to_end(token)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+token_cache = TokenCache(settings.JWT_CACHE_MAX_ENTRIES)
+
+# El verificador propio solo cubre HS256; otros algoritmos siguen con python-jose.
+_verify_token = (
+    decode_hs256 if settings.JWT_VERIFIER == "builtin" and ALGORITHM == "HS256" else decode_jose
+)
+
 def decode_token(token: str) -> dict:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        claims = _verify_token(token, SECRET_KEY)
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido")
+    token_cache.put(token, claims)
+    return claims
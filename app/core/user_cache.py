@@ -0,0 +1,90 @@
+"""In-memory cache of the user fields needed to authenticate a request."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import RLock
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import EstadoUsuarioEnum, Rol, Usuario
+
+
+@dataclass(frozen=True, slots=True)
+class CachedUser:
+    """Snapshot of the ``Usuario`` columns checked by ``require_auth``."""
+
+    id: int
+    username: str
+    estado: EstadoUsuarioEnum
+    rol_id: int | None
+    rol_codigo: str | None
+
+
+class AuthUserCache:
+    """LRU cache of :class:`CachedUser` entries that expire after ``ttl`` seconds.
+
+    Entries are dropped explicitly by the user and role write paths; the TTL
+    only bounds how long a change made by another process can go unseen.
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._store: OrderedDict[int, tuple[float, CachedUser]] = OrderedDict()
+        self._lock = RLock()
+
+    def get_user(self, db: Session, user_id: int) -> CachedUser | None:
+        """Return the cached snapshot of ``user_id``, loading it on a miss."""
+
+        ahora = time.monotonic()
+        with self._lock:
+            entry = self._store.get(user_id)
+            if entry is not None and entry[0] > ahora:
+                self._store.move_to_end(user_id)
+                return entry[1]
+
+        row = db.execute(
+            select(Usuario.id, Usuario.username, Usuario.estado, Usuario.rol_id, Rol.codigo)
+            .outerjoin(Rol, Rol.id == Usuario.rol_id)
+            .where(Usuario.id == user_id)
+        ).first()
+        if row is None:
+            return None
+
+        user = CachedUser(*row)
+        with self._lock:
+            self._store[user_id] = (ahora + self.ttl, user)
+            self._store.move_to_end(user_id)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+        return user
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Remove the cached entry of ``user_id`` if present."""
+
+        with self._lock:
+            self._store.pop(user_id, None)
+
+    def invalidate_role(self, role_id: int) -> None:
+        """Remove every cached user assigned to ``role_id``."""
+
+        with self._lock:
+            for user_id in [k for k, (_, u) in self._store.items() if u.rol_id == role_id]:
+                del self._store[user_id]
+
+    def clear(self) -> None:
+        """Remove all cached users."""
+
+        with self._lock:
+            self._store.clear()
+
+
+user_cache = AuthUserCache(
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    maxsize=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+)
@@ -7,6 +7,7 @@ from decimal import Decimal
 from enum import Enum
 
 from sqlalchemy import (
+    BigInteger,
     CheckConstraint,
     Column,
     Date,
@@ -143,6 +144,19 @@ class Vista(Base):
     )
 
 
+class PermissionsVersion(Base):
+    """Single-row generation counter of the role/vista permission matrix.
+
+    Every role write bumps ``version`` in its own transaction; each worker's
+    ``RolePermissionCache`` polls it and drops its entries when it changes.
+    """
+
+    __tablename__ = "permissions_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
 class Persona(Base):
     __tablename__ = "personas"
 
@@ -330,6 +344,32 @@ class Nota(Base):
     )
 
 
+class NotaAgregado(Base):
+    """Running totals of :class:`Nota` per student and asignación.
+
+    Maintained by every grade write path (see ``app.services.agregados``) so
+    averages are a single-row lookup instead of an aggregation over
+    ``notas JOIN evaluaciones``.
+    """
+
+    __tablename__ = "nota_agregados"
+
+    estudiante_id: Mapped[int] = mapped_column(
+        ForeignKey("estudiantes.id", ondelete="CASCADE"), primary_key=True
+    )
+    asignacion_id: Mapped[int] = mapped_column(
+        ForeignKey("asignacion_docente.id", ondelete="CASCADE"), primary_key=True
+    )
+    cantidad: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    suma: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=Decimal("0.00"))
+    suma_ponderada: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False, default=Decimal("0.0000"))
+    suma_ponderacion: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=Decimal("0.00"))
+
+    __table_args__ = (
+        Index("ix_nota_agregados_asig", "asignacion_id"),
+    )
+
+
 class Gestion(Base):
     __tablename__ = "gestion"
 
@@ -506,6 +546,33 @@ class Asistencia(Base):
     )
 
 
+class AsistenciaSemana(Base):
+    """Attendance counters per student, asignación and week (monday).
+
+    Maintained by the attendance write paths (see
+    ``app.services.contadores_asistencia``) so absence windows add up a few
+    bucket rows instead of counting ``asistencias``.
+    """
+
+    __tablename__ = "asistencia_semanas"
+
+    asignacion_id: Mapped[int] = mapped_column(
+        ForeignKey("asignacion_docente.id", ondelete="CASCADE"), primary_key=True
+    )
+    estudiante_id: Mapped[int] = mapped_column(
+        ForeignKey("estudiantes.id", ondelete="CASCADE"), primary_key=True
+    )
+    semana: Mapped[date] = mapped_column(Date, primary_key=True)
+    presentes: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    ausentes: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    tardes: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    justificados: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_asistencia_semanas_asig_semana", "asignacion_id", "semana"),
+    )
+
+
 class Alerta(Base):
     __tablename__ = "alertas"
 
@@ -524,3 +591,30 @@ class Alerta(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, server_default=func.now()
     )
+
+
+class AlertaJob(Base):
+    """Background recalculation of alerts, polled through ``/alertas/jobs``."""
+
+    __tablename__ = "alerta_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    gestion: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    curso_id: Mapped[int | None] = mapped_column(Integer)
+    umbral_prom: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    faltas_max: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    dias: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    estado: Mapped[str] = mapped_column(String(12), nullable=False, server_default="PENDIENTE")
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    procesados: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    creadas: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    actualizadas: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    eliminadas: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    error: Mapped[str | None] = mapped_column(String(255))
+    creado_en: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+    iniciado_en: Mapped[datetime | None] = mapped_column(DateTime)
+    # Último avance registrado; los jobs activos sin avance se dan por caídos
+    actualizado_en: Mapped[datetime | None] = mapped_column(DateTime)
+    finalizado_en: Mapped[datetime | None] = mapped_column(DateTime)
@@ -0,0 +1,66 @@
+"""Lightweight instrumentation to count the SQL statements run in a block."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Number of statements executed and cumulative time spent on them.
+
+    When ``slow_threshold`` is set, statements that took at least that many
+    seconds are kept in ``slow`` as ``(sql, seconds)``.
+    """
+
+    count: int = 0
+    elapsed: float = 0.0
+    slow_threshold: float | None = None
+    slow: list[tuple[str, float]] = field(default_factory=list)
+
+
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+@contextmanager
+def track_queries(slow_threshold: float | None = None) -> Iterator[QueryStats]:
+    """Collect statistics for every statement executed inside the block.
+
+    Trackers may be nested; each active tracker sees every statement. The
+    statistics are bound to the current context, so concurrent requests served
+    by other threads do not interfere with each other.
+    """
+
+    stats = QueryStats(slow_threshold=slow_threshold)
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trackers = _active.get()
+    if not trackers:
+        return
+    starts = conn.info.get("query_start")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    for stats in trackers:
+        stats.count += 1
+        stats.elapsed += elapsed
+        if stats.slow_threshold is not None and elapsed >= stats.slow_threshold:
+            stats.slow.append((statement, elapsed))
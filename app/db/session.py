@@ -1,13 +1,224 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from functools import lru_cache
+from threading import Lock
+from typing import Any
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
 from app.core.config import settings
 
 
+# En ``record_info``: sobrevive a la invalidación de la conexión prestada.
+_CHECKOUT_KEY = "prestada_en"
+
+
+class PoolMetrics:
+    """Checkout waits and connection usage of one pool.
+
+    Waits are timed around ``Pool.connect()``; usage comes from the pool's
+    ``connect``/``checkout``/``checkin`` events.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.use_total = 0.0
+        self.use_max = 0.0
+
+    def escuchar(self, pool: Pool) -> None:
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def registrar_espera(self, espera: float, timeout: bool) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_total += espera
+            self.wait_max = max(self.wait_max, espera)
+            if timeout:
+                self.timeouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.record_info[_CHECKOUT_KEY] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        inicio = connection_record.record_info.pop(_CHECKOUT_KEY, None)
+        if inicio is None:
+            return
+        uso = time.perf_counter() - inicio
+        with self._lock:
+            self.in_use -= 1
+            self.use_total += uso
+            self.use_max = max(self.use_max, uso)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            usos = self.checkouts - self.in_use
+            return {
+                "esperas": self.waits,
+                "espera_promedio_ms": self.wait_total / self.waits * 1000 if self.waits else 0.0,
+                "espera_max_ms": self.wait_max * 1000,
+                "timeouts": self.timeouts,
+                "conexiones_creadas": self.connects,
+                "prestamos": self.checkouts,
+                "pico_en_uso": self.peak_in_use,
+                "uso_promedio_ms": self.use_total / usos * 1000 if usos else 0.0,
+                "uso_max_ms": self.use_max * 1000,
+            }
+
+
+class _InstrumentedPool:
+    """Mixin giving a pool its own :class:`PoolMetrics`.
+
+    ``recreate()`` (``engine.dispose()``) copies the event listeners to the
+    new pool, so the metrics object is handed over with them.
+    """
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kw: Any) -> None:
+        nuevo = kw.get("_dispatch") is None
+        super().__init__(*args, **kw)
+        if nuevo:
+            self.metrics = PoolMetrics()
+            self.metrics.escuchar(self)
+
+    def connect(self):
+        inicio = time.perf_counter()
+        timeout = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timeout = True
+            raise
+        finally:
+            self.metrics.registrar_espera(time.perf_counter() - inicio, timeout)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    """QueuePool that records checkout waits and connection usage."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    """Async engine counterpart of :class:`InstrumentedQueuePool`."""
+
+
+def pool_stats(bind: Engine) -> dict[str, Any]:
+    """Occupancy of the pool of ``bind`` and, when instrumented, its waits and usage."""
+
+    pool = bind.pool
+    stats: dict[str, Any] = {"pool": type(pool).__name__, "estado": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, _InstrumentedPool):
+        stats.update(pool.metrics.stats())
+    return stats
+
+
+def async_pool_stats() -> dict[str, Any] | None:
+    """:func:`pool_stats` of the async engine, or ``None`` if it was never created."""
+
+    if not get_async_sessionmaker.cache_info().currsize:
+        return None
+    return pool_stats(get_async_sessionmaker().kw["bind"].sync_engine)
+
+
+_USED_KEY = "usa_conexion"
+
+
+class SessionUsage:
+    """Count request sessions and how many of them reached the database.
+
+    A ``Session`` only checks out a pooled connection when it first runs a
+    statement, so requests answered from the in-memory caches never touch
+    the pool; these counters show how many requests that is.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.sesiones = 0
+        self.con_conexion = 0
+
+    def registrar(self, session: Session) -> None:
+        usada = session.info.get(_USED_KEY, False)
+        with self._lock:
+            self.sesiones += 1
+            if usada:
+                self.con_conexion += 1
+
+    def heredar(self, session: Session, replica: Session) -> None:
+        """Count statements run on ``replica`` against the request's ``session``.
+
+        Replica sessions are not registered on their own: the request is
+        counted once, through the primary session ``get_db`` registers.
+        """
+
+        if replica.info.get(_USED_KEY, False):
+            session.info[_USED_KEY] = True
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sesiones": self.sesiones,
+                "con_conexion": self.con_conexion,
+                "sin_conexion": self.sesiones - self.con_conexion,
+            }
+
+
+session_usage = SessionUsage()
+
+
+@event.listens_for(Session, "after_begin")
+def _marcar_uso(session: Session, transaction, connection) -> None:
+    session.info[_USED_KEY] = True
+
+
+def _pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Sin pre-ping por defecto: una conexión caída se detecta al usarla, SQLAlchemy
+# invalida el pool y ``pool_recycle`` evita reutilizar las que MySQL ya cerró.
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
+    poolclass=InstrumentedQueuePool,
     future=True,
+    **_pool_options(),
 )
 
 SessionLocal = sessionmaker(
@@ -16,3 +227,46 @@ SessionLocal = sessionmaker(
     autocommit=False,
     future=True,
 )
+
+# Réplica de lectura opcional; sin DB_REPLICA_URL todo va al primario.
+read_engine = (
+    create_engine(
+        settings.DB_REPLICA_URL,
+        poolclass=InstrumentedQueuePool,
+        future=True,
+        **_pool_options(),
+    )
+    if settings.DB_REPLICA_URL
+    else None
+)
+
+ReadSessionLocal = (
+    sessionmaker(bind=read_engine, autoflush=False, autocommit=False, future=True)
+    if read_engine is not None
+    else None
+)
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Session factory of the async engine, created on first use.
+
+    Kept lazy so processes that never serve async endpoints (CLI, alembic)
+    do not open a second pool.
+    """
+
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI, poolclass=InstrumentedAsyncQueuePool, **_pool_options()
+    )
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_read_sessionmaker() -> async_sessionmaker[AsyncSession] | None:
+    """Async session factory of the replica, or ``None`` without one."""
+
+    if not settings.DB_REPLICA_URL:
+        return None
+    url = make_url(settings.DB_REPLICA_URL).set(drivername=settings.DB_ASYNC_DRIVER)
+    async_engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **_pool_options())
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,51 @@
+"""Dialect-native multi-row upserts (MySQL and SQLite)."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+
+def upsert_statement(
+    db: Session,
+    model: Any,
+    rows: Sequence[dict[str, Any]],
+    *,
+    conflict_cols: Iterable[str],
+    update_cols: Iterable[str] = (),
+):
+    """Build one multi-row ``INSERT`` that resolves unique-key conflicts.
+
+    ``update_cols`` are overwritten with the incoming values when a row with
+    the same ``conflict_cols`` already exists; when it is empty the conflicting
+    rows are left untouched. MySQL resolves the conflict against any unique key
+    (``ON DUPLICATE KEY UPDATE``) while SQLite needs the columns of the unique
+    constraint (``ON CONFLICT (...)``), so callers always pass both.
+    """
+
+    table = model.__table__
+    conflict_cols = list(conflict_cols)
+    update_cols = list(update_cols)
+    dialect = db.get_bind().dialect.name
+
+    if dialect in {"mysql", "mariadb"}:
+        stmt = mysql.insert(table).values(list(rows))
+        if update_cols:
+            return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_cols})
+        # Asignación sin efecto: evita INSERT IGNORE, que también silencia
+        # violaciones de CHECK y de claves foráneas.
+        return stmt.on_duplicate_key_update({conflict_cols[0]: table.c[conflict_cols[0]]})
+
+    if dialect == "sqlite":
+        stmt = sqlite.insert(table).values(list(rows))
+        if update_cols:
+            return stmt.on_conflict_do_update(
+                index_elements=conflict_cols,
+                set_={c: stmt.excluded[c] for c in update_cols},
+            )
+        return stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+
+    raise NotImplementedError(f"Upsert no soportado para el dialecto {dialect!r}")
@@ -11,10 +11,15 @@ from fastapi.routing import APIRoute
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.api.middleware import query_metrics, read_your_writes
 from app.api.v1.router import api_router
-from app.core.security import hash_password
+from app.core.config import settings
+from app.core.permissions import permission_cache
+from app.core.security import hash_password, password_hasher
 from app.db.models import EstadoUsuarioEnum, Persona, Rol, SexoEnum, Usuario
 from app.db.session import engine
+from app.services.alertas_eventos import alert_events
+from app.services.alertas_jobs import alert_job_runner
 
 
 app = FastAPI(title="Académico API")
@@ -85,6 +90,37 @@ def bootstrap_access_control() -> None:
         session.commit()
 
 
+@app.on_event("startup")
+def preload_permissions() -> None:
+    """Load the whole role/vista matrix so first requests skip the query."""
+
+    with Session(engine) as session:
+        permission_cache.load(session)
+
+
+@app.on_event("startup")
+def start_alert_events() -> None:
+    """Refresh alerts in the background as grades and attendance change."""
+
+    alert_events.start()
+
+
+@app.on_event("startup")
+def resume_alert_jobs() -> None:
+    """Resubmit alert jobs left PENDIENTE and fail the ones that timed out."""
+
+    alert_job_runner.reanudar()
+
+
+@app.on_event("shutdown")
+def stop_background_jobs() -> None:
+    """Stop accepting background jobs; pending ones resume on next startup."""
+
+    alert_events.stop()
+    alert_job_runner.shutdown()
+    password_hasher.shutdown()
+
+
 # Nota: la aplicación web espera actualmente que los endpoints vivan bajo
 # ``/api`` mientras que la API estaba versionada en ``/api/v1``.  Esto
 # provocaba errores 404 al autenticarse porque las solicitudes llegaban a
@@ -106,8 +142,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing"],
 )
 
+if settings.DB_REPLICA_URL:
+    app.middleware("http")(read_your_writes)
+app.middleware("http")(query_metrics)
+
 
 @app.on_event("startup")
 def log_routes() -> None:
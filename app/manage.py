@@ -0,0 +1,62 @@
+"""Maintenance commands.
+
+Usage::
+
+    python -m app.manage rebuild-agregados [--asignacion ID ...]
+    python -m app.manage rebuild-asistencia-semanas [--asignacion ID ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+
+from app.db.session import SessionLocal
+from app.services.agregados import reconstruir_agregados
+from app.services.contadores_asistencia import reconstruir_semanas
+
+
+def rebuild_agregados(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        filas = reconstruir_agregados(db, args.asignacion or None)
+        db.commit()
+    print(f"nota_agregados: {filas} filas reconstruidas")
+
+
+def rebuild_asistencia_semanas(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        filas = reconstruir_semanas(db, args.asignacion or None)
+        db.commit()
+    print(f"asistencia_semanas: {filas} filas reconstruidas")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    rebuild = sub.add_parser(
+        "rebuild-agregados",
+        help="Recalcula nota_agregados a partir de las notas registradas",
+    )
+    rebuild.set_defaults(func=rebuild_agregados)
+
+    semanas = sub.add_parser(
+        "rebuild-asistencia-semanas",
+        help="Recalcula asistencia_semanas a partir de las asistencias registradas",
+    )
+    semanas.set_defaults(func=rebuild_asistencia_semanas)
+
+    for comando in (rebuild, semanas):
+        comando.add_argument(
+            "--asignacion",
+            type=int,
+            action="append",
+            help="Limita la reconstrucción a esta asignación (repetible)",
+        )
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
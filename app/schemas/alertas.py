@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, conint
+from pydantic import BaseModel, ConfigDict, computed_field, conint
 from typing import Optional
 from typing import Literal
 from datetime import datetime
@@ -29,3 +29,34 @@ class AlertaOut(BaseModel):
 
 class AlertaUpdate(BaseModel):
     estado: Literal["NUEVO","LEIDO","CERRADO"] | None = None
+
+class AlertaJobOut(BaseModel):
+    id: int
+    gestion: int
+    curso_id: int | None = None
+    estado: Literal["PENDIENTE", "EN_CURSO", "COMPLETADO", "FALLIDO"]
+    total: int
+    procesados: int
+    creadas: int
+    actualizadas: int
+    eliminadas: int
+    error: str | None = None
+    creado_en: datetime
+    iniciado_en: datetime | None = None
+    actualizado_en: datetime | None = None
+    finalizado_en: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def progreso(self) -> float:
+        return round(self.procesados / self.total, 4) if self.total else 0.0
+
+    @computed_field
+    @property
+    def segundos(self) -> float | None:
+        if self.iniciado_en is None:
+            return None
+        fin = self.finalizado_en or datetime.now()
+        return round((fin - self.iniciado_en).total_seconds(), 3)
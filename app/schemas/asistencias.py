@@ -26,3 +26,22 @@ class AsistenciaMasivaIn(BaseModel):
     fecha: date
     asignacion_id: int
     items: list[AsistenciaItem]
+
+# Para importación multi-día / multi-asignación
+class AsistenciaResumen(BaseModel):
+    insertados: int = 0
+    actualizados: int = 0
+    duplicados: int = 0
+    no_matriculados: int = 0
+    model_config = ConfigDict(from_attributes=True)
+
+class AsistenciaImportError(BaseModel):
+    linea: int
+    detail: str
+
+class AsistenciaImportOut(BaseModel):
+    filas: int
+    invalidas: int
+    total: AsistenciaResumen
+    por_asignacion: dict[int, AsistenciaResumen]
+    errores: list[AsistenciaImportError]
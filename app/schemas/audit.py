@@ -17,7 +17,8 @@ class AuditLogOut(BaseModel):
 
 
 class AuditLogPage(BaseModel):
-    total: int = Field(ge=0)
+    total: int | None = Field(default=None, ge=0)
     page: int = Field(ge=1)
     size: int = Field(ge=1)
     items: list[AuditLogOut]
+    next_cursor: str | None = None
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 class NotaCreate(BaseModel):
@@ -14,3 +16,32 @@ class NotaOut(BaseModel):
     observacion: str | None
     class Config:
         from_attributes = True
+
+
+# Para registro masivo
+class NotaItem(BaseModel):
+    evaluacion_id: int
+    estudiante_id: int
+    calificacion: float
+
+
+class NotaMasivaIn(BaseModel):
+    items: list[NotaItem] = Field(min_length=1)
+
+
+NotaMasivaModo = Literal["insert", "upsert", "skip"]
+NotaMasivaEstado = Literal["inserted", "updated", "skipped", "rejected"]
+
+
+class NotaMasivaError(BaseModel):
+    index: int
+    detail: str
+
+
+class NotaMasivaResultado(BaseModel):
+    insertados: int = 0
+    actualizados: int = 0
+    omitidos: int = 0
+    rechazados: int = 0
+    estados: list[NotaMasivaEstado]
+    errores: list[NotaMasivaError] = []
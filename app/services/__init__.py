@@ -1,3 +1,3 @@
 """Service layer helpers for reusable business logic."""
 
-__all__ = ["personas"]
+__all__ = ["agregados", "alertas", "alertas_eventos", "alertas_jobs", "asistencias", "contadores_asistencia", "exportacion", "notas", "personas", "reportes"]
@@ -0,0 +1,159 @@
+"""Maintenance and lookups of the ``nota_agregados`` summary table."""
+
+from __future__ import annotations
+
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.db.models import Evaluacion, Nota, NotaAgregado
+from app.db.upsert import upsert_statement
+
+
+ClaveAgregado = tuple[int, int]
+
+_COLUMNAS = ("estudiante_id", "asignacion_id", "cantidad", "suma", "suma_ponderada", "suma_ponderacion")
+
+
+@dataclass(frozen=True, slots=True)
+class Promedios:
+    cantidad: int
+    simple: float
+    ponderado: float | None
+
+    @classmethod
+    def desde(cls, cantidad, suma, suma_ponderada, suma_ponderacion) -> "Promedios":
+        if not cantidad:
+            return cls(cantidad=0, simple=0.0, ponderado=None)
+        return cls(
+            cantidad=int(cantidad),
+            simple=float(suma) / int(cantidad),
+            ponderado=float(suma_ponderada) / float(suma_ponderacion) if suma_ponderacion else None,
+        )
+
+
+def _select_totales():
+    return (
+        select(
+            Nota.estudiante_id,
+            Evaluacion.asignacion_id,
+            func.count(Nota.id),
+            func.sum(Nota.calificacion),
+            func.sum(Nota.calificacion * Evaluacion.ponderacion),
+            func.sum(Evaluacion.ponderacion),
+        )
+        .join(Evaluacion, Evaluacion.id == Nota.evaluacion_id)
+        .group_by(Nota.estudiante_id, Evaluacion.asignacion_id)
+    )
+
+
+def refrescar_agregados(db: Session, claves: Iterable[ClaveAgregado]) -> None:
+    """Recompute the totals of ``(asignacion_id, estudiante_id)`` keys.
+
+    Meant to be called by grade write paths right before they commit, so the
+    summary changes in the same transaction as the grades. The totals are
+    recomputed from ``notas`` for just those students (one grouped ``SELECT``
+    and one upsert), which keeps them exact whatever the write did.
+    """
+
+    claves = {(asig, est) for asig, est in claves}
+    if not claves:
+        return
+    asig_ids = {asig for asig, _ in claves}
+    est_ids = {est for _, est in claves}
+
+    filas = [
+        dict(zip(_COLUMNAS, fila))
+        for fila in db.execute(
+            _select_totales().where(
+                Evaluacion.asignacion_id.in_(asig_ids),
+                Nota.estudiante_id.in_(est_ids),
+            )
+        ).tuples()
+        if (fila[1], fila[0]) in claves
+    ]
+    vacias = claves - {(f["asignacion_id"], f["estudiante_id"]) for f in filas}
+
+    if vacias:
+        db.execute(
+            delete(NotaAgregado).where(
+                tuple_(NotaAgregado.asignacion_id, NotaAgregado.estudiante_id).in_(vacias)
+            )
+        )
+    if filas:
+        db.execute(
+            upsert_statement(
+                db,
+                NotaAgregado,
+                filas,
+                conflict_cols=("estudiante_id", "asignacion_id"),
+                update_cols=_COLUMNAS[2:],
+            )
+        )
+
+
+def reconstruir_agregados(db: Session, asignacion_ids: Collection[int] | None = None) -> int:
+    """Rebuild the summary from ``notas`` and return the number of rows.
+
+    Without ``asignacion_ids`` the whole table is rebuilt with one
+    ``INSERT ... SELECT``. The caller owns the commit.
+    """
+
+    borrar = delete(NotaAgregado)
+    totales = _select_totales()
+    if asignacion_ids is not None:
+        borrar = borrar.where(NotaAgregado.asignacion_id.in_(asignacion_ids))
+        totales = totales.where(Evaluacion.asignacion_id.in_(asignacion_ids))
+    db.execute(borrar)
+    db.execute(insert(NotaAgregado).from_select(list(_COLUMNAS), totales))
+
+    contar = select(func.count()).select_from(NotaAgregado)
+    if asignacion_ids is not None:
+        contar = contar.where(NotaAgregado.asignacion_id.in_(asignacion_ids))
+    return db.execute(contar).scalar_one()
+
+
+_TOTALES_AGREGADO = (
+    NotaAgregado.cantidad,
+    NotaAgregado.suma,
+    NotaAgregado.suma_ponderada,
+    NotaAgregado.suma_ponderacion,
+)
+
+
+def promedios_estudiante(db: Session, asignacion_id: int, estudiante_id: int) -> Promedios:
+    """Read the averages of one student with a primary-key lookup."""
+
+    fila = db.execute(
+        select(*_TOTALES_AGREGADO).where(
+            NotaAgregado.estudiante_id == estudiante_id,
+            NotaAgregado.asignacion_id == asignacion_id,
+        )
+    ).first()
+    return Promedios.desde(*fila) if fila is not None else Promedios.desde(0, 0, 0, 0)
+
+
+def promedios_asignacion(
+    db: Session,
+    asignacion_ids: Collection[int],
+    estudiante_ids: Collection[int] | None = None,
+) -> dict[ClaveAgregado, Promedios]:
+    """Return the averages of every graded student of ``asignacion_ids``.
+
+    Keys are ``(asignacion_id, estudiante_id)`` in that order; the lookup
+    walks the ``ix_nota_agregados_asig`` index instead of ``notas``.
+    """
+
+    stmt = (
+        select(NotaAgregado.asignacion_id, NotaAgregado.estudiante_id, *_TOTALES_AGREGADO)
+        .where(NotaAgregado.asignacion_id.in_(asignacion_ids), NotaAgregado.cantidad > 0)
+        .order_by(NotaAgregado.asignacion_id, NotaAgregado.estudiante_id)
+    )
+    if estudiante_ids is not None:
+        stmt = stmt.where(NotaAgregado.estudiante_id.in_(estudiante_ids))
+    return {
+        (asig_id, est_id): Promedios.desde(*totales)
+        for asig_id, est_id, *totales in db.execute(stmt).tuples()
+    }
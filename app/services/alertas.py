@@ -0,0 +1,174 @@
+"""Incremental computation of academic risk alerts."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Alerta
+from app.services.agregados import promedios_asignacion
+from app.services.contadores_asistencia import contar_ausencias
+
+
+TIPO_PROMEDIO = "RIESGO_PROMEDIO"
+TIPO_ASISTENCIA = "RIESGO_ASISTENCIA"
+
+# Filas por sentencia INSERT; mantiene los parámetros por debajo del límite
+# de placeholders de MySQL y SQLite.
+INSERT_CHUNK_SIZE = 1000
+
+ClaveAlerta = tuple[int, int, str]
+
+
+@dataclass(frozen=True, slots=True)
+class UmbralesAlerta:
+    """Thresholds used to decide when a student is at risk."""
+
+    umbral_prom: int = settings.ALERT_UMBRAL_PROM
+    faltas_max: int = settings.ALERT_FALTAS_MAX
+    dias: int = settings.ALERT_DIAS
+
+
+@dataclass(slots=True)
+class ResumenAlertas:
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def sumar(self, otro: "ResumenAlertas") -> None:
+        self.created += otro.created
+        self.updated += otro.updated
+        self.deleted += otro.deleted
+        self.unchanged += otro.unchanged
+
+
+def calcular_alertas(
+    db: Session,
+    asignacion_ids: Collection[int],
+    umbrales: UmbralesAlerta,
+    estudiante_ids: Collection[int] | None = None,
+) -> dict[ClaveAlerta, tuple[str, int]]:
+    """Return ``(motivo, score)`` for every alert that should exist.
+
+    Keys are ``(asignacion_id, estudiante_id, tipo)``. Averages are read from
+    ``nota_agregados`` through its asignación index and absence counts are
+    summed from the weekly ``asistencia_semanas`` buckets; each is turned into
+    alerts in a single pass over the rows. ``estudiante_ids`` narrows the
+    computation to a few students, which is what write-triggered updates need.
+    """
+
+    alertas: dict[ClaveAlerta, tuple[str, int]] = {}
+    for (asig_id, est_id), promedios in promedios_asignacion(db, asignacion_ids, estudiante_ids).items():
+        alerta = alerta_promedio(promedios.simple, umbrales)
+        if alerta is not None:
+            alertas[(asig_id, est_id, TIPO_PROMEDIO)] = alerta
+    desde = date.today() - timedelta(days=umbrales.dias)
+    for (asig_id, est_id), faltas in contar_ausencias(db, asignacion_ids, desde, estudiante_ids).items():
+        alerta = alerta_asistencia(faltas, umbrales)
+        if alerta is not None:
+            alertas[(asig_id, est_id, TIPO_ASISTENCIA)] = alerta
+    return alertas
+
+
+def alerta_promedio(prom: float | None, umbrales: UmbralesAlerta) -> tuple[str, int] | None:
+    if prom is None or prom >= umbrales.umbral_prom:
+        return None
+    prom = int(prom)
+    return (
+        f"promedio {prom} < umbral {umbrales.umbral_prom}",
+        max(0, min(100, 100 - (umbrales.umbral_prom - prom) * 2)),
+    )
+
+
+def alerta_asistencia(faltas: int, umbrales: UmbralesAlerta) -> tuple[str, int] | None:
+    if faltas <= umbrales.faltas_max:
+        return None
+    return (
+        f"inasistencias {faltas} > {umbrales.faltas_max} en {umbrales.dias} días",
+        min(100, faltas * 10),
+    )
+
+
+def aplicar_alertas(
+    db: Session,
+    gestion: int,
+    asignacion_ids: Collection[int],
+    calculadas: dict[ClaveAlerta, tuple[str, int]],
+    estudiante_ids: Collection[int] | None = None,
+) -> ResumenAlertas:
+    """Bring stored alerts in line with ``calculadas`` touching only changes.
+
+    Existing alerts of the scope are diffed by ``(asignacion, estudiante,
+    tipo)``: missing ones are inserted, those whose ``motivo`` or ``score``
+    changed are updated in place and those no longer triggered are deleted.
+    ``estado`` is never overwritten, so alerts already reviewed by staff keep
+    their state. The caller owns the commit.
+    """
+
+    resumen = ResumenAlertas()
+    stmt = select(Alerta.id, Alerta.asignacion_id, Alerta.estudiante_id, Alerta.tipo, Alerta.motivo, Alerta.score).where(
+        Alerta.gestion == gestion,
+        Alerta.asignacion_id.in_(asignacion_ids),
+    )
+    if estudiante_ids is not None:
+        stmt = stmt.where(Alerta.estudiante_id.in_(estudiante_ids))
+
+    borrar: list[int] = []
+    actualizar: list[dict] = []
+    vistas: set[ClaveAlerta] = set()
+    for alerta_id, asig_id, est_id, tipo, motivo, score in db.execute(stmt).tuples():
+        clave = (asig_id, est_id, tipo)
+        nueva = calculadas.get(clave)
+        if nueva is None or clave in vistas:
+            borrar.append(alerta_id)
+            continue
+        vistas.add(clave)
+        if nueva == (motivo, score):
+            resumen.unchanged += 1
+        else:
+            actualizar.append({"id": alerta_id, "motivo": nueva[0], "score": nueva[1]})
+
+    insertar = [
+        {
+            "gestion": gestion,
+            "asignacion_id": asig_id,
+            "estudiante_id": est_id,
+            "tipo": tipo,
+            "motivo": motivo,
+            "score": score,
+            "estado": "NUEVO",
+        }
+        for (asig_id, est_id, tipo), (motivo, score) in calculadas.items()
+        if (asig_id, est_id, tipo) not in vistas
+    ]
+
+    if borrar:
+        db.execute(delete(Alerta).where(Alerta.id.in_(borrar)))
+    if actualizar:
+        db.execute(update(Alerta), actualizar)
+    for inicio in range(0, len(insertar), INSERT_CHUNK_SIZE):
+        db.execute(insert(Alerta).values(insertar[inicio:inicio + INSERT_CHUNK_SIZE]))
+
+    resumen.created = len(insertar)
+    resumen.updated = len(actualizar)
+    resumen.deleted = len(borrar)
+    return resumen
+
+
+def sincronizar_alertas(
+    db: Session,
+    gestion: int,
+    asignacion_ids: Collection[int],
+    umbrales: UmbralesAlerta,
+    estudiante_ids: Collection[int] | None = None,
+) -> ResumenAlertas:
+    """Recompute and apply the alerts of ``asignacion_ids`` in one go."""
+
+    calculadas = calcular_alertas(db, asignacion_ids, umbrales, estudiante_ids)
+    return aplicar_alertas(db, gestion, asignacion_ids, calculadas, estudiante_ids)
@@ -0,0 +1,119 @@
+"""Near-real-time alert updates driven by grade and attendance writes."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import AsignacionDocente
+from app.db.session import SessionLocal
+from app.services.alertas import UmbralesAlerta, sincronizar_alertas
+from app.services.alertas_jobs import umbrales_vigentes
+
+
+logger = logging.getLogger(__name__)
+
+ClaveEstudiante = tuple[int, int]
+
+
+class AlertEventQueue:
+    """Collect ``(asignacion_id, estudiante_id)`` keys and refresh their alerts.
+
+    Write paths call :meth:`publicar` after committing. A single consumer
+    thread waits ``debounce`` seconds after the first key arrives so a burst
+    of writes (a bulk upload, a teacher grading a whole class) is folded into
+    one recomputation restricted to the affected students. Each gestion and
+    curso is recomputed with the thresholds of its latest recalculation,
+    or ``umbrales`` when there is none. Keys published while the consumer is
+    not running are dropped; ``/alertas/recalcular`` remains the way to
+    rebuild everything.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        debounce: float = settings.ALERT_EVENTS_DEBOUNCE_SECONDS,
+        umbrales: UmbralesAlerta | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.debounce = debounce
+        self.umbrales = umbrales or UmbralesAlerta()
+        self._pendientes: set[ClaveEstudiante] = set()
+        self._lock = threading.Lock()
+        self._hay_pendientes = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def publicar(self, claves: Iterable[ClaveEstudiante]) -> None:
+        if not self.activo:
+            return
+        with self._lock:
+            self._pendientes.update(claves)
+            if self._pendientes:
+                self._hay_pendientes.set()
+
+    def start(self) -> None:
+        if self.activo:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._consumir, name="alert-events", daemon=True)
+        self._hilo.start()
+
+    def stop(self) -> None:
+        self._detener.set()
+        self._hay_pendientes.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.debounce + 5)
+        self._hilo = None
+
+    def _consumir(self) -> None:
+        while not self._detener.is_set():
+            self._hay_pendientes.wait()
+            self._detener.wait(self.debounce)
+            with self._lock:
+                claves, self._pendientes = self._pendientes, set()
+                self._hay_pendientes.clear()
+            if not claves:
+                continue
+            try:
+                self.procesar(claves)
+            except Exception:
+                logger.exception("No se pudieron actualizar %d alertas", len(claves))
+
+    def procesar(self, claves: Iterable[ClaveEstudiante]) -> None:
+        """Recompute the alerts of ``claves`` synchronously."""
+
+        estudiantes_por_asig: dict[int, set[int]] = defaultdict(set)
+        for asig_id, est_id in claves:
+            estudiantes_por_asig[asig_id].add(est_id)
+        if not estudiantes_por_asig:
+            return
+
+        with self.session_factory() as db:
+            # Las alertas guardan en ``gestion`` el mismo valor con el que
+            # /alertas/recalcular filtra ``AsignacionDocente.gestion_id``.
+            por_curso: dict[tuple[int, int], list[int]] = defaultdict(list)
+            for asig_id, gestion_id, curso_id in db.execute(
+                select(AsignacionDocente.id, AsignacionDocente.gestion_id, AsignacionDocente.curso_id)
+                .where(AsignacionDocente.id.in_(estudiantes_por_asig))
+            ).tuples():
+                por_curso[(gestion_id, curso_id)].append(asig_id)
+
+            for (gestion, curso_id), asig_ids in por_curso.items():
+                umbrales = umbrales_vigentes(db, gestion, curso_id, self.umbrales)
+                est_ids = set().union(*(estudiantes_por_asig[a] for a in asig_ids))
+                sincronizar_alertas(db, gestion, asig_ids, umbrales, estudiante_ids=est_ids)
+            db.commit()
+
+
+alert_events = AlertEventQueue()
@@ -0,0 +1,280 @@
+"""Background execution of alert recalculations tracked in ``alerta_jobs``."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import DateTime, Integer, SmallInteger, String, func, insert, literal, or_, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import AlertaJob, AsignacionDocente
+from app.db.session import SessionLocal
+from app.services.alertas import ResumenAlertas, UmbralesAlerta, sincronizar_alertas
+
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_ACTIVOS = ("PENDIENTE", "EN_CURSO")
+
+
+class JobLimitError(Exception):
+    """Raised when a gestion already has the maximum number of active jobs."""
+
+
+def _es_conflicto(exc: OperationalError) -> bool:
+    """Whether ``exc`` is a lock conflict (deadlock, lock wait, sqlite busy)."""
+
+    codigo = getattr(exc.orig, "errno", None) or (exc.orig.args[0] if exc.orig.args else None)
+    return codigo in (1205, 1213) or "locked" in str(exc.orig)
+
+
+def umbrales_vigentes(
+    db: Session, gestion: int, curso_id: int | None, por_defecto: UmbralesAlerta
+) -> UmbralesAlerta:
+    """Thresholds of the latest recalculation that covers ``gestion``/``curso_id``.
+
+    Jobs scoped to the whole gestion apply to every curso; failed jobs are
+    ignored. Falls back to ``por_defecto`` when nothing was recalculated.
+    """
+
+    fila = db.execute(
+        select(AlertaJob.umbral_prom, AlertaJob.faltas_max, AlertaJob.dias)
+        .where(
+            AlertaJob.gestion == gestion,
+            AlertaJob.estado != "FALLIDO",
+            or_(AlertaJob.curso_id.is_(None), AlertaJob.curso_id == curso_id),
+        )
+        .order_by(AlertaJob.id.desc())
+        .limit(1)
+    ).first()
+    return UmbralesAlerta(*fila) if fila is not None else por_defecto
+
+
+class AlertJobRunner:
+    """Run alert recalculations on a bounded thread pool.
+
+    The job row is the source of truth for progress, so any worker process can
+    answer ``GET /alertas/jobs/{id}``. Work is split in chunks of one curso
+    each; every chunk is committed on its own and updates the progress
+    counters, so the connection is never held for the whole gestion. A job
+    is claimed by moving it from PENDIENTE to EN_CURSO in one UPDATE, so it
+    runs once even if several workers submit it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int = settings.ALERT_JOBS_MAX_WORKERS,
+    ) -> None:
+        self.session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alert-job")
+
+    def crear(
+        self,
+        db: Session,
+        gestion: int,
+        curso_id: int | None,
+        umbrales: UmbralesAlerta,
+    ) -> AlertaJob:
+        """Persist a new job unless ``gestion`` already reached its cap.
+
+        The cap is checked by the INSERT itself (``INSERT ... SELECT ...
+        WHERE active < cap``), so concurrent requests cannot both pass it.
+        """
+
+        self.vencer_colgados(db, gestion)
+        ahora = datetime.now()
+        activos = (
+            select(func.count(AlertaJob.id))
+            .where(AlertaJob.gestion == gestion, AlertaJob.estado.in_(ESTADOS_ACTIVOS))
+            .scalar_subquery()
+        )
+        fila = select(
+            literal(gestion, Integer),
+            literal(curso_id, Integer),
+            literal(umbrales.umbral_prom, SmallInteger),
+            literal(umbrales.faltas_max, SmallInteger),
+            literal(umbrales.dias, SmallInteger),
+            literal("PENDIENTE", String),
+            literal(ahora, DateTime),
+            literal(ahora, DateTime),
+        ).where(activos < settings.ALERT_JOBS_MAX_POR_GESTION)
+        columnas = [
+            "gestion", "curso_id", "umbral_prom", "faltas_max", "dias", "estado", "creado_en", "actualizado_en",
+        ]
+        try:
+            result = db.execute(insert(AlertaJob).from_select(columnas, fila))
+        except OperationalError as exc:
+            # InnoDB resuelve dos inserciones simultáneas con un deadlock:
+            # la perdedora se trata como gestión llena.
+            if not _es_conflicto(exc):
+                raise
+            db.rollback()
+            raise JobLimitError(gestion) from None
+        if result.rowcount == 0:
+            db.rollback()
+            raise JobLimitError(gestion)
+        db.commit()
+        return db.get(AlertaJob, result.lastrowid)
+
+    def registrar(
+        self,
+        db: Session,
+        gestion: int,
+        curso_id: int | None,
+        umbrales: UmbralesAlerta,
+        resumen: ResumenAlertas,
+    ) -> AlertaJob:
+        """Record a recalculation already run in the request as COMPLETADO.
+
+        Keeps ``/alertas/recalcular`` in the job history, so its thresholds
+        are the ones :func:`umbrales_vigentes` returns; the caller commits.
+        """
+
+        ahora = datetime.now()
+        job = AlertaJob(
+            gestion=gestion,
+            curso_id=curso_id,
+            umbral_prom=umbrales.umbral_prom,
+            faltas_max=umbrales.faltas_max,
+            dias=umbrales.dias,
+            estado="COMPLETADO",
+            creadas=resumen.created,
+            actualizadas=resumen.updated,
+            eliminadas=resumen.deleted,
+            creado_en=ahora,
+            iniciado_en=ahora,
+            actualizado_en=ahora,
+            finalizado_en=ahora,
+        )
+        db.add(job)
+        return job
+
+    def vencer_colgados(self, db: Session, gestion: int | None = None) -> int:
+        """Fail active jobs with no progress for ``ALERT_JOBS_TIMEOUT_MINUTES``.
+
+        ``actualizado_en`` moves on every committed chunk, so only jobs left
+        behind by a worker that crashed or was stopped match; a running job
+        that gets failed anyway stops at its next chunk. The caller commits.
+        """
+
+        limite = datetime.now() - timedelta(minutes=settings.ALERT_JOBS_TIMEOUT_MINUTES)
+        stmt = (
+            update(AlertaJob)
+            .where(
+                AlertaJob.estado.in_(ESTADOS_ACTIVOS),
+                func.coalesce(AlertaJob.actualizado_en, AlertaJob.creado_en) < limite,
+            )
+            .values(
+                estado="FALLIDO",
+                error="Interrumpido: superó el tiempo máximo",
+                finalizado_en=datetime.now(),
+                actualizado_en=datetime.now(),
+            )
+        )
+        if gestion is not None:
+            stmt = stmt.where(AlertaJob.gestion == gestion)
+        return db.execute(stmt).rowcount
+
+    def reanudar(self) -> list[int]:
+        """Fail stale jobs and resubmit the PENDIENTE ones; run at startup."""
+
+        with self.session_factory() as db:
+            vencidos = self.vencer_colgados(db)
+            db.commit()
+            pendientes = db.execute(
+                select(AlertaJob.id).where(AlertaJob.estado == "PENDIENTE").order_by(AlertaJob.id)
+            ).scalars().all()
+        if vencidos:
+            logger.warning("Se marcaron %s jobs de alertas interrumpidos como FALLIDO", vencidos)
+        for job_id in pendientes:
+            self.submit(job_id)
+        return list(pendientes)
+
+    def submit(self, job_id: int) -> None:
+        self._executor.submit(self.ejecutar, job_id)
+
+    def ejecutar(self, job_id: int) -> None:
+        """Run ``job_id`` to completion in the calling thread."""
+
+        with self.session_factory() as db:
+            ahora = datetime.now()
+            reclamado = db.execute(
+                update(AlertaJob)
+                .where(AlertaJob.id == job_id, AlertaJob.estado == "PENDIENTE")
+                .values(estado="EN_CURSO", iniciado_en=ahora, actualizado_en=ahora)
+            ).rowcount
+            db.commit()
+            if not reclamado:
+                return
+            job = db.get(AlertaJob, job_id)
+            try:
+                self._procesar(db, job)
+            except Exception as exc:
+                logger.exception("Falló el recálculo de alertas del job %s", job_id)
+                db.rollback()
+                self._avanzar(db, job_id, estado="FALLIDO", error=str(exc)[:255], finalizado_en=datetime.now())
+                db.commit()
+
+    def _avanzar(self, db: Session, job_id: int, **valores) -> bool:
+        """Update ``job_id`` while it is still EN_CURSO.
+
+        Returns ``False`` when the job was failed meanwhile (see
+        :meth:`vencer_colgados`); the caller must then stop.
+        """
+
+        return bool(
+            db.execute(
+                update(AlertaJob)
+                .where(AlertaJob.id == job_id, AlertaJob.estado == "EN_CURSO")
+                .values(actualizado_en=datetime.now(), **valores)
+            ).rowcount
+        )
+
+    def _procesar(self, db: Session, job: AlertaJob) -> None:
+        job_id, gestion = job.id, job.gestion
+        umbrales = UmbralesAlerta(umbral_prom=job.umbral_prom, faltas_max=job.faltas_max, dias=job.dias)
+        stmt = (
+            select(AsignacionDocente.curso_id, AsignacionDocente.id)
+            .where(AsignacionDocente.gestion_id == gestion)
+            .order_by(AsignacionDocente.curso_id, AsignacionDocente.id)
+        )
+        if job.curso_id is not None:
+            stmt = stmt.where(AsignacionDocente.curso_id == job.curso_id)
+        filas = db.execute(stmt).tuples().all()
+        lotes = [[asig_id for _, asig_id in grupo] for _, grupo in groupby(filas, key=lambda f: f[0])]
+
+        if not self._avanzar(db, job_id, total=len(filas)):
+            db.rollback()
+            return
+        db.commit()
+
+        for lote in lotes:
+            resumen = sincronizar_alertas(db, gestion, lote, umbrales)
+            if not self._avanzar(
+                db,
+                job_id,
+                procesados=AlertaJob.procesados + len(lote),
+                creadas=AlertaJob.creadas + resumen.created,
+                actualizadas=AlertaJob.actualizadas + resumen.updated,
+                eliminadas=AlertaJob.eliminadas + resumen.deleted,
+            ):
+                logger.warning("Job de alertas %s detenido: ya no está EN_CURSO", job_id)
+                db.rollback()
+                return
+            db.commit()
+
+        self._avanzar(db, job_id, estado="COMPLETADO", finalizado_en=datetime.now())
+        db.commit()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+alert_job_runner = AlertJobRunner()
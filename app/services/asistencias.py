@@ -0,0 +1,251 @@
+"""Set-based helpers for registering attendance in bulk."""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import date
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import ASISTENCIA_ESTADOS, Asistencia, Matricula
+from app.db.upsert import upsert_statement
+from app.services.contadores_asistencia import refrescar_semanas
+
+
+# Filas por sentencia INSERT; mantiene los parámetros por debajo del límite
+# de placeholders de MySQL y SQLite.
+INSERT_CHUNK_SIZE = 1000
+
+
+@dataclass(slots=True)
+class FilaAsistencia:
+    fecha: date
+    asignacion_id: int
+    estudiante_id: int
+    estado: str
+    observacion: str | None = None
+
+
+@dataclass(slots=True)
+class ResumenAsistencia:
+    insertados: int = 0
+    actualizados: int = 0
+    duplicados: int = 0
+    no_matriculados: int = 0
+
+    def sumar(self, otro: "ResumenAsistencia") -> None:
+        self.insertados += otro.insertados
+        self.actualizados += otro.actualizados
+        self.duplicados += otro.duplicados
+        self.no_matriculados += otro.no_matriculados
+
+
+@dataclass(slots=True)
+class ResultadoAsistencia:
+    """Totals for a batch plus the same counters broken down by asignación."""
+
+    total: ResumenAsistencia = field(default_factory=ResumenAsistencia)
+    por_asignacion: dict[int, ResumenAsistencia] = field(default_factory=dict)
+    # (asignacion_id, estudiante_id) de las filas insertadas o actualizadas.
+    escritas: set[tuple[int, int]] = field(default_factory=set)
+
+    def resumen(self, asignacion_id: int) -> ResumenAsistencia:
+        return self.por_asignacion.setdefault(asignacion_id, ResumenAsistencia())
+
+    def sumar(self, otro: "ResultadoAsistencia") -> None:
+        self.total.sumar(otro.total)
+        for asig_id, resumen in otro.por_asignacion.items():
+            self.resumen(asig_id).sumar(resumen)
+        self.escritas |= otro.escritas
+
+
+class MatriculasPorAsignacion:
+    """Enrolled students per asignación, loaded once per asignación.
+
+    Lets long imports validate every chunk against the enrolments without
+    querying ``matriculas`` again for asignaciones already seen.
+    """
+
+    def __init__(self) -> None:
+        self._por_asignacion: dict[int, set[int]] = {}
+
+    def cargar(self, db: Session, asignacion_ids: Iterable[int]) -> None:
+        nuevas = set(asignacion_ids) - self._por_asignacion.keys()
+        if not nuevas:
+            return
+        for asig_id in nuevas:
+            self._por_asignacion[asig_id] = set()
+        for asig_id, est_id in db.execute(
+            select(Matricula.asignacion_id, Matricula.estudiante_id).where(
+                Matricula.asignacion_id.in_(nuevas)
+            )
+        ).tuples():
+            self._por_asignacion[asig_id].add(est_id)
+
+    def __contains__(self, clave: tuple[int, int]) -> bool:
+        asig_id, est_id = clave
+        return est_id in self._por_asignacion.get(asig_id, ())
+
+
+def registrar_asistencias(
+    db: Session,
+    filas: Sequence[FilaAsistencia],
+    *,
+    actualizar: bool = False,
+    matriculas: MatriculasPorAsignacion | None = None,
+) -> ResultadoAsistencia:
+    """Write ``filas`` with a constant number of queries.
+
+    Enrolments and already registered rows for the dates involved are loaded
+    once as sets. Rows for students not enrolled in the asignación are counted
+    and dropped. Rows that already exist are reported as duplicates or, when
+    ``actualizar`` is set, overwritten with the new ``estado``/``observacion``
+    just like the single-row endpoint does. New and changed rows go to the
+    database in a single multi-row statement and the weekly counters of the
+    affected students are refreshed. The caller owns the commit.
+
+    Pass a shared ``matriculas`` cache when writing several chunks of the same
+    import so enrolments are only loaded for asignaciones not seen before.
+    """
+
+    resultado = ResultadoAsistencia()
+    if not filas:
+        return resultado
+
+    asig_ids = {f.asignacion_id for f in filas}
+    est_ids = {f.estudiante_id for f in filas}
+    fechas = {f.fecha for f in filas}
+
+    if matriculas is not None:
+        matriculas.cargar(db, asig_ids)
+    else:
+        matriculas = set(
+            db.execute(
+                select(Matricula.asignacion_id, Matricula.estudiante_id).where(
+                    Matricula.asignacion_id.in_(asig_ids),
+                    Matricula.estudiante_id.in_(est_ids),
+                )
+            ).tuples()
+        )
+    existentes = {
+        (fecha, asig, est): (estado, obs)
+        for fecha, asig, est, estado, obs in db.execute(
+            select(
+                Asistencia.fecha,
+                Asistencia.asignacion_id,
+                Asistencia.estudiante_id,
+                Asistencia.estado,
+                Asistencia.observacion,
+            ).where(
+                Asistencia.fecha.in_(fechas),
+                Asistencia.asignacion_id.in_(asig_ids),
+                Asistencia.estudiante_id.in_(est_ids),
+            )
+        ).tuples()
+    }
+
+    vistos: set[tuple[date, int, int]] = set()
+    valores: list[dict] = []
+    for fila in filas:
+        resumen = resultado.resumen(fila.asignacion_id)
+        if (fila.asignacion_id, fila.estudiante_id) not in matriculas:
+            resumen.no_matriculados += 1
+            continue
+
+        clave = (fila.fecha, fila.asignacion_id, fila.estudiante_id)
+        actual = existentes.get(clave)
+        if clave in vistos or (
+            actual is not None
+            and (not actualizar or actual == (fila.estado, fila.observacion))
+        ):
+            resumen.duplicados += 1
+            continue
+        vistos.add(clave)
+
+        if actual is None:
+            resumen.insertados += 1
+        else:
+            resumen.actualizados += 1
+        resultado.escritas.add((fila.asignacion_id, fila.estudiante_id))
+        valores.append({
+            "fecha": fila.fecha,
+            "asignacion_id": fila.asignacion_id,
+            "estudiante_id": fila.estudiante_id,
+            "estado": fila.estado,
+            "observacion": fila.observacion,
+        })
+
+    for resumen in resultado.por_asignacion.values():
+        resultado.total.sumar(resumen)
+
+    for inicio in range(0, len(valores), INSERT_CHUNK_SIZE):
+        lote = valores[inicio:inicio + INSERT_CHUNK_SIZE]
+        if actualizar:
+            db.execute(
+                upsert_statement(
+                    db,
+                    Asistencia,
+                    lote,
+                    conflict_cols=("fecha", "asignacion_id", "estudiante_id"),
+                    update_cols=("estado", "observacion"),
+                )
+            )
+        else:
+            db.execute(insert(Asistencia).values(lote))
+    refrescar_semanas(db, ((v["asignacion_id"], v["estudiante_id"], v["fecha"]) for v in valores))
+    return resultado
+
+
+CAMPOS_IMPORTACION = ("fecha", "asignacion_id", "estudiante_id", "estado", "observacion")
+
+
+def _fila_desde_dict(data: dict) -> FilaAsistencia:
+    estado = str(data.get("estado") or "").strip().upper()
+    if estado not in ASISTENCIA_ESTADOS:
+        raise ValueError(f"estado inválido: {data.get('estado')!r}")
+    observacion = data.get("observacion")
+    try:
+        return FilaAsistencia(
+            fecha=date.fromisoformat(str(data["fecha"]).strip()),
+            asignacion_id=int(data["asignacion_id"]),
+            estudiante_id=int(data["estudiante_id"]),
+            estado=estado,
+            observacion=str(observacion) if observacion not in (None, "") else None,
+        )
+    except KeyError as exc:
+        raise ValueError(f"falta el campo {exc.args[0]}") from exc
+    except TypeError as exc:
+        raise ValueError("valor inválido") from exc
+
+
+def parse_fila_ndjson(linea: str) -> FilaAsistencia:
+    """Parse one NDJSON object; raises ``ValueError`` when it is invalid."""
+
+    try:
+        data = json.loads(linea)
+    except json.JSONDecodeError as exc:
+        raise ValueError("JSON inválido") from exc
+    if not isinstance(data, dict):
+        raise ValueError("se esperaba un objeto JSON")
+    return _fila_desde_dict(data)
+
+
+def parse_fila_csv(linea: str, encabezado: Sequence[str]) -> FilaAsistencia:
+    """Parse one CSV record (one per line) using the header ``encabezado``."""
+
+    valores = next(csv.reader([linea]))
+    if len(valores) > len(encabezado):
+        raise ValueError("más columnas que el encabezado")
+    return _fila_desde_dict(dict(zip(encabezado, valores)))
+
+
+def parse_encabezado_csv(linea: str) -> list[str]:
+    encabezado = [c.strip().lower() for c in next(csv.reader([linea]))]
+    faltantes = [c for c in CAMPOS_IMPORTACION[:4] if c not in encabezado]
+    if faltantes:
+        raise ValueError(f"faltan columnas en el encabezado: {', '.join(faltantes)}")
+    return encabezado
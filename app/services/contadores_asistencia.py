@@ -0,0 +1,176 @@
+"""Maintenance and lookups of the ``asistencia_semanas`` counters."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Collection, Iterable
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.db.models import Asistencia, AsistenciaSemana
+from app.db.upsert import upsert_statement
+
+
+ESTADOS_AUSENTE = ("AUSENTE", "A")
+
+# Columna de ``asistencia_semanas`` que cuenta cada estado; "A" es el código
+# abreviado que usaban registros antiguos.
+COLUMNA_POR_ESTADO = {
+    "PRESENTE": "presentes",
+    "AUSENTE": "ausentes",
+    "A": "ausentes",
+    "TARDE": "tardes",
+    "JUSTIFICADO": "justificados",
+}
+_CONTADORES = ("presentes", "ausentes", "tardes", "justificados")
+
+# Filas por sentencia INSERT; mantiene los parámetros por debajo del límite
+# de placeholders de MySQL y SQLite.
+INSERT_CHUNK_SIZE = 1000
+
+ClaveSemana = tuple[int, int, date]
+
+
+def inicio_semana(fecha: date) -> date:
+    """Monday of the week ``fecha`` belongs to."""
+
+    return fecha - timedelta(days=fecha.weekday())
+
+
+def _acumular(filas: Iterable[tuple[int, int, date, str]]) -> dict[ClaveSemana, dict]:
+    semanas: dict[ClaveSemana, dict] = {}
+    for asig_id, est_id, fecha, estado in filas:
+        clave = (asig_id, est_id, inicio_semana(fecha))
+        fila = semanas.get(clave)
+        if fila is None:
+            fila = semanas[clave] = {
+                "asignacion_id": asig_id,
+                "estudiante_id": est_id,
+                "semana": clave[2],
+                **dict.fromkeys(_CONTADORES, 0),
+            }
+        columna = COLUMNA_POR_ESTADO.get(estado)
+        if columna is not None:
+            fila[columna] += 1
+    return semanas
+
+
+def refrescar_semanas(db: Session, claves: Iterable[tuple[int, int, date]]) -> None:
+    """Recompute the buckets touched by ``(asignacion_id, estudiante_id, fecha)``.
+
+    Call it after writing attendance and before committing. Each affected
+    week is recounted from ``asistencias`` (at most seven rows per student)
+    and written back with one upsert; weeks left without rows are deleted.
+    """
+
+    semanas = {(asig, est, inicio_semana(fecha)) for asig, est, fecha in claves}
+    if not semanas:
+        return
+
+    filas = db.execute(
+        select(Asistencia.asignacion_id, Asistencia.estudiante_id, Asistencia.fecha, Asistencia.estado).where(
+            Asistencia.asignacion_id.in_({s[0] for s in semanas}),
+            Asistencia.estudiante_id.in_({s[1] for s in semanas}),
+            Asistencia.fecha >= min(s[2] for s in semanas),
+            Asistencia.fecha < max(s[2] for s in semanas) + timedelta(days=7),
+        )
+    ).tuples()
+    conteos = {clave: fila for clave, fila in _acumular(filas).items() if clave in semanas}
+    vacias = semanas - conteos.keys()
+
+    if vacias:
+        db.execute(
+            delete(AsistenciaSemana).where(
+                tuple_(
+                    AsistenciaSemana.asignacion_id,
+                    AsistenciaSemana.estudiante_id,
+                    AsistenciaSemana.semana,
+                ).in_(vacias)
+            )
+        )
+    valores = list(conteos.values())
+    for inicio in range(0, len(valores), INSERT_CHUNK_SIZE):
+        db.execute(
+            upsert_statement(
+                db,
+                AsistenciaSemana,
+                valores[inicio:inicio + INSERT_CHUNK_SIZE],
+                conflict_cols=("asignacion_id", "estudiante_id", "semana"),
+                update_cols=_CONTADORES,
+            )
+        )
+
+
+def reconstruir_semanas(db: Session, asignacion_ids: Collection[int] | None = None) -> int:
+    """Rebuild the counters from ``asistencias`` and return the bucket count.
+
+    Rows are streamed and grouped by week in Python, which keeps the rebuild
+    portable across MySQL and SQLite. The caller owns the commit.
+    """
+
+    borrar = delete(AsistenciaSemana)
+    stmt = select(Asistencia.asignacion_id, Asistencia.estudiante_id, Asistencia.fecha, Asistencia.estado)
+    if asignacion_ids is not None:
+        borrar = borrar.where(AsistenciaSemana.asignacion_id.in_(asignacion_ids))
+        stmt = stmt.where(Asistencia.asignacion_id.in_(asignacion_ids))
+    db.execute(borrar)
+
+    valores = list(
+        _acumular(db.execute(stmt.execution_options(yield_per=INSERT_CHUNK_SIZE)).tuples()).values()
+    )
+    for inicio in range(0, len(valores), INSERT_CHUNK_SIZE):
+        db.execute(insert(AsistenciaSemana).values(valores[inicio:inicio + INSERT_CHUNK_SIZE]))
+    return len(valores)
+
+
+def contar_ausencias(
+    db: Session,
+    asignacion_ids: Collection[int],
+    desde: date,
+    estudiante_ids: Collection[int] | None = None,
+) -> dict[tuple[int, int], int]:
+    """Absences since ``desde`` per ``(asignacion_id, estudiante_id)``.
+
+    Whole weeks are summed from ``asistencia_semanas``; when ``desde`` is not
+    a monday the days before the first whole week are counted from
+    ``asistencias``, so the result is exact for any window.
+    """
+
+    primera = inicio_semana(desde)
+    if primera < desde:
+        primera += timedelta(days=7)
+
+    semanas_stmt = (
+        select(AsistenciaSemana.asignacion_id, AsistenciaSemana.estudiante_id, func.sum(AsistenciaSemana.ausentes))
+        .where(
+            AsistenciaSemana.asignacion_id.in_(asignacion_ids),
+            AsistenciaSemana.semana >= primera,
+            AsistenciaSemana.ausentes > 0,
+        )
+        .group_by(AsistenciaSemana.asignacion_id, AsistenciaSemana.estudiante_id)
+    )
+    if estudiante_ids is not None:
+        semanas_stmt = semanas_stmt.where(AsistenciaSemana.estudiante_id.in_(estudiante_ids))
+
+    faltas: dict[tuple[int, int], int] = defaultdict(int)
+    for asig_id, est_id, total in db.execute(semanas_stmt).tuples():
+        faltas[(asig_id, est_id)] += int(total)
+
+    if primera > desde:
+        dias_stmt = (
+            select(Asistencia.asignacion_id, Asistencia.estudiante_id, func.count())
+            .where(
+                Asistencia.asignacion_id.in_(asignacion_ids),
+                Asistencia.fecha >= desde,
+                Asistencia.fecha < primera,
+                Asistencia.estado.in_(ESTADOS_AUSENTE),
+            )
+            .group_by(Asistencia.asignacion_id, Asistencia.estudiante_id)
+        )
+        if estudiante_ids is not None:
+            dias_stmt = dias_stmt.where(Asistencia.estudiante_id.in_(estudiante_ids))
+        for asig_id, est_id, total in db.execute(dias_stmt).tuples():
+            faltas[(asig_id, est_id)] += int(total)
+    return dict(faltas)
@@ -0,0 +1,87 @@
+"""Constant-memory encoders for streaming exports."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Literal
+
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+
+FormatoExportacion = Literal["csv", "ndjson"]
+
+# Filas leídas del cursor del servidor y codificadas por bloque de salida.
+EXPORT_CHUNK_ROWS = 2000
+
+
+def _valor_json(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} no es serializable")
+
+
+def leer_por_bloques(db: Session, stmt: Select, chunk: int = EXPORT_CHUNK_ROWS) -> Iterator[Sequence[tuple]]:
+    """Yield ``stmt`` rows as plain tuples, ``chunk`` at a time.
+
+    ``yield_per`` makes the driver use a server-side cursor, so only one
+    block of rows is held in memory and no ORM entities are built.
+    """
+
+    resultado = db.execute(stmt.execution_options(yield_per=chunk))
+    for bloque in resultado.tuples().partitions():
+        yield bloque
+
+
+def codificar_csv(columnas: Sequence[str], bloques: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columnas)
+    for bloque in bloques:
+        writer.writerows(bloque)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def codificar_ndjson(columnas: Sequence[str], bloques: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    for bloque in bloques:
+        yield "".join(
+            json.dumps(dict(zip(columnas, fila)), default=_valor_json, ensure_ascii=False) + "\n"
+            for fila in bloque
+        ).encode()
+
+
+def comprimir_gzip(partes: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip a stream of byte chunks without buffering it whole."""
+
+    compresor = zlib.compressobj(wbits=31)
+    for parte in partes:
+        salida = compresor.compress(parte)
+        if salida:
+            yield salida
+    yield compresor.flush()
+
+
+def exportar(
+    db: Session,
+    stmt: Select,
+    columnas: Sequence[str],
+    formato: FormatoExportacion,
+    gzip: bool = False,
+) -> Iterator[bytes]:
+    """Stream ``stmt`` encoded as ``formato``; the caller owns ``db``."""
+
+    codificar = codificar_csv if formato == "csv" else codificar_ndjson
+    partes = codificar(columnas, leer_por_bloques(db, stmt))
+    return comprimir_gzip(partes) if gzip else partes
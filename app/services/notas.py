@@ -0,0 +1,199 @@
+"""Set-based helpers for registering grades in bulk."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Estudiante, Evaluacion, Matricula, Nota
+from app.db.upsert import upsert_statement
+from app.schemas.notas import NotaItem, NotaMasivaError, NotaMasivaModo, NotaMasivaResultado
+from app.services.agregados import refrescar_agregados
+from app.services.alertas_eventos import alert_events
+
+
+# Filas por sentencia INSERT; mantiene los parámetros por debajo del límite
+# de placeholders de MySQL y SQLite incluso en cargas muy grandes.
+INSERT_CHUNK_SIZE = 1000
+
+# Rango de ``ck_nota_calificacion``
+CALIFICACION_MIN = 0
+CALIFICACION_MAX = 100
+
+
+@dataclass(slots=True)
+class _ContextoNotas:
+    """Everything needed to validate a batch of grades in memory."""
+
+    asignacion_por_eval: dict[int, int]
+    estudiantes: set[int]
+    matriculas: set[tuple[int, int]]
+    existentes: dict[tuple[int, int], Decimal]
+
+    def validar(self, item: NotaItem) -> HTTPException | None:
+        """Return the error the per-item implementation raised, if any."""
+
+        if not CALIFICACION_MIN <= item.calificacion <= CALIFICACION_MAX:
+            return HTTPException(
+                400, f"Calificación {item.calificacion:g} fuera de rango ({CALIFICACION_MIN}-{CALIFICACION_MAX})"
+            )
+        asig_id = self.asignacion_por_eval.get(item.evaluacion_id)
+        if asig_id is None:
+            return HTTPException(404, f"Evaluación {item.evaluacion_id} no encontrada")
+        if item.estudiante_id not in self.estudiantes:
+            return HTTPException(404, f"Estudiante {item.estudiante_id} no encontrado")
+        if (asig_id, item.estudiante_id) not in self.matriculas:
+            return HTTPException(400, f"El estudiante {item.estudiante_id} no está matriculado en la asignación {asig_id}")
+        return None
+
+    def claves(self, filas: Sequence[dict]) -> set[tuple[int, int]]:
+        """``(asignacion_id, estudiante_id)`` of the students in ``filas``."""
+
+        return {(self.asignacion_por_eval[f["evaluacion_id"]], f["estudiante_id"]) for f in filas}
+
+
+def _cargar_contexto(db: Session, items: Sequence[NotaItem]) -> _ContextoNotas:
+    eval_ids = {item.evaluacion_id for item in items}
+    est_ids = {item.estudiante_id for item in items}
+
+    asignacion_por_eval = dict(
+        db.execute(
+            select(Evaluacion.id, Evaluacion.asignacion_id).where(Evaluacion.id.in_(eval_ids))
+        ).all()
+    )
+    estudiantes = set(
+        db.execute(select(Estudiante.id).where(Estudiante.id.in_(est_ids))).scalars()
+    )
+    matriculas = set(
+        db.execute(
+            select(Matricula.asignacion_id, Matricula.estudiante_id).where(
+                Matricula.asignacion_id.in_(set(asignacion_por_eval.values())),
+                Matricula.estudiante_id.in_(est_ids),
+            )
+        ).tuples()
+    )
+    existentes = {
+        (ev, est): cal
+        for ev, est, cal in db.execute(
+            select(Nota.evaluacion_id, Nota.estudiante_id, Nota.calificacion).where(
+                Nota.evaluacion_id.in_(eval_ids),
+                Nota.estudiante_id.in_(est_ids),
+            )
+        ).tuples()
+    }
+    return _ContextoNotas(asignacion_por_eval, estudiantes, matriculas, existentes)
+
+
+def _fila(item: NotaItem) -> dict:
+    return {
+        "evaluacion_id": item.evaluacion_id,
+        "estudiante_id": item.estudiante_id,
+        "calificacion": item.calificacion,
+    }
+
+
+def registrar_notas_masivo(db: Session, items: Sequence[NotaItem]) -> list[Nota]:
+    """Validate and insert ``items`` using a constant number of queries.
+
+    Every referenced evaluation, student, enrolment and existing grade is
+    loaded with one ``IN (...)`` query per table and validated in memory. The
+    first invalid item aborts the batch with the same message the per-item
+    implementation used to return. Valid batches are written with multi-row
+    ``INSERT`` statements and read back with a single ``SELECT``.
+    """
+
+    ctx = _cargar_contexto(db, items)
+
+    filas: list[dict] = []
+    for item in items:
+        error = ctx.validar(item)
+        if error is not None:
+            raise error
+
+        clave = (item.evaluacion_id, item.estudiante_id)
+        if clave in ctx.existentes:
+            raise HTTPException(400, f"La nota ya existe para estudiante {item.estudiante_id} en evaluación {item.evaluacion_id}")
+        ctx.existentes[clave] = Decimal(str(item.calificacion))
+        filas.append(_fila(item))
+
+    for inicio in range(0, len(filas), INSERT_CHUNK_SIZE):
+        db.execute(insert(Nota).values(filas[inicio:inicio + INSERT_CHUNK_SIZE]))
+    claves = ctx.claves(filas)
+    refrescar_agregados(db, claves)
+    db.commit()
+    alert_events.publicar(claves)
+
+    creadas = {
+        (n.evaluacion_id, n.estudiante_id): n
+        for n in db.execute(
+            select(Nota).where(
+                Nota.evaluacion_id.in_(set(ctx.asignacion_por_eval)),
+                Nota.estudiante_id.in_(ctx.estudiantes),
+            )
+        ).scalars()
+    }
+    return [creadas[(f["evaluacion_id"], f["estudiante_id"])] for f in filas]
+
+
+def sincronizar_notas_masivo(
+    db: Session, items: Sequence[NotaItem], modo: NotaMasivaModo
+) -> NotaMasivaResultado:
+    """Write ``items`` with one upsert per chunk and report each outcome.
+
+    Unlike :func:`registrar_notas_masivo`, invalid items do not abort the
+    batch: they are reported as ``rejected`` and the rest is written. Grades
+    that already exist are overwritten when ``modo`` is ``"upsert"`` (or
+    reported as ``skipped`` when the value did not change) and left intact
+    when ``modo`` is ``"skip"``.
+    """
+
+    ctx = _cargar_contexto(db, items)
+    resultado = NotaMasivaResultado(estados=[])
+    vistos: set[tuple[int, int]] = set()
+    filas: list[dict] = []
+
+    for index, item in enumerate(items):
+        error = ctx.validar(item)
+        clave = (item.evaluacion_id, item.estudiante_id)
+        if error is None and clave in vistos:
+            error = HTTPException(400, f"Nota repetida en la carga para estudiante {item.estudiante_id} en evaluación {item.evaluacion_id}")
+        if error is not None:
+            resultado.estados.append("rejected")
+            resultado.errores.append(NotaMasivaError(index=index, detail=error.detail))
+            resultado.rechazados += 1
+            continue
+        vistos.add(clave)
+
+        actual = ctx.existentes.get(clave)
+        if actual is None:
+            resultado.estados.append("inserted")
+            resultado.insertados += 1
+        elif modo == "skip" or actual == Decimal(str(item.calificacion)):
+            resultado.estados.append("skipped")
+            resultado.omitidos += 1
+            continue
+        else:
+            resultado.estados.append("updated")
+            resultado.actualizados += 1
+        filas.append(_fila(item))
+
+    for inicio in range(0, len(filas), INSERT_CHUNK_SIZE):
+        db.execute(
+            upsert_statement(
+                db,
+                Nota,
+                filas[inicio:inicio + INSERT_CHUNK_SIZE],
+                conflict_cols=("evaluacion_id", "estudiante_id"),
+                update_cols=("calificacion",) if modo == "upsert" else (),
+            )
+        )
+    claves = ctx.claves(filas)
+    refrescar_agregados(db, claves)
+    db.commit()
+    alert_events.publicar(claves)
+    return resultado
@@ -0,0 +1,67 @@
+"""Report builders that need more than a single query."""
+
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import Evaluacion, Matricula, Nota
+
+
+def construir_gradebook(db: Session, asignacion_id: int) -> dict:
+    """Build the grade matrix of an asignación with two queries.
+
+    Rows follow ``estudiantes`` (enrolled students by id) and columns follow
+    ``evaluaciones`` (by date); missing grades are ``None``. Averages use
+    only the graded evaluations of each student, like
+    ``/notas/promedio-simple`` and ``/notas/promedio-ponderado``.
+    """
+
+    estudiantes = list(
+        db.execute(
+            select(Matricula.estudiante_id)
+            .where(Matricula.asignacion_id == asignacion_id)
+            .order_by(Matricula.estudiante_id)
+        ).scalars()
+    )
+    fila_de = {est_id: i for i, est_id in enumerate(estudiantes)}
+
+    evaluaciones: list[int] = []
+    ponderaciones: list[float] = []
+    columna_de: dict[int, int] = {}
+    notas: list[list[float | None]] = [[] for _ in estudiantes]
+    # Por estudiante: cantidad, suma, suma ponderada y suma de ponderaciones.
+    totales = [[0, 0.0, 0.0, 0.0] for _ in estudiantes]
+
+    for eval_id, ponderacion, est_id, calificacion in db.execute(
+        select(Evaluacion.id, Evaluacion.ponderacion, Nota.estudiante_id, Nota.calificacion)
+        .outerjoin(Nota, Nota.evaluacion_id == Evaluacion.id)
+        .where(Evaluacion.asignacion_id == asignacion_id)
+        .order_by(Evaluacion.fecha, Evaluacion.id)
+    ).tuples():
+        if eval_id not in columna_de:
+            columna_de[eval_id] = len(evaluaciones)
+            evaluaciones.append(eval_id)
+            ponderaciones.append(float(ponderacion))
+            for fila in notas:
+                fila.append(None)
+        i = fila_de.get(est_id)
+        if i is None:
+            continue
+        cal = float(calificacion)
+        notas[i][columna_de[eval_id]] = cal
+        total = totales[i]
+        total[0] += 1
+        total[1] += cal
+        total[2] += cal * float(ponderacion)
+        total[3] += float(ponderacion)
+
+    return {
+        "asignacion_id": asignacion_id,
+        "estudiantes": estudiantes,
+        "evaluaciones": evaluaciones,
+        "ponderaciones": ponderaciones,
+        "notas": notas,
+        "promedio_simple": [suma / n if n else None for n, suma, _, _ in totales],
+        "promedio_ponderado": [sp / p if p else None for _, _, sp, p in totales],
+    }
@@ -0,0 +1,39 @@
+"""Compare the cost of verifying an access token with each verifier.
+
+Usage: ``python -m scripts.bench_jwt [iteraciones]`` from the project root
+(needs ``SECRET_KEY`` in the environment or ``.env``).
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+
+from app.core.security import (
+    SECRET_KEY,
+    TokenCache,
+    create_access_token,
+    decode_hs256,
+    decode_jose,
+)
+
+
+def main(iteraciones: int = 20_000) -> None:
+    token = create_access_token({"user_id": 1, "username": "root", "rol_codigo": "ADMIN"})
+    assert decode_hs256(token, SECRET_KEY) == decode_jose(token, SECRET_KEY)
+
+    cache = TokenCache(maxsize=16)
+    cache.put(token, decode_hs256(token, SECRET_KEY))
+
+    casos = {
+        "python-jose": lambda: decode_jose(token, SECRET_KEY),
+        "builtin HS256": lambda: decode_hs256(token, SECRET_KEY),
+        "cache LRU": lambda: cache.get(token),
+    }
+    for nombre, fn in casos.items():
+        segundos = min(timeit.repeat(fn, number=iteraciones, repeat=3))
+        print(f"{nombre:<14} {segundos / iteraciones * 1e6:8.2f} µs/token")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,178 @@
+import sys
+import types
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Provide a lightweight stub for ``mysql.connector`` so importing the API modules
+# does not require the optional MySQL dependency during the tests.
+mysql_module = types.ModuleType("mysql")
+connector_module = types.ModuleType("mysql.connector")
+connector_module.apilevel = "2.0"
+connector_module.threadsafety = 1
+connector_module.paramstyle = "pyformat"
+
+
+def _mysql_connect(*args, **kwargs):  # pragma: no cover - defensive stub
+    raise RuntimeError("mysql connector is not available in the test environment")
+
+
+connector_module.connect = _mysql_connect
+mysql_module.connector = connector_module
+sys.modules.setdefault("mysql", mysql_module)
+sys.modules.setdefault("mysql.connector", connector_module)
+
+from app.api.deps import AuthContext, get_async_db, get_db, require_auth
+from app.db import models
+from app.db.base import Base
+from app.main import app
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Archivo compartido con el engine aiosqlite de los endpoints async.
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'test.db'}",
+        future=True,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+
+@pytest.fixture
+def db_session(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@contextmanager
+def app_sin_eventos():
+    """Run ``app`` without its startup/shutdown hooks, which need MySQL."""
+
+    original_startup = list(app.router.on_startup)
+    original_shutdown = list(app.router.on_shutdown)
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+    try:
+        yield app
+    finally:
+        app.router.on_startup.extend(original_startup)
+        app.router.on_shutdown.extend(original_shutdown)
+
+
+@pytest.fixture
+def auth_context():
+    """Context ``client`` returns from ``require_auth``; ``None`` keeps real auth."""
+
+    return AuthContext(
+        user=models.Usuario(id=1),
+        rol_codigo="ADMIN",
+        permissions=frozenset({"ALERTAS", "ASISTENCIAS", "AUDITORIA", "GESTIONES", "NOTAS", "REPORTES"}),
+    )
+
+
+@pytest.fixture
+def client(engine, session_factory, auth_context):
+    def override_get_db():
+        with session_factory() as session:
+            yield session
+
+    AsyncTestingSession = async_sessionmaker(
+        create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    if auth_context is not None:
+        app.dependency_overrides[require_auth] = lambda: auth_context
+    try:
+        with app_sin_eventos(), TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def gestion_id():
+    """Primary key of the gestión seeded by ``curso``; ``None`` lets the database pick."""
+
+    return None
+
+
+@pytest.fixture
+def curso(db_session, gestion_id):
+    """Seed one asignación with two evaluations and five enrolled students."""
+
+    def persona(nombre: str) -> models.Persona:
+        return models.Persona(
+            nombres=nombre,
+            apellidos="Prueba",
+            sexo=models.SexoEnum.FEMENINO,
+            fecha_nacimiento=date(2008, 1, 1),
+        )
+
+    gestion = models.Gestion(id=gestion_id, nombre="2025", fecha_inicio=date(2025, 2, 1), fecha_fin=date(2025, 12, 1))
+    nivel = models.Nivel(nombre="Secundaria", etiqueta="SEC")
+    db_session.add_all([gestion, nivel])
+    db_session.flush()
+    curso = models.Curso(nivel_id=nivel.id, nombre="Primero", etiqueta="1RO")
+    materia = models.Materia(nombre="Matemática", codigo="MAT")
+    docente = models.Docente(persona=persona("Docente"))
+    db_session.add_all([curso, materia, docente])
+    db_session.flush()
+    paralelo = models.Paralelo(curso_id=curso.id, etiqueta="A", nombre="1A")
+    db_session.add(paralelo)
+    db_session.flush()
+    asignacion = models.AsignacionDocente(
+        gestion_id=gestion.id,
+        docente_id=docente.id,
+        materia_id=materia.id,
+        curso_id=curso.id,
+        paralelo_id=paralelo.id,
+    )
+    db_session.add(asignacion)
+    db_session.flush()
+
+    evaluaciones = [
+        models.Evaluacion(asignacion_id=asignacion.id, titulo=f"Examen {i}", fecha=date(2025, 3, i), ponderacion=50)
+        for i in (1, 2)
+    ]
+    estudiantes = [
+        models.Estudiante(persona=persona(f"Estudiante {i}"), codigo_rude=f"RUDE-{i}")
+        for i in range(5)
+    ]
+    db_session.add_all(evaluaciones + estudiantes)
+    db_session.flush()
+    db_session.add_all(
+        models.Matricula(asignacion_id=asignacion.id, estudiante_id=e.id) for e in estudiantes
+    )
+    db_session.commit()
+    return asignacion, evaluaciones, estudiantes
@@ -0,0 +1,243 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from threading import Barrier
+
+import pytest
+
+from app.db import models
+from app.services.agregados import refrescar_agregados
+from app.services.alertas import UmbralesAlerta, sincronizar_alertas
+from app.services.alertas_eventos import AlertEventQueue
+from app.core.config import settings
+from app.services import alertas_jobs
+from app.services.alertas_jobs import AlertJobRunner, JobLimitError
+from app.services.contadores_asistencia import refrescar_semanas
+
+
+@pytest.fixture
+def gestion_id():
+    # /alertas compara gestion_id con el año de la gestión.
+    return 2025
+
+
+def _notas(db_session, evaluacion, valores):
+    for est, cal in valores.items():
+        nota = (
+            db_session.query(models.Nota)
+            .filter_by(evaluacion_id=evaluacion.id, estudiante_id=est.id)
+            .one_or_none()
+        )
+        if nota is None:
+            db_session.add(models.Nota(evaluacion_id=evaluacion.id, estudiante_id=est.id, calificacion=cal))
+        else:
+            nota.calificacion = cal
+    db_session.flush()
+    refrescar_agregados(db_session, [(evaluacion.asignacion_id, est.id) for est in valores])
+    db_session.commit()
+
+
+def _alertas(db_session):
+    db_session.expire_all()
+    return {
+        (a.estudiante_id, a.tipo): a
+        for a in db_session.query(models.Alerta).all()
+    }
+
+
+def test_recalculo_incremental_conserva_estado(db_session, curso):
+    asignacion, evaluaciones, estudiantes = curso
+    umbrales = UmbralesAlerta(umbral_prom=51, faltas_max=1, dias=30)
+    _notas(db_session, evaluaciones[0], {estudiantes[0]: 30, estudiantes[1]: 90})
+    hoy = date.today()
+    db_session.add_all(
+        models.Asistencia(fecha=hoy - timedelta(days=d), asignacion_id=asignacion.id, estudiante_id=estudiantes[2].id, estado="AUSENTE")
+        for d in range(3)
+    )
+    db_session.flush()
+    refrescar_semanas(db_session, [(asignacion.id, estudiantes[2].id, hoy - timedelta(days=d)) for d in range(3)])
+    db_session.commit()
+
+    resumen = sincronizar_alertas(db_session, 2025, [asignacion.id], umbrales)
+    db_session.commit()
+
+    assert (resumen.created, resumen.updated, resumen.deleted) == (2, 0, 0)
+    alertas = _alertas(db_session)
+    assert alertas[(estudiantes[0].id, "RIESGO_PROMEDIO")].motivo == "promedio 30 < umbral 51"
+    assert alertas[(estudiantes[2].id, "RIESGO_ASISTENCIA")].score == 30
+
+    alertas[(estudiantes[0].id, "RIESGO_PROMEDIO")].estado = "LEIDO"
+    db_session.commit()
+    _notas(db_session, evaluaciones[1], {estudiantes[0]: 50})
+
+    resumen = sincronizar_alertas(db_session, 2025, [asignacion.id], umbrales)
+    db_session.commit()
+
+    assert (resumen.created, resumen.updated, resumen.deleted, resumen.unchanged) == (0, 1, 0, 1)
+    alerta = _alertas(db_session)[(estudiantes[0].id, "RIESGO_PROMEDIO")]
+    assert alerta.motivo == "promedio 40 < umbral 51"
+    assert alerta.estado == "LEIDO"
+
+    _notas(db_session, evaluaciones[1], {estudiantes[0]: 100})
+    resumen = sincronizar_alertas(db_session, 2025, [asignacion.id], umbrales)
+    db_session.commit()
+
+    assert (resumen.created, resumen.updated, resumen.deleted) == (0, 0, 1)
+    assert set(_alertas(db_session)) == {(estudiantes[2].id, "RIESGO_ASISTENCIA")}
+
+
+def test_job_recalcula_por_curso_y_limita_concurrencia(session_factory, db_session, curso):
+    asignacion, evaluaciones, estudiantes = curso
+    _notas(db_session, evaluaciones[0], {estudiantes[0]: 20, estudiantes[1]: 35})
+    runner = AlertJobRunner(session_factory=session_factory, max_workers=1)
+    try:
+        job = runner.crear(db_session, 2025, None, UmbralesAlerta())
+        with pytest.raises(JobLimitError):
+            runner.crear(db_session, 2025, None, UmbralesAlerta())
+
+        runner.ejecutar(job.id)
+
+        db_session.expire_all()
+        job = db_session.get(models.AlertaJob, job.id)
+        assert job.estado == "COMPLETADO"
+        assert (job.total, job.procesados, job.creadas) == (1, 1, 2)
+        assert job.iniciado_en is not None and job.finalizado_en is not None
+        # Once finished, the gestion accepts new jobs again.
+        assert runner.crear(db_session, 2025, None, UmbralesAlerta()).id != job.id
+    finally:
+        runner.shutdown()
+
+
+def test_crear_job_respeta_el_limite_con_solicitudes_concurrentes(session_factory):
+    runner = AlertJobRunner(session_factory=session_factory, max_workers=1)
+    barrera = Barrier(8)
+
+    def crear(_):
+        with session_factory() as db:
+            barrera.wait()
+            try:
+                return runner.crear(db, 2025, None, UmbralesAlerta()).id
+            except JobLimitError:
+                return None
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            creados = [job_id for job_id in pool.map(crear, range(8)) if job_id is not None]
+        with session_factory() as db:
+            assert db.query(models.AlertaJob).count() == len(creados) == 1
+    finally:
+        runner.shutdown()
+
+
+def test_reanudar_falla_colgados_y_reenvia_pendientes(session_factory, db_session, monkeypatch):
+    viejo = datetime.now() - timedelta(days=1)
+    jobs = {
+        nombre: models.AlertaJob(
+            gestion=gestion, umbral_prom=51, faltas_max=3, dias=30, estado=estado, creado_en=creado
+        )
+        for nombre, gestion, estado, creado in [
+            ("colgado", 2024, "EN_CURSO", viejo),
+            ("olvidado", 2024, "PENDIENTE", viejo),
+            ("pendiente", 2025, "PENDIENTE", datetime.now()),
+        ]
+    }
+    db_session.add_all(jobs.values())
+    db_session.commit()
+    runner = AlertJobRunner(session_factory=session_factory, max_workers=1)
+    enviados = []
+    monkeypatch.setattr(runner, "submit", enviados.append)
+    try:
+        assert runner.reanudar() == enviados == [jobs["pendiente"].id]
+
+        db_session.expire_all()
+        for nombre in ("colgado", "olvidado"):
+            assert jobs[nombre].estado == "FALLIDO"
+            assert jobs[nombre].error and jobs[nombre].finalizado_en is not None
+        # The 2024 gestion is free again once its stale jobs are failed.
+        assert runner.crear(db_session, 2024, None, UmbralesAlerta()).estado == "PENDIENTE"
+
+        runner.ejecutar(jobs["pendiente"].id)
+        runner.ejecutar(jobs["pendiente"].id)
+        db_session.expire_all()
+        assert jobs["pendiente"].estado == "COMPLETADO"
+    finally:
+        runner.shutdown()
+
+
+def test_job_largo_con_avance_no_se_vence_y_uno_vencido_se_detiene(session_factory, db_session, curso, monkeypatch):
+    asignacion, evaluaciones, estudiantes = curso
+    _notas(db_session, evaluaciones[0], {estudiantes[0]: 20})
+    runner = AlertJobRunner(session_factory=session_factory, max_workers=1)
+    job = runner.crear(db_session, 2025, None, UmbralesAlerta())
+    # Created long ago but with recent progress: still holds the gestion slot.
+    job.estado, job.creado_en = "EN_CURSO", datetime.now() - timedelta(days=1)
+    db_session.commit()
+    with pytest.raises(JobLimitError):
+        runner.crear(db_session, 2025, None, UmbralesAlerta())
+
+    job.estado = "PENDIENTE"
+    db_session.commit()
+    original = alertas_jobs.sincronizar_alertas
+
+    def vencer_durante_el_lote(db, *args):
+        # Another request expires the job while its first chunk runs.
+        with session_factory() as otra, monkeypatch.context() as m:
+            m.setattr(settings, "ALERT_JOBS_TIMEOUT_MINUTES", -1)
+            assert runner.vencer_colgados(otra, 2025) == 1
+            otra.commit()
+        return original(db, *args)
+
+    monkeypatch.setattr(alertas_jobs, "sincronizar_alertas", vencer_durante_el_lote)
+    try:
+        runner.ejecutar(job.id)
+    finally:
+        runner.shutdown()
+
+    db_session.expire_all()
+    assert job.estado == "FALLIDO" and job.procesados == 0
+    assert _alertas(db_session) == {}
+
+
+def test_eventos_usan_los_umbrales_del_ultimo_recalculo(session_factory, db_session, curso):
+    asignacion, evaluaciones, estudiantes = curso
+    _notas(db_session, evaluaciones[0], {estudiantes[0]: 20, estudiantes[1]: 35})
+    runner = AlertJobRunner(session_factory=session_factory, max_workers=1)
+    umbrales = UmbralesAlerta(umbral_prom=30, faltas_max=10, dias=30)
+    resumen = sincronizar_alertas(db_session, 2025, [asignacion.id], umbrales)
+    runner.registrar(db_session, 2025, None, umbrales, resumen)
+    # A failed job with other thresholds does not count.
+    db_session.add(
+        models.AlertaJob(gestion=2025, umbral_prom=90, faltas_max=0, dias=30, estado="FALLIDO")
+    )
+    db_session.commit()
+    runner.shutdown()
+
+    claves = [(asignacion.id, estudiantes[0].id), (asignacion.id, estudiantes[1].id)]
+    AlertEventQueue(session_factory=session_factory).procesar(claves)
+
+    alertas = _alertas(db_session)
+    assert set(alertas) == {(estudiantes[0].id, "RIESGO_PROMEDIO")}
+    assert alertas[(estudiantes[0].id, "RIESGO_PROMEDIO")].motivo == "promedio 20 < umbral 30"
+
+
+def test_eventos_recalculan_solo_los_estudiantes_publicados(session_factory, db_session, curso):
+    asignacion, evaluaciones, estudiantes = curso
+    _notas(db_session, evaluaciones[0], {estudiantes[0]: 20, estudiantes[1]: 35})
+    cola = AlertEventQueue(session_factory=session_factory, debounce=0.05)
+
+    cola.publicar([(asignacion.id, estudiantes[0].id)])
+    assert _alertas(db_session) == {}
+
+    cola.start()
+    try:
+        cola.publicar([(asignacion.id, estudiantes[0].id)])
+        for _ in range(100):
+            if _alertas(db_session):
+                break
+            time.sleep(0.02)
+    finally:
+        cola.stop()
+
+    # Only the published student is refreshed; the other one waits for a recalc.
+    assert set(_alertas(db_session)) == {(estudiantes[0].id, "RIESGO_PROMEDIO")}
+    assert _alertas(db_session)[(estudiantes[0].id, "RIESGO_PROMEDIO")].gestion == 2025
@@ -0,0 +1,158 @@
+import json
+from datetime import date
+
+from app.api.v1.asistencia import crear_asistencia_masiva
+from app.db import models
+from app.db.query_counter import track_queries
+from app.schemas.asistencias import AsistenciaItem, AsistenciaMasivaIn
+from app.services.contadores_asistencia import contar_ausencias, reconstruir_semanas
+
+
+def test_masivo_usa_consultas_constantes(db_session, curso):
+    asignacion, _, estudiantes = curso
+    payload = AsistenciaMasivaIn(
+        fecha=date(2025, 3, 10),
+        asignacion_id=asignacion.id,
+        items=[AsistenciaItem(estudiante_id=e.id, estado="PRESENTE") for e in estudiantes]
+        + [AsistenciaItem(estudiante_id=999, estado="AUSENTE")],
+    )
+
+    with track_queries() as stats:
+        out = crear_asistencia_masiva(payload, db=db_session)
+
+    assert out == {"insertados": 5, "duplicados": 0, "no_matriculados": 1}
+    # Enrolments, existing rows, one INSERT and the weekly counter refresh
+    # (SELECT + upsert), whatever the class size.
+    assert stats.count == 5
+    assert db_session.query(models.Asistencia).count() == 5
+
+    again = crear_asistencia_masiva(payload, db=db_session)
+    assert again == {"insertados": 0, "duplicados": 5, "no_matriculados": 1}
+
+
+def test_masivo_upsert_actualiza_estado_y_observacion(db_session, curso):
+    asignacion, _, estudiantes = curso
+    fecha = date(2025, 3, 11)
+    crear_asistencia_masiva(
+        AsistenciaMasivaIn(
+            fecha=fecha,
+            asignacion_id=asignacion.id,
+            items=[AsistenciaItem(estudiante_id=e.id, estado="PRESENTE") for e in estudiantes[:2]],
+        ),
+        db=db_session,
+    )
+
+    out = crear_asistencia_masiva(
+        AsistenciaMasivaIn(
+            fecha=fecha,
+            asignacion_id=asignacion.id,
+            items=[
+                AsistenciaItem(estudiante_id=estudiantes[0].id, estado="TARDE", observacion="Llegó 8:20"),
+                AsistenciaItem(estudiante_id=estudiantes[1].id, estado="PRESENTE"),
+                AsistenciaItem(estudiante_id=estudiantes[2].id, estado="AUSENTE"),
+            ],
+        ),
+        upsert=True,
+        db=db_session,
+    )
+
+    assert out == {"insertados": 1, "duplicados": 1, "no_matriculados": 0, "actualizados": 1}
+    db_session.expire_all()
+    fila = (
+        db_session.query(models.Asistencia)
+        .filter_by(fecha=fecha, estudiante_id=estudiantes[0].id)
+        .one()
+    )
+    assert (fila.estado, fila.observacion) == ("TARDE", "Llegó 8:20")
+
+
+def test_importar_ndjson_y_csv_por_asignacion(client, db_session, curso):
+    asignacion, _, estudiantes = curso
+    lineas = [
+        json.dumps({"fecha": f"2025-03-{dia:02d}", "asignacion_id": asignacion.id, "estudiante_id": e.id, "estado": "PRESENTE"})
+        for dia in (10, 11, 12)
+        for e in estudiantes
+    ]
+    lineas.append(json.dumps({"fecha": "2025-03-10", "asignacion_id": asignacion.id, "estudiante_id": 999, "estado": "PRESENTE"}))
+    lineas.append("{no es json")
+
+    response = client.post(
+        "/api/v1/asistencias/importar",
+        content="\n".join(lineas).encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["filas"] == 16
+    assert body["invalidas"] == 1
+    assert body["errores"] == [{"linea": 17, "detail": "JSON inválido"}]
+    assert body["por_asignacion"][str(asignacion.id)] == {
+        "insertados": 15, "actualizados": 0, "duplicados": 0, "no_matriculados": 1,
+    }
+
+    csv_body = "fecha,asignacion_id,estudiante_id,estado,observacion\r\n" + "\r\n".join(
+        f'2025-03-10,{asignacion.id},{e.id},TARDE,"Llegó tarde, 8:15"' for e in estudiantes[:2]
+    )
+    response = client.post(
+        "/api/v1/asistencias/importar",
+        content=csv_body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["total"]["actualizados"] == 2
+    fila = (
+        db_session.query(models.Asistencia)
+        .filter_by(fecha=date(2025, 3, 10), estudiante_id=estudiantes[0].id)
+        .one()
+    )
+    assert (fila.estado, fila.observacion) == ("TARDE", "Llegó tarde, 8:15")
+    assert db_session.query(models.Asistencia).count() == 15
+
+
+def test_contadores_semanales_siguen_las_asistencias(db_session, curso):
+    asignacion, _, estudiantes = curso
+    est = estudiantes[0]
+    # Jueves 6 a martes 18 de marzo de 2025: tres semanas distintas.
+    for fecha, estado in [
+        (date(2025, 3, 6), "AUSENTE"),
+        (date(2025, 3, 7), "AUSENTE"),
+        (date(2025, 3, 10), "AUSENTE"),
+        (date(2025, 3, 12), "PRESENTE"),
+        (date(2025, 3, 18), "AUSENTE"),
+    ]:
+        crear_asistencia_masiva(
+            AsistenciaMasivaIn(
+                fecha=fecha,
+                asignacion_id=asignacion.id,
+                items=[AsistenciaItem(estudiante_id=est.id, estado=estado)],
+            ),
+            db=db_session,
+        )
+    crear_asistencia_masiva(
+        AsistenciaMasivaIn(
+            fecha=date(2025, 3, 10),
+            asignacion_id=asignacion.id,
+            items=[AsistenciaItem(estudiante_id=est.id, estado="JUSTIFICADO")],
+        ),
+        upsert=True,
+        db=db_session,
+    )
+
+    semanas = {
+        s.semana: (s.presentes, s.ausentes, s.justificados)
+        for s in db_session.query(models.AsistenciaSemana).filter_by(estudiante_id=est.id)
+    }
+    assert semanas == {
+        date(2025, 3, 3): (0, 2, 0),
+        date(2025, 3, 10): (1, 0, 1),
+        date(2025, 3, 17): (0, 1, 0),
+    }
+    clave = (asignacion.id, est.id)
+    assert contar_ausencias(db_session, [asignacion.id], date(2025, 3, 7)) == {clave: 2}
+    assert contar_ausencias(db_session, [asignacion.id], date(2025, 3, 3)) == {clave: 3}
+
+    db_session.query(models.AsistenciaSemana).delete()
+    assert reconstruir_semanas(db_session) == 3
+    assert contar_ausencias(db_session, [asignacion.id], date(2025, 3, 7), [est.id]) == {clave: 2}
@@ -0,0 +1,183 @@
+import types
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError
+
+from app.api import deps
+from app.api.deps import get_db, require_auth
+from app.core.permissions import PermissionMatrix, RolePermissionCache, bump_version, permission_cache
+from app.core.security import (
+    SECRET_KEY,
+    TokenCache,
+    create_access_token,
+    decode_hs256,
+    decode_jose,
+    decode_token,
+    hash_password,
+)
+from app.core.user_cache import user_cache
+from app.db import models
+from app.db.query_counter import track_queries
+from app.db.session import session_usage
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def caches_limpias():
+    user_cache.clear()
+    permission_cache.clear()
+    try:
+        yield
+    finally:
+        user_cache.clear()
+        permission_cache.clear()
+
+
+@pytest.fixture
+def auth_context():
+    # Estas pruebas firman tokens reales y pasan por ``require_auth``.
+    return None
+
+
+@pytest.fixture
+def admin(db_session):
+    vista = models.Vista(nombre="Usuarios", codigo="USUARIOS")
+    rol = models.Rol(nombre="Administrador", codigo="ADMIN", vistas=[vista])
+    usuario = models.Usuario(
+        persona=models.Persona(
+            nombres="Ana",
+            apellidos="Prueba",
+            sexo=models.SexoEnum.FEMENINO,
+            fecha_nacimiento=date(1990, 1, 1),
+        ),
+        username="admin",
+        password_hash=hash_password("secreto123"),
+        rol=rol,
+        estado=models.EstadoUsuarioEnum.ACTIVO,
+    )
+    db_session.add(usuario)
+    db_session.commit()
+    return usuario
+
+
+def _token(usuario):
+    return create_access_token({"user_id": usuario.id, "username": usuario.username, "rol_codigo": "ADMIN"})
+
+
+def test_require_auth_usa_cache_y_carga_usuario_bajo_demanda(db_session, admin):
+    request = types.SimpleNamespace(cookies={}, state=types.SimpleNamespace())
+    token = _token(admin)
+
+    require_auth(request, token, db_session)
+    db_session.expunge_all()
+
+    with track_queries() as stats:
+        context = require_auth(request, token, db_session)
+    assert stats.count == 0
+    assert context.user_id == admin.id
+    assert context.rol_codigo == "ADMIN"
+    assert context.permissions == frozenset({"USUARIOS"})
+
+    with track_queries() as stats:
+        assert context.user.username == "admin"
+    assert stats.count == 1
+
+
+def test_escrituras_de_usuario_invalidan_cache(client, admin):
+    headers = {"Authorization": f"Bearer {_token(admin)}"}
+    assert client.get("/api/v1/usuarios/", headers=headers).status_code == 200
+
+    response = client.patch(
+        f"/api/v1/usuarios/{admin.id}",
+        json={"estado": "INACTIVO"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/v1/usuarios/", headers=headers).status_code == 401
+
+
+def test_version_de_permisos_invalida_cache_de_otros_procesos(db_session, admin):
+    otro_worker = RolePermissionCache(check_interval=0)
+    rol_id = admin.rol_id
+    assert otro_worker.get_permissions(db_session, rol_id) == frozenset({"USUARIOS"})
+
+    rol = db_session.get(models.Rol, rol_id)
+    rol.vistas.append(models.Vista(nombre="Roles", codigo="ROLES"))
+    db_session.commit()
+    assert otro_worker.get_permissions(db_session, rol_id) == frozenset({"USUARIOS"})
+
+    bump_version(db_session)
+    db_session.commit()
+    assert otro_worker.get_permissions(db_session, rol_id) == frozenset({"USUARIOS", "ROLES"})
+
+
+def test_matriz_de_permisos_se_carga_en_una_consulta(db_session, admin):
+    otro = models.Rol(nombre="Docente", codigo="DOCENTE")
+    db_session.add_all([otro, models.Vista(nombre="Notas", codigo="NOTAS")])
+    db_session.commit()
+
+    with track_queries() as stats:
+        matriz = PermissionMatrix.load(db_session, version=0)
+    assert stats.count == 1
+
+    permisos = matriz.for_role(admin.rol_id)
+    assert "USUARIOS" in permisos
+    assert "NOTAS" not in permisos
+    assert "DESCONOCIDA" not in permisos
+    assert permisos == frozenset({"USUARIOS"})
+    assert sorted(matriz.for_role(otro.id)) == []
+
+
+def test_verificador_hs256_equivale_a_python_jose():
+    token = create_access_token({"user_id": 7, "username": "ana"})
+    assert decode_hs256(token, SECRET_KEY) == decode_jose(token, SECRET_KEY)
+
+    cabecera, carga, firma = token.split(".")
+    for alterado in (f"{cabecera}.{carga}.{firma[:-2]}AA", f"{cabecera}.{carga}", "basura"):
+        with pytest.raises(JWTError):
+            decode_hs256(alterado, SECRET_KEY)
+    with pytest.raises(JWTError):
+        decode_hs256(token, "otra-clave")
+    with pytest.raises(JWTError):
+        decode_hs256(create_access_token({"user_id": 7}, expires_minutes=-1), SECRET_KEY)
+
+    with pytest.raises(HTTPException):
+        decode_token(f"{cabecera}.{carga}.{firma[:-2]}AA")
+
+
+def test_cache_de_tokens_respeta_exp(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr("app.core.security.time.time", lambda: ahora[0])
+    cache = TokenCache(maxsize=2)
+
+    cache.put("a", {"user_id": 1, "exp": 1060})
+    cache.put("sin-exp", {"user_id": 2})
+    assert cache.get("a") == {"user_id": 1, "exp": 1060}
+    assert cache.get("sin-exp") is None
+
+    cache.put("b", {"exp": 2000})
+    cache.put("c", {"exp": 2000})
+    assert cache.get("a") is None
+
+    ahora[0] = 2000
+    assert cache.get("b") is None
+
+
+def test_peticiones_servidas_desde_cache_no_usan_conexion(client, session_factory, admin, monkeypatch):
+    # Sin el override de ``get_db``: la sesión real es la que registra ``session_usage``.
+    monkeypatch.setattr(deps, "SessionLocal", session_factory)
+    app.dependency_overrides.pop(get_db)
+    headers = {"Authorization": f"Bearer {_token(admin)}"}
+    antes = session_usage.stats()
+    assert client.get("/api/v1/auth/me/permisos", headers=headers).json() == ["USUARIOS"]
+    calentado = session_usage.stats()
+    assert calentado["con_conexion"] == antes["con_conexion"] + 1
+
+    for _ in range(3):
+        assert client.get("/api/v1/auth/me/permisos", headers=headers).status_code == 200
+    despues = session_usage.stats()
+    assert despues["sesiones"] == calentado["sesiones"] + 3
+    assert despues["con_conexion"] == calentado["con_conexion"]
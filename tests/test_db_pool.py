@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api import deps
+from app.api.middleware import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, read_your_writes
+from app.db.session import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_stats, session_usage
+
+
+def test_pool_instrumentado_registra_esperas_y_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            stats = pool_stats(engine)
+            assert stats["checked_out"] == 1
+            assert stats["esperas"] == 1
+
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        stats = pool_stats(engine)
+        assert stats["pool"] == "InstrumentedQueuePool"
+        assert stats["checked_out"] == 0
+        assert stats["checked_in"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["esperas"] == 2
+        assert stats["espera_max_ms"] >= 40
+        assert (stats["conexiones_creadas"], stats["prestamos"], stats["pico_en_uso"]) == (1, 1, 1)
+        assert stats["uso_max_ms"] > 0
+
+        # ``dispose()`` recrea el pool sin perder las métricas ni los eventos.
+        engine.dispose()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        assert (stats["conexiones_creadas"], stats["prestamos"], stats["esperas"]) == (2, 2, 3)
+    finally:
+        engine.dispose()
+
+
+def test_pool_async_instrumentado(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=2,
+    )
+
+    async def consultar():
+        async with engine.connect() as a, engine.connect() as b:
+            await a.execute(text("SELECT 1"))
+            await b.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    asyncio.run(consultar())
+    stats = pool_stats(engine.sync_engine)
+    assert stats["pool"] == "InstrumentedAsyncQueuePool"
+    assert (stats["prestamos"], stats["pico_en_uso"], stats["esperas"]) == (2, 2, 2)
+    assert stats["checked_out"] == 0
+
+
+def test_lecturas_van_a_la_replica_salvo_tras_escribir(tmp_path, monkeypatch):
+    primario = create_engine(f"sqlite+pysqlite:///{tmp_path / 'primario.db'}")
+    replica = create_engine(f"sqlite+pysqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(deps, "ReadSessionLocal", sessionmaker(bind=replica))
+
+    app = FastAPI()
+    app.middleware("http")(read_your_writes)
+
+    def override_get_db():
+        with Session(primario) as db:
+            yield db
+
+    @app.get("/leer")
+    def leer(db: Session = Depends(deps.get_read_db)):
+        return {"base": db.get_bind().url.database.rsplit("/", 1)[-1]}
+
+    @app.post("/escribir")
+    def escribir():
+        return {}
+
+    app.dependency_overrides[deps.get_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            assert client.get("/leer").json() == {"base": "replica.db"}
+            assert client.get("/leer", headers={READ_PRIMARY_HEADER: "1"}).json() == {"base": "primario.db"}
+
+            res = client.post("/escribir")
+            assert READ_PRIMARY_COOKIE in res.cookies
+            assert client.get("/leer").json() == {"base": "primario.db"}
+
+            client.cookies.clear()
+            assert client.get("/leer").json() == {"base": "replica.db"}
+    finally:
+        primario.dispose()
+        replica.dispose()
+
+
+def test_consultas_en_la_replica_cuentan_como_sesion_con_conexion(tmp_path, monkeypatch):
+    primario = create_engine(f"sqlite+pysqlite:///{tmp_path / 'primario.db'}")
+    replica = create_engine(f"sqlite+pysqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(deps, "SessionLocal", sessionmaker(bind=primario))
+    monkeypatch.setattr(deps, "ReadSessionLocal", sessionmaker(bind=replica))
+
+    app = FastAPI()
+
+    @app.get("/leer")
+    def leer(db: Session = Depends(deps.get_read_db)):
+        return db.execute(text("SELECT 1")).scalar_one()
+
+    try:
+        with TestClient(app) as client:
+            antes = session_usage.stats()
+            assert client.get("/leer").json() == 1
+            despues = session_usage.stats()
+        assert despues["sesiones"] == antes["sesiones"] + 1
+        assert despues["con_conexion"] == antes["con_conexion"] + 1
+        assert despues["sin_conexion"] == antes["sin_conexion"]
+    finally:
+        primario.dispose()
+        replica.dispose()
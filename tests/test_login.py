@@ -0,0 +1,191 @@
+import asyncio
+from datetime import date
+from threading import Event
+
+import pytest
+from passlib.hash import bcrypt as bcrypt_hash
+from starlette.datastructures import Headers
+
+from app.core import security
+from app.core.permissions import permission_cache
+from app.api.v1 import auth as auth_module
+from app.core.rate_limit import ClientIPResolver, LoginRateLimiter, MemoryRateLimitStore, login_limiter
+from app.core.security import PasswordHasher, PasswordQueueFull, needs_rehash
+from app.core.user_cache import user_cache
+from app.db import models
+
+
+@pytest.fixture
+def auth_context():
+    # El login se prueba con la autenticación real.
+    return None
+
+
+@pytest.fixture(autouse=True)
+def caches_limpias():
+    user_cache.clear()
+    permission_cache.clear()
+    login_limiter.store = MemoryRateLimitStore()
+    try:
+        yield
+    finally:
+        user_cache.clear()
+        permission_cache.clear()
+
+
+def _usuario(db_session, username, password_hash):
+    usuario = models.Usuario(
+        persona=models.Persona(
+            nombres="Ana",
+            apellidos="Prueba",
+            sexo=models.SexoEnum.FEMENINO,
+            fecha_nacimiento=date(1990, 1, 1),
+        ),
+        username=username,
+        password_hash=password_hash,
+        rol=models.Rol(nombre="Administrador", codigo="ADMIN"),
+        estado=models.EstadoUsuarioEnum.ACTIVO,
+    )
+    db_session.add(usuario)
+    db_session.commit()
+    return usuario
+
+
+def test_login_rehashea_cuando_cambia_el_costo(client, db_session):
+    anterior = bcrypt_hash.using(rounds=4).hash("secreto123")
+    assert needs_rehash(anterior)
+    usuario = _usuario(db_session, "ana", anterior)
+
+    response = client.post("/api/v1/auth/login", json={"username": "ana", "password": "secreto123"})
+    assert response.status_code == 200
+
+    db_session.refresh(usuario)
+    assert usuario.password_hash != anterior
+    assert not needs_rehash(usuario.password_hash)
+
+
+def test_login_incorrecto_no_rehashea(client, db_session):
+    anterior = bcrypt_hash.using(rounds=4).hash("secreto123")
+    usuario = _usuario(db_session, "ana", anterior)
+
+    response = client.post("/api/v1/auth/login", json={"username": "ana", "password": "otra-clave"})
+    assert response.status_code == 401
+
+    db_session.refresh(usuario)
+    assert usuario.password_hash == anterior
+
+
+def test_cambio_de_contrasena_usa_el_pool(client, db_session, monkeypatch):
+    usuario = _usuario(db_session, "ana", bcrypt_hash.using(rounds=4).hash("secreto123"))
+    login = client.post("/api/v1/auth/login", json={"username": "ana", "password": "secreto123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    payload = {"old_password": "secreto123", "new_password": "nueva-clave"}
+
+    async def pool_lleno(*args):
+        raise PasswordQueueFull
+
+    with monkeypatch.context() as m:
+        m.setattr(security.password_hasher, "verify", pool_lleno)
+        ocupado = client.post("/api/v1/auth/change-password", json=payload, headers=headers)
+    assert ocupado.status_code == 503
+
+    response = client.post("/api/v1/auth/change-password", json=payload, headers=headers)
+    assert response.status_code == 200
+    db_session.refresh(usuario)
+    assert security.verify_password("nueva-clave", usuario.password_hash)
+
+
+def test_pool_de_contrasenas_rechaza_cuando_esta_lleno(monkeypatch):
+    liberar = Event()
+
+    def verificar_lento(plain, hashed):
+        liberar.wait(5)
+        return True
+
+    monkeypatch.setattr(security, "verify_password", verificar_lento)
+    hasher = PasswordHasher(max_workers=1, max_pending=0)
+
+    async def escenario():
+        primero = asyncio.ensure_future(hasher.verify("a", "b"))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordQueueFull):
+            await hasher.verify("a", "b")
+        liberar.set()
+        assert await primero
+        assert await hasher.verify("a", "b")
+
+    try:
+        asyncio.run(escenario())
+    finally:
+        hasher.shutdown()
+
+
+def test_login_limita_intentos_fallidos_por_usuario(client):
+    antes = login_limiter.stats()
+    for _ in range(login_limiter.per_username):
+        response = client.post("/api/v1/auth/login", json={"username": "nadie", "password": "incorrecta"})
+        assert response.status_code == 401
+
+    response = client.post("/api/v1/auth/login", json={"username": "NADIE", "password": "incorrecta"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(int(login_limiter.window))
+
+    response = client.post("/api/v1/auth/login", json={"username": "otro", "password": "incorrecta"})
+    assert response.status_code == 401
+
+    despues = login_limiter.stats()
+    assert despues["limitados"] - antes["limitados"] == 1
+    assert despues["permitidos"] - antes["permitidos"] == login_limiter.per_username + 1
+
+
+def test_limitador_por_ip_y_ventana_deslizante(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.time", lambda: ahora[0])
+    limiter = LoginRateLimiter(MemoryRateLimitStore(), window=60, per_username=10, per_ip=2)
+
+    limiter.register_failure("ana", "10.0.0.1")
+    limiter.register_failure("luis", "10.0.0.1")
+    assert not limiter.allow("rosa", "10.0.0.1")
+    assert limiter.allow("rosa", "10.0.0.2")
+
+    ahora[0] += 61
+    assert limiter.allow("rosa", "10.0.0.1")
+
+
+def test_ip_reenviada_solo_desde_proxy_confiable():
+    resolver = ClientIPResolver(["10.0.0.0/8"])
+    headers = Headers({"x-forwarded-for": "1.2.3.4, 203.0.113.7, 10.0.0.2"})
+
+    assert resolver.resolve("10.0.0.1", headers) == "203.0.113.7"
+    assert resolver.resolve("198.51.100.1", headers) == "198.51.100.1"
+    assert ClientIPResolver([]).resolve("10.0.0.1", headers) == "10.0.0.1"
+
+    forwarded = Headers({"forwarded": 'for="[2001:db8::1]:4711";proto=https, for=10.0.0.3'})
+    assert resolver.resolve("10.0.0.1", forwarded) == "2001:db8::1"
+
+
+def test_limitador_por_ip_desactivado():
+    limiter = LoginRateLimiter(MemoryRateLimitStore(), window=60, per_username=10, per_ip=0)
+
+    for username in ("ana", "luis", "rosa"):
+        limiter.register_failure(username, "10.0.0.1")
+    assert limiter.allow("pedro", "10.0.0.1")
+
+
+def test_login_limita_por_ip_reenviada(client, monkeypatch):
+    resolver = ClientIPResolver(["10.0.0.0/8"])
+    monkeypatch.setattr(resolver, "is_trusted", lambda ip: ip == "testclient" or ip.startswith("10."))
+    monkeypatch.setattr(auth_module, "client_ip_resolver", resolver)
+    monkeypatch.setattr(login_limiter, "per_ip", 2)
+
+    def intentar(username, ip):
+        return client.post(
+            "/api/v1/auth/login",
+            json={"username": username, "password": "incorrecta"},
+            headers={"X-Forwarded-For": ip},
+        ).status_code
+
+    assert intentar("ana", "203.0.113.7") == 401
+    assert intentar("luis", "203.0.113.7") == 401
+    assert intentar("rosa", "203.0.113.7") == 429
+    assert intentar("rosa", "198.51.100.20") == 401
@@ -0,0 +1,190 @@
+import asyncio
+import re
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.v1.notas import crear_notas_masivo, promedio_ponderado, promedio_simple
+from app.api.v1.reportes import promedios_curso
+from app.db import models
+from app.schemas.notas import NotaItem, NotaMasivaIn
+from app.services.agregados import reconstruir_agregados
+
+
+def _promedios_curso(db_session, asignacion_id):
+    """Call the async ``promedios_curso`` on the same sqlite file via aiosqlite."""
+
+    async def consultar():
+        engine = create_async_engine(
+            db_session.get_bind().url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool
+        )
+        async with AsyncSession(engine) as db:
+            return await promedios_curso(asignacion_id, db=db)
+
+    return asyncio.run(consultar())
+
+
+def test_bulk_inserta_todas_las_notas_con_consultas_constantes(client, db_session, curso):
+    _, evaluaciones, estudiantes = curso
+    items = [
+        NotaItem(evaluacion_id=ev.id, estudiante_id=est.id, calificacion=60 + i)
+        for ev in evaluaciones
+        for i, est in enumerate(estudiantes)
+    ]
+    response = client.post("/api/v1/notas/bulk", json={"items": [i.model_dump(mode="json") for i in items]})
+
+    assert response.status_code == 200
+    out = response.json()
+    assert [(n["evaluacion_id"], n["estudiante_id"]) for n in out] == [
+        (i.evaluacion_id, i.estudiante_id) for i in items
+    ]
+    assert all(n["id"] is not None for n in out)
+    assert db_session.query(models.Nota).count() == len(items)
+    # Four lookups, one INSERT, the aggregate refresh (SELECT + upsert) and
+    # one read-back regardless of batch size.
+    consultas = re.search(r'db;desc="(\d+) consultas"', response.headers["Server-Timing"])
+    assert int(consultas.group(1)) <= 8
+
+
+def test_bulk_conserva_mensajes_por_item(db_session, curso):
+    asignacion, evaluaciones, estudiantes = curso
+    ev, est = evaluaciones[0], estudiantes[0]
+    externo = models.Estudiante(
+        persona=models.Persona(
+            nombres="Externo",
+            apellidos="Prueba",
+            sexo=models.SexoEnum.MASCULINO,
+            fecha_nacimiento=date(2008, 1, 1),
+        ),
+        codigo_rude="RUDE-X",
+    )
+    db_session.add(externo)
+    db_session.commit()
+
+    casos = [
+        (NotaItem(evaluacion_id=999, estudiante_id=est.id, calificacion=50), 404, "Evaluación 999 no encontrada"),
+        (NotaItem(evaluacion_id=ev.id, estudiante_id=999, calificacion=50), 404, "Estudiante 999 no encontrado"),
+        (
+            NotaItem(evaluacion_id=ev.id, estudiante_id=externo.id, calificacion=50),
+            400,
+            f"El estudiante {externo.id} no está matriculado en la asignación {asignacion.id}",
+        ),
+    ]
+    for item, status_code, detail in casos:
+        with pytest.raises(HTTPException) as excinfo:
+            crear_notas_masivo(NotaMasivaIn(items=[item]), db=db_session)
+        assert excinfo.value.status_code == status_code
+        assert excinfo.value.detail == detail
+
+    item = NotaItem(evaluacion_id=ev.id, estudiante_id=est.id, calificacion=70)
+    crear_notas_masivo(NotaMasivaIn(items=[item]), db=db_session)
+    with pytest.raises(HTTPException) as excinfo:
+        crear_notas_masivo(NotaMasivaIn(items=[item]), db=db_session)
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == f"La nota ya existe para estudiante {est.id} en evaluación {ev.id}"
+
+
+def test_bulk_upsert_reporta_estado_por_item(db_session, curso):
+    _, evaluaciones, estudiantes = curso
+    ev = evaluaciones[0]
+    crear_notas_masivo(
+        NotaMasivaIn(items=[
+            NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[0].id, calificacion=40),
+            NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[1].id, calificacion=80),
+        ]),
+        db=db_session,
+    )
+    items = [
+        NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[0].id, calificacion=55),
+        NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[1].id, calificacion=80),
+        NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[2].id, calificacion=90),
+        NotaItem(evaluacion_id=999, estudiante_id=estudiantes[3].id, calificacion=90),
+    ]
+
+    resultado = crear_notas_masivo(NotaMasivaIn(items=items), mode="upsert", db=db_session)
+
+    assert resultado.estados == ["updated", "skipped", "inserted", "rejected"]
+    assert (resultado.insertados, resultado.actualizados, resultado.omitidos, resultado.rechazados) == (1, 1, 1, 1)
+    assert resultado.errores[0].index == 3
+    assert resultado.errores[0].detail == "Evaluación 999 no encontrada"
+    db_session.expire_all()
+    notas = {
+        n.estudiante_id: float(n.calificacion)
+        for n in db_session.query(models.Nota).filter(models.Nota.evaluacion_id == ev.id)
+    }
+    assert notas == {estudiantes[0].id: 55.0, estudiantes[1].id: 80.0, estudiantes[2].id: 90.0}
+
+
+def test_bulk_upsert_rechaza_calificaciones_fuera_de_rango(db_session, curso):
+    _, evaluaciones, estudiantes = curso
+    ev = evaluaciones[0]
+    items = [
+        NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[0].id, calificacion=70),
+        NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[1].id, calificacion=150),
+        NotaItem(evaluacion_id=ev.id, estudiante_id=estudiantes[2].id, calificacion=-1),
+    ]
+
+    resultado = crear_notas_masivo(NotaMasivaIn(items=items), mode="upsert", db=db_session)
+
+    assert resultado.estados == ["inserted", "rejected", "rejected"]
+    assert [e.index for e in resultado.errores] == [1, 2]
+    assert resultado.errores[0].detail == "Calificación 150 fuera de rango (0-100)"
+    db_session.expire_all()
+    assert [n.estudiante_id for n in db_session.query(models.Nota)] == [estudiantes[0].id]
+
+    with pytest.raises(HTTPException) as excinfo:
+        crear_notas_masivo(NotaMasivaIn(items=items[1:2]), db=db_session)
+    assert excinfo.value.status_code == 400
+
+
+def test_bulk_skip_no_modifica_notas_existentes(db_session, curso):
+    _, evaluaciones, estudiantes = curso
+    ev, est = evaluaciones[0], estudiantes[0]
+    item = NotaItem(evaluacion_id=ev.id, estudiante_id=est.id, calificacion=40)
+    crear_notas_masivo(NotaMasivaIn(items=[item]), db=db_session)
+
+    cambio = NotaItem(evaluacion_id=ev.id, estudiante_id=est.id, calificacion=99)
+    resultado = crear_notas_masivo(NotaMasivaIn(items=[cambio]), mode="skip", db=db_session)
+
+    assert resultado.estados == ["skipped"]
+    db_session.expire_all()
+    assert float(db_session.query(models.Nota).one().calificacion) == 40.0
+
+
+def test_agregados_siguen_las_notas_escritas(db_session, curso):
+    asignacion, evaluaciones, estudiantes = curso
+    est = estudiantes[0]
+    crear_notas_masivo(
+        NotaMasivaIn(items=[
+            NotaItem(evaluacion_id=evaluaciones[0].id, estudiante_id=est.id, calificacion=40),
+            NotaItem(evaluacion_id=evaluaciones[1].id, estudiante_id=est.id, calificacion=80),
+            NotaItem(evaluacion_id=evaluaciones[0].id, estudiante_id=estudiantes[1].id, calificacion=70),
+        ]),
+        db=db_session,
+    )
+    crear_notas_masivo(
+        NotaMasivaIn(items=[NotaItem(evaluacion_id=evaluaciones[1].id, estudiante_id=est.id, calificacion=100)]),
+        mode="upsert",
+        db=db_session,
+    )
+
+    simple = promedio_simple(estudiante_id=est.id, asignacion_id=asignacion.id, db=db_session)
+    ponderado = promedio_ponderado(estudiante_id=est.id, asignacion_id=asignacion.id, db=db_session)
+    assert simple["promedio_simple"] == 70.0
+    assert ponderado["promedio_ponderado"] == 70.0
+    esperado = [
+        {"estudiante_id": est.id, "promedio": 70.0},
+        {"estudiante_id": estudiantes[1].id, "promedio": 70.0},
+    ]
+    assert _promedios_curso(db_session, asignacion.id) == esperado
+
+    db_session.query(models.NotaAgregado).delete()
+    assert reconstruir_agregados(db_session) == 2
+    db_session.commit()
+    assert _promedios_curso(db_session, asignacion.id) == esperado
+
+    vacio = promedio_ponderado(estudiante_id=estudiantes[2].id, asignacion_id=asignacion.id, db=db_session)
+    assert vacio["detalle"] == "Sin ponderaciones registradas"
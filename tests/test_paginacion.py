@@ -0,0 +1,88 @@
+import json
+from datetime import date, datetime
+
+from app.db import models
+
+
+def _recorrer(client, url, **params):
+    """Follow ``X-Next-Cursor`` from the first page to the last one."""
+
+    paginas = []
+    params["cursor"] = ""
+    while True:
+        res = client.get(url, params=params)
+        assert res.status_code == 200
+        paginas.append(res.json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return paginas
+        params["cursor"] = cursor
+
+
+def test_gestiones_por_cursor_con_claves_repetidas(client, db_session):
+    inicios = [date(2021, 2, 1), date(2022, 2, 1), date(2022, 2, 1), date(2023, 2, 1), date(2024, 2, 1)]
+    db_session.add_all(
+        models.Gestion(nombre=f"G{i}", fecha_inicio=inicio, fecha_fin=date(inicio.year, 12, 1))
+        for i, inicio in enumerate(inicios)
+    )
+    db_session.commit()
+    esperado = [
+        g.id
+        for g in db_session.query(models.Gestion).order_by(
+            models.Gestion.fecha_inicio.desc(), models.Gestion.id.desc()
+        )
+    ]
+
+    paginas = _recorrer(client, "/api/v1/gestiones/", limit=2)
+
+    assert [len(p) for p in paginas] == [2, 2, 1]
+    assert [g["id"] for p in paginas for g in p] == esperado
+    res = client.get("/api/v1/gestiones/", params={"limit": 1, "with_total": True})
+    assert res.headers["X-Total-Count"] == "5"
+    assert client.get("/api/v1/gestiones/", params={"cursor": "xyz"}).status_code == 400
+
+
+def test_auditoria_por_cursor_sin_contar(client, db_session):
+    db_session.add_all(
+        models.AuditLog(accion="LOGIN", entidad="usuario", creado_en=datetime(2025, 3, 1, 8, minuto))
+        for minuto in (0, 5, 5, 10, 15)
+    )
+    db_session.commit()
+
+    paginas = _recorrer(client, "/api/v1/auditoria/", size=2)
+
+    assert all(p["total"] is None for p in paginas)
+    assert paginas[-1]["next_cursor"] is None
+    fechas = [item["creado_en"] for p in paginas for item in p["items"]]
+    assert len(fechas) == 5 and fechas == sorted(fechas, reverse=True)
+
+    clasica = client.get("/api/v1/auditoria/", params={"size": 2}).json()
+    assert clasica["total"] == 5
+
+
+def test_personas_paginadas_y_volcado_ndjson(client, db_session):
+    db_session.add_all(
+        models.Persona(
+            nombres=f"Persona {i}",
+            apellidos="Prueba",
+            sexo=models.SexoEnum.FEMENINO if i % 2 else models.SexoEnum.MASCULINO,
+            fecha_nacimiento=date(2008, 1, i + 1),
+        )
+        for i in range(7)
+    )
+    db_session.commit()
+
+    completo = client.get("/api/v1/personas/")
+    assert len(completo.json()) == 7
+    assert "X-Next-Cursor" not in completo.headers
+
+    pagina = client.get("/api/v1/personas/", params={"limit": 3, "offset": 3}).json()
+    assert [p["nombres"] for p in pagina] == ["Persona 3", "Persona 4", "Persona 5"]
+    paginas = _recorrer(client, "/api/v1/personas/", limit=3)
+    assert [len(p) for p in paginas] == [3, 3, 1]
+
+    res = client.get("/api/v1/personas/", params={"formato": "ndjson"})
+    assert res.headers["content-type"] == "application/x-ndjson"
+    volcado = [json.loads(linea) for linea in res.text.splitlines()]
+    assert volcado == [p for pagina in paginas for p in pagina]
+    assert volcado[0]["sexo"] == "M" and volcado[0]["fecha_nacimiento"] == "2008-01-01"
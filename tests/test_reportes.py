@@ -0,0 +1,227 @@
+import gzip
+import json
+import logging
+from datetime import date
+
+import pytest
+
+from app.core.config import settings
+from app.db import models
+
+
+@pytest.fixture
+def estudiante(db_session):
+    """Seed a student with grades in two asignaciones of different gestiones."""
+
+    def persona(nombre: str) -> models.Persona:
+        return models.Persona(
+            nombres=nombre,
+            apellidos="Prueba",
+            sexo=models.SexoEnum.FEMENINO,
+            fecha_nacimiento=date(2008, 1, 1),
+        )
+
+    gestiones = [
+        models.Gestion(nombre=str(anio), fecha_inicio=date(anio, 2, 1), fecha_fin=date(anio, 12, 1))
+        for anio in (2024, 2025)
+    ]
+    nivel = models.Nivel(nombre="Secundaria", etiqueta="SEC")
+    db_session.add_all([*gestiones, nivel])
+    db_session.flush()
+    curso = models.Curso(nivel_id=nivel.id, nombre="Primero", etiqueta="1RO")
+    materia = models.Materia(nombre="Matemática", codigo="MAT")
+    docente = models.Docente(persona=persona("Docente"))
+    estudiante = models.Estudiante(persona=persona("Estudiante"), codigo_rude="RUDE-1")
+    db_session.add_all([curso, materia, docente, estudiante])
+    db_session.flush()
+    paralelo = models.Paralelo(curso_id=curso.id, etiqueta="A", nombre="1A")
+    db_session.add(paralelo)
+    db_session.flush()
+    asignaciones = [
+        models.AsignacionDocente(
+            gestion_id=g.id,
+            docente_id=docente.id,
+            materia_id=materia.id,
+            curso_id=curso.id,
+            paralelo_id=paralelo.id,
+        )
+        for g in gestiones
+    ]
+    db_session.add_all(asignaciones)
+    db_session.flush()
+
+    # Tres evaluaciones por asignación, dos de ellas el mismo día.
+    for asig, anio in zip(asignaciones, (2024, 2025)):
+        for i, (dia, pond, cal) in enumerate([(3, 20, 40), (3, 30, 60), (10, 50, 80)]):
+            ev = models.Evaluacion(
+                asignacion_id=asig.id,
+                titulo=f"Examen {i}",
+                fecha=date(anio, 3, dia),
+                ponderacion=pond,
+            )
+            db_session.add(ev)
+            db_session.flush()
+            db_session.add(models.Nota(evaluacion_id=ev.id, estudiante_id=estudiante.id, calificacion=cal))
+    db_session.commit()
+    return estudiante, gestiones, asignaciones
+
+
+def test_notas_estudiante_pagina_por_cursor(client, estudiante):
+    est, _, asignaciones = estudiante
+    url = f"/api/v1/reportes/estudiante/{est.id}/notas"
+
+    vistas = []
+    params = {"limit": 2}
+    while True:
+        res = client.get(url, params=params)
+        assert res.status_code == 200
+        vistas.extend(res.json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    res = client.get(url)
+    assert "X-Next-Cursor" not in res.headers
+    completo = res.json()
+    assert len(completo) == 6
+    assert vistas == completo
+    assert [n["fecha"] for n in completo] == sorted(n["fecha"] for n in completo)
+
+    primera = client.get(url, params={"cursor": ""})
+    assert primera.json() == completo and "X-Next-Cursor" not in primera.headers
+    assert client.get(url, params={"cursor": "no-es-un-cursor"}).status_code == 400
+
+
+def test_notas_estudiante_filtra_y_agrupa(client, estudiante):
+    est, gestiones, asignaciones = estudiante
+    url = f"/api/v1/reportes/estudiante/{est.id}/notas"
+
+    por_gestion = client.get(url, params={"gestion_id": gestiones[1].id}).json()
+    assert {n["asignacion_id"] for n in por_gestion} == {asignaciones[1].id}
+    rango = client.get(url, params={"desde": "2025-03-05", "hasta": "2025-12-31"}).json()
+    assert [n["calificacion"] for n in rango] == [80.0]
+
+    agrupado = client.get(url, params={"group_by": "asignacion"}).json()
+    assert agrupado == [
+        {
+            "asignacion_id": asig.id,
+            "cantidad": 3,
+            "promedio_simple": 60.0,
+            "promedio_ponderado": 66.0,
+        }
+        for asig in asignaciones
+    ]
+
+
+def test_gradebook_matriz_y_etag(client, db_session, estudiante):
+    est, _, asignaciones = estudiante
+    asig = asignaciones[1]
+    otro = models.Estudiante(
+        persona=models.Persona(
+            nombres="Sin notas",
+            apellidos="Prueba",
+            sexo=models.SexoEnum.MASCULINO,
+            fecha_nacimiento=date(2008, 1, 1),
+        ),
+        codigo_rude="RUDE-2",
+    )
+    db_session.add(otro)
+    db_session.flush()
+    db_session.add_all(
+        models.Matricula(asignacion_id=asig.id, estudiante_id=e) for e in (est.id, otro.id)
+    )
+    db_session.commit()
+    url = f"/api/v1/reportes/asignacion/{asig.id}/gradebook"
+
+    res = client.get(url)
+    assert res.status_code == 200
+    libro = res.json()
+    assert libro["estudiantes"] == [est.id, otro.id]
+    assert libro["ponderaciones"] == [20.0, 30.0, 50.0]
+    assert libro["notas"] == [[40.0, 60.0, 80.0], [None, None, None]]
+    assert libro["promedio_simple"] == [60.0, None]
+    assert libro["promedio_ponderado"] == [66.0, None]
+
+    etag = res.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    db_session.query(models.Nota).filter_by(evaluacion_id=libro["evaluaciones"][0]).update({"calificacion": 70})
+    db_session.commit()
+    cambiado = client.get(url, headers={"If-None-Match": etag})
+    assert cambiado.status_code == 200
+    assert cambiado.json()["notas"][0][0] == 70.0
+    assert client.get("/api/v1/reportes/asignacion/999/gradebook").status_code == 404
+
+
+def test_exportar_notas_y_asistencias_en_streaming(client, db_session, estudiante):
+    est, gestiones, asignaciones = estudiante
+    db_session.add_all(
+        models.Asistencia(fecha=date(2025, 3, d), asignacion_id=asignaciones[1].id, estudiante_id=est.id, estado="AUSENTE")
+        for d in (3, 4)
+    )
+    db_session.commit()
+
+    res = client.get("/api/v1/export/notas", params={"gestion_id": gestiones[1].id})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    lineas = res.text.splitlines()
+    assert lineas[0] == "nota_id,asignacion_id,evaluacion_id,titulo,fecha,ponderacion,estudiante_id,calificacion"
+    assert len(lineas) == 4
+    assert lineas[1].endswith(f",2025-03-03,20.00,{est.id},40.00")
+
+    res = client.get(
+        "/api/v1/export/asistencias",
+        params={"gestion_id": gestiones[1].id, "formato": "ndjson", "gzip": True, "desde": "2025-03-04"},
+    )
+    assert res.headers["content-type"] == "application/gzip"
+    assert 'filename="asistencias_' in res.headers["content-disposition"]
+    filas = [json.loads(l) for l in gzip.decompress(res.content).decode().splitlines()]
+    assert filas == [{
+        "fecha": "2025-03-04",
+        "asignacion_id": asignaciones[1].id,
+        "estudiante_id": est.id,
+        "estado": "AUSENTE",
+        "observacion": None,
+    }]
+
+    assert client.get("/api/v1/export/notas", params={"gestion_id": 999}).status_code == 404
+
+
+def test_endpoints_de_lectura_async(client, db_session, estudiante):
+    est, _, asignaciones = estudiante
+    asig = asignaciones[1]
+    db_session.add_all([
+        models.Asistencia(fecha=date(2025, 3, 3), asignacion_id=asig.id, estudiante_id=est.id, estado="PRESENTE"),
+        models.Asistencia(fecha=date(2025, 3, 4), asignacion_id=asig.id, estudiante_id=est.id, estado="AUSENTE"),
+        models.Alerta(gestion=2025, asignacion_id=asig.id, estudiante_id=est.id, tipo="FALTAS", motivo="Prueba"),
+    ])
+    db_session.commit()
+    evaluacion = db_session.query(models.Evaluacion).filter_by(asignacion_id=asig.id).first()
+
+    notas = client.get(f"/api/v1/notas/evaluacion/{evaluacion.id}").json()
+    assert [(n["estudiante_id"], n["calificacion"]) for n in notas] == [(est.id, 40.0)]
+    assert client.get("/api/v1/notas/evaluacion/999").status_code == 404
+
+    asistencias = client.get("/api/v1/asistencias/", params={"asignacion_id": asig.id, "desde": "2025-03-04"}).json()
+    assert [a["estado"] for a in asistencias] == ["AUSENTE"]
+
+    alertas = client.get("/api/v1/alertas", params={"estudiante_id": est.id}).json()
+    assert alertas["total"] == 1
+    assert alertas["items"][0]["tipo"] == "FALTAS"
+
+
+def test_server_timing_y_log_de_consultas_lentas(client, estudiante, monkeypatch, caplog):
+    _, _, asignaciones = estudiante
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.INFO, logger="app.api.middleware"):
+        res = client.get(f"/api/v1/reportes/asignacion/{asignaciones[0].id}/gradebook")
+
+    assert res.status_code == 200
+    db, total = res.headers["Server-Timing"].split(", ")
+    assert db.startswith('db;desc="3 consultas";dur=')
+    assert total.startswith("total;dur=")
+    mensajes = [r.getMessage() for r in caplog.records]
+    assert any("ruta=gradebook" in m and "consultas=3" in m for m in mensajes)
+    assert sum(m.startswith("consulta lenta ruta=gradebook") for m in mensajes) == 3